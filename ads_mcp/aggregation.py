@@ -0,0 +1,200 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streaming GROUP BY aggregation of `search_stream` results.
+
+GAQL has no GROUP BY clause, so reports that only need totals would
+otherwise return every row to the caller. An AggregateBuilder folds the rows
+of each batch into per-group accumulators as the batches arrive, so its
+memory is bounded by the number of groups rather than the number of rows.
+"""
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from ads_mcp import projection
+
+FUNCTIONS = ("sum", "avg", "min", "max", "count")
+
+_AGGREGATE_RE = re.compile(r"^\s*(\w+)\s*\(\s*([\w.]*|\*)\s*\)\s*$")
+
+
+class Aggregate(NamedTuple):
+    """One aggregate column, e.g. `sum(metrics.clicks)`.
+
+    Attributes:
+        function: one of FUNCTIONS.
+        field: the aggregated field, or None for `count(*)`.
+    """
+
+    function: str
+    field: Optional[str]
+
+    @property
+    def name(self) -> str:
+        return f"{self.function}({self.field or '*'})"
+
+
+class Aggregation(NamedTuple):
+    """The group-by fields and aggregate columns of an aggregated search."""
+
+    group_by: Tuple[str, ...]
+    aggregates: Tuple[Aggregate, ...]
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """The fields the aggregation reads, in order of first use."""
+        fields = list(self.group_by)
+        fields.extend(a.field for a in self.aggregates if a.field)
+        return tuple(dict.fromkeys(fields))
+
+
+def parse_aggregate(spec: str) -> Aggregate:
+    """Parses an aggregate such as `sum(metrics.clicks)` or `count(*)`."""
+    match = _AGGREGATE_RE.match(spec)
+    if match is None or match.group(1).lower() not in FUNCTIONS:
+        raise ValueError(
+            f"Invalid aggregate {spec!r}, expected one of "
+            f"{', '.join(FUNCTIONS)} applied to a field, e.g. "
+            "sum(metrics.clicks)"
+        )
+    function = match.group(1).lower()
+    field = match.group(2)
+    if field in ("", "*"):
+        if function != "count":
+            raise ValueError(f"Aggregate {spec!r} needs a field")
+        field = None
+    return Aggregate(function, field)
+
+
+def parse_aggregation(
+    group_by: Optional[Sequence[str]], aggregates: Optional[Sequence[str]]
+) -> Optional[Aggregation]:
+    """Returns the aggregation of the `search` arguments, if any."""
+    if not group_by and not aggregates:
+        return None
+    return Aggregation(
+        tuple(group_by or ()),
+        tuple(parse_aggregate(spec) for spec in aggregates or ()),
+    )
+
+
+def _new_state(function: str) -> Any:
+    if function == "avg":
+        return [0, 0]
+    if function in ("sum", "count"):
+        return 0
+    return None
+
+
+class AggregateBuilder:
+    """Accumulates `search_stream` batches into aggregated rows.
+
+    Groups are returned in the order in which they first appear in the
+    stream. Missing values, such as non-finite floats, are ignored by every
+    aggregate except `count(*)`.
+    """
+
+    def __init__(self, aggregation: Aggregation):
+        self.aggregation = aggregation
+        self._groups: Dict[Tuple[Any, ...], List[Any]] = {}
+        self._paths: Tuple[str, ...] = ()
+        self._getters: Tuple[Any, ...] = ()
+
+    @property
+    def row_count(self) -> int:
+        return len(self._groups)
+
+    def _compile(self, batch: Any) -> None:
+        row_type = batch.DESCRIPTOR.fields_by_name["results"].message_type
+        paths = tuple(batch.field_mask.paths)
+        missing = [f for f in self.aggregation.fields if f not in paths]
+        if missing:
+            raise ValueError(
+                "Aggregated fields must be selected by the query: "
+                + ", ".join(missing)
+            )
+        projector = projection.get_row_projector(
+            row_type, self.aggregation.fields
+        )
+        compiled = dict(zip(projector.paths, projector.compiled_paths))
+        for aggregate in self.aggregation.aggregates:
+            if aggregate.function in ("sum", "avg"):
+                if compiled[aggregate.field].typecode is None:
+                    raise ValueError(f"{aggregate.name} needs a numeric field")
+        self._paths = paths
+        self._getters = (
+            tuple(compiled[f].getter() for f in self.aggregation.group_by),
+            tuple(
+                (a.function, a.field and compiled[a.field].getter())
+                for a in self.aggregation.aggregates
+            ),
+        )
+
+    def add_batch(self, batch: Any) -> None:
+        """Folds the rows of a `search_stream` batch into the groups."""
+        message = getattr(batch, "_pb", batch)
+        if not self._getters:
+            self._compile(message)
+        elif tuple(message.field_mask.paths) != self._paths:
+            raise ValueError("All batches must have the same field mask")
+
+        key_getters, aggregate_getters = self._getters
+        groups = self._groups
+        for row in message.results:
+            key = tuple(_hashable(get(row)) for get in key_getters)
+            state = groups.get(key)
+            if state is None:
+                state = [_new_state(f) for f, _ in aggregate_getters]
+                groups[key] = state
+            for i, (function, get) in enumerate(aggregate_getters):
+                if get is None:
+                    state[i] += 1
+                    continue
+                value = get(row)
+                if value is None:
+                    continue
+                if function == "sum":
+                    state[i] += value
+                elif function == "avg":
+                    state[i][0] += value
+                    state[i][1] += 1
+                elif function == "count":
+                    state[i] += 1
+                elif function == "min":
+                    if state[i] is None or value < state[i]:
+                        state[i] = value
+                elif state[i] is None or value > state[i]:
+                    state[i] = value
+
+    def result(self) -> List[Dict[str, Any]]:
+        """Returns one row per group with the group-by and aggregate values."""
+        rows = []
+        for key, state in self._groups.items():
+            row = {
+                field: list(value) if isinstance(value, tuple) else value
+                for field, value in zip(self.aggregation.group_by, key)
+            }
+            for aggregate, value in zip(self.aggregation.aggregates, state):
+                if aggregate.function == "avg":
+                    total, count = value
+                    value = total / count if count else None
+                row[aggregate.name] = value
+            rows.append(row)
+        return rows
+
+
+def _hashable(value: Any) -> Any:
+    # Repeated fields are projected as lists.
+    return tuple(value) if isinstance(value, list) else value
@@ -0,0 +1,320 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Native asyncio access to the Google Ads API over `grpc.aio` channels.
+
+The synchronous services of the google-ads client library block whatever
+thread runs them for the whole duration of a call. This module calls the few
+API methods the tools need directly on a `grpc.aio` channel, so one event
+loop can hold many concurrent streams without a thread per request. The
+library's own asyncio services (`get_service(..., is_async=True)`) aren't
+used, as they create their channels themselves, without the channel
+settings of `ads_mcp.channels` or the retries and rate limits of the server.
+
+The async path is enabled by setting GOOGLE_ADS_MCP_ASYNC_GRPC=1. It reuses
+the credentials, developer token and login customer id of the GoogleAdsClient
+of the current tenant, see `ads_mcp.clients`.
+"""
+
+import asyncio
+import collections
+import functools
+import platform
+import weakref
+from importlib import metadata
+from typing import Any, AsyncIterator, List, Optional
+
+import google.auth.transport.grpc
+import google.auth.transport.requests
+import grpc
+import grpc.aio
+from google.ads.googleads.errors import GoogleAdsException
+from google.ads.googleads.v21.errors.types.errors import GoogleAdsFailure
+from google.ads.googleads.v21.services.types.customer_service import (
+    ListAccessibleCustomersRequest,
+    ListAccessibleCustomersResponse,
+)
+from google.ads.googleads.v21.services.types.google_ads_service import (
+    SearchGoogleAdsStreamRequest,
+    SearchGoogleAdsStreamResponse,
+)
+
+from ads_mcp import channels
+from ads_mcp import clients
+from ads_mcp import instrumentation
+from ads_mcp import ratelimit
+from ads_mcp import retry
+import ads_mcp.utils as utils
+from ads_mcp.mcp_header_interceptor import AsyncMCPHeaderInterceptor
+
+_DEFAULT_ENDPOINT = "googleads.googleapis.com"
+_DEFAULT_PORT = 443
+_API_VERSION = "v21"
+_SERVICES = f"/google.ads.googleads.{_API_VERSION}.services"
+_FAILURE_KEY = (
+    f"google.ads.googleads.{_API_VERSION}.errors.googleadsfailure-bin"
+)
+_REQUEST_ID_KEY = "request-id"
+# Seconds the calls in flight of an evicted tenant get to finish.
+_CLOSE_GRACE_SECONDS = 30.0
+
+
+def enabled() -> bool:
+    """Returns whether the tools should use the asyncio execution path."""
+    return utils.get_bool_env("GOOGLE_ADS_MCP_ASYNC_GRPC")
+
+
+def _api_client_header() -> str:
+    try:
+        gccl = metadata.version("google-ads")
+    except metadata.PackageNotFoundError:
+        gccl = "unknown"
+    return (
+        f"gl-python/{platform.python_version()} grpc/{grpc.__version__} "
+        f"gccl/{gccl}"
+    )
+
+
+def _to_google_ads_exception(error: grpc.aio.AioRpcError) -> Exception:
+    """Converts an RPC error into a GoogleAdsException where possible.
+
+    Mirrors the conversion done by the client library's exception
+    interceptor, so that both execution paths report the same errors.
+    """
+    failure = None
+    request_id = None
+    for key, value in error.trailing_metadata() or ():
+        if key == _FAILURE_KEY:
+            failure = GoogleAdsFailure.deserialize(value)
+        elif key == _REQUEST_ID_KEY:
+            request_id = value
+    if failure is None:
+        return error
+    return GoogleAdsException(error, error, failure, request_id)
+
+
+class _UnaryStreamInterceptor(grpc.aio.UnaryStreamClientInterceptor):
+    """The unary-stream half of an interceptor of both kinds of calls.
+
+    `grpc.aio` channels use an interceptor for the first kind of call it
+    supports only, so interceptors of unary-unary and unary-stream calls are
+    also passed through this class.
+    """
+
+    def __init__(self, interceptor: grpc.aio.UnaryStreamClientInterceptor):
+        self._interceptor = interceptor
+
+    async def intercept_unary_stream(
+        self, continuation, client_call_details, request
+    ):
+        return await self._interceptor.intercept_unary_stream(
+            continuation, client_call_details, request
+        )
+
+
+def _create_channel(
+    credentials: Any, endpoint: Optional[str] = None
+) -> grpc.aio.Channel:
+    """Creates an authorized `grpc.aio` channel to the Google Ads API.
+
+    The channel gets the keepalive, message size and compression settings of
+    the channel pool of the synchronous services.
+
+    Args:
+        credentials: the credentials the calls are authorized with.
+        endpoint: the host of the API, with an optional port, by default
+            the public endpoint. As for the synchronous services, the port
+            defaults to 443.
+    """
+    target = endpoint or _DEFAULT_ENDPOINT
+    if ":" not in target:
+        target = f"{target}:{_DEFAULT_PORT}"
+    settings = channels.load_settings()
+    interceptors = [
+        AsyncMCPHeaderInterceptor(),
+        instrumentation.AsyncInstrumentationInterceptor(),
+    ]
+    auth_plugin = google.auth.transport.grpc.AuthMetadataPlugin(
+        credentials, google.auth.transport.requests.Request()
+    )
+    channel_credentials = grpc.composite_channel_credentials(
+        grpc.ssl_channel_credentials(),
+        grpc.metadata_call_credentials(auth_plugin),
+    )
+    return grpc.aio.secure_channel(
+        target,
+        channel_credentials,
+        options=settings.options(),
+        compression=settings.compression_algorithm(),
+        interceptors=[
+            *interceptors,
+            *map(_UnaryStreamInterceptor, interceptors),
+        ],
+    )
+
+
+class AsyncGoogleAdsApi:
+    """The Google Ads API methods used by the tools, on a `grpc.aio` channel.
+
+    Responses are returned as raw protobuf messages, which is what
+    `utils.format_output_rows` and the projectors read anyway.
+    """
+
+    def __init__(
+        self,
+        channel: grpc.aio.Channel,
+        developer_token: str,
+        login_customer_id: Optional[str] = None,
+    ):
+        self._channel = channel
+        self._developer_token = developer_token
+        self._metadata = [
+            ("developer-token", developer_token),
+            ("x-goog-api-client", _api_client_header()),
+        ]
+        if login_customer_id:
+            self._metadata.append(("login-customer-id", str(login_customer_id)))
+        self._search_stream = channel.unary_stream(
+            f"{_SERVICES}.GoogleAdsService/SearchStream",
+            request_serializer=SearchGoogleAdsStreamRequest.serialize,
+            response_deserializer=(
+                SearchGoogleAdsStreamResponse.pb().FromString
+            ),
+        )
+        self._list_accessible_customers = channel.unary_unary(
+            f"{_SERVICES}.CustomerService/ListAccessibleCustomers",
+            request_serializer=ListAccessibleCustomersRequest.serialize,
+            response_deserializer=(
+                ListAccessibleCustomersResponse.pb().FromString
+            ),
+        )
+
+    def _call_metadata(self, customer_id: Optional[str] = None) -> tuple:
+        if customer_id is None:
+            return tuple(self._metadata)
+        # The routing header the generated clients add for customer calls.
+        return (
+            *self._metadata,
+            ("x-goog-request-params", f"customer_id={customer_id}"),
+        )
+
+    def search_stream(self, customer_id: str, query: str) -> AsyncIterator[Any]:
+        """Yields the raw SearchGoogleAdsStreamResponse batches of a query.
+
+        Transient errors are retried, see `retry.retry_stream_async`.
+        Closing the generator before it is exhausted cancels the call.
+        """
+        return retry.retry_stream_async(
+            functools.partial(self._search_stream_attempt, customer_id, query)
+        )
+
+    async def _search_stream_attempt(
+        self, customer_id: str, query: str, timeout: Optional[float]
+    ) -> AsyncIterator[Any]:
+        request = SearchGoogleAdsStreamRequest(
+            customer_id=customer_id, query=query
+        )
+        async with ratelimit.get_scheduler().request_async(
+            self._developer_token, customer_id
+        ):
+            call = self._search_stream(
+                request,
+                metadata=self._call_metadata(customer_id),
+                timeout=timeout,
+            )
+            try:
+                async for batch in call:
+                    yield batch
+            except grpc.aio.AioRpcError as e:
+                raise _to_google_ads_exception(e) from e
+            finally:
+                call.cancel()
+
+    async def list_accessible_customers(self) -> List[str]:
+        """Returns the resource names of the accessible customers.
+
+        Transient errors are retried, see `retry.call_async`.
+        """
+        response = await retry.call_async(
+            self._list_accessible_customers_attempt
+        )
+        return list(response.resource_names)
+
+    async def _list_accessible_customers_attempt(
+        self, timeout: Optional[float]
+    ) -> Any:
+        async with ratelimit.get_scheduler().request_async(
+            self._developer_token
+        ):
+            try:
+                return await self._list_accessible_customers(
+                    ListAccessibleCustomersRequest(),
+                    metadata=self._call_metadata(),
+                    timeout=timeout,
+                )
+            except grpc.aio.AioRpcError as e:
+                raise _to_google_ads_exception(e) from e
+
+    async def close(self, grace: Optional[float] = None) -> None:
+        """Closes the channel, after `grace` seconds for calls in flight."""
+        await self._channel.close(grace)
+
+
+# `grpc.aio` channels are bound to the event loop they were created in, so
+# every loop has its own APIs, by tenant and least recently used first.
+_apis = weakref.WeakKeyDictionary()
+# Evicted APIs being closed, kept referenced until they are.
+_closing = set()
+
+
+async def get_async_api() -> AsyncGoogleAdsApi:
+    """Returns the AsyncGoogleAdsApi of the current tenant and event loop.
+
+    The credentials and client of a new API are loaded on a worker thread,
+    as they can block, e.g. on the token endpoint. Once a loop has APIs for
+    more than `clients.max_clients()` tenants, the least recently used ones
+    are closed, letting their calls in flight finish within
+    _CLOSE_GRACE_SECONDS.
+    """
+    loop = asyncio.get_running_loop()
+    apis = _apis.get(loop)
+    if apis is None:
+        apis = _apis[loop] = collections.OrderedDict()
+    if apis:
+        key = utils.get_client_key()
+    else:
+        # The first API of the loop may load the credentials of the process.
+        key = await asyncio.to_thread(utils.get_client_key)
+    api = apis.get(key)
+    if api is not None:
+        apis.move_to_end(key)
+        return api
+    client = await asyncio.to_thread(utils.get_googleads_client, key)
+    api = apis.get(key)
+    if api is not None:
+        # Created by another call while the client was loaded.
+        apis.move_to_end(key)
+        return api
+    api = AsyncGoogleAdsApi(
+        _create_channel(client.credentials, client.endpoint),
+        client.developer_token,
+        client.login_customer_id,
+    )
+    apis[key] = api
+    while len(apis) > clients.max_clients():
+        _, evicted = apis.popitem(last=False)
+        task = loop.create_task(evicted.close(_CLOSE_GRACE_SECONDS))
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+    return api
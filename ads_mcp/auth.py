@@ -0,0 +1,209 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Loading of the API credentials and background refresh of their tokens.
+
+google-auth refreshes an access token on the first request made once the
+token is about to expire, so that request waits for the token endpoint. The
+TokenRefresher renews the token on a background thread before that point, so
+API calls always find a valid token.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+import os
+import threading
+from typing import Any, Callable, Optional
+
+import google.auth
+import google.auth.transport.requests
+from google.auth import exceptions
+from google.auth.credentials import Credentials
+import google.oauth2.credentials
+from google.oauth2 import service_account
+
+import ads_mcp.utils as utils
+
+# Read-only scope of the Google Ads API.
+_READ_ONLY_ADS_SCOPE = "https://www.googleapis.com/auth/adwords"
+
+_DEFAULT_REFRESH_MARGIN_SECONDS = 300.0
+# google-auth refreshes tokens this close to their expiry on the request
+# path, so background refreshes have to happen earlier.
+_MIN_REFRESH_MARGIN_SECONDS = 240.0
+# Wait before trying again after a failed refresh.
+_RETRY_SECONDS = 30.0
+# Wait before checking again credentials whose token doesn't expire.
+_NO_EXPIRY_CHECK_SECONDS = 3600.0
+
+
+def _utcnow() -> datetime.datetime:
+    # google-auth keeps expiry times as naive UTC datetimes.
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _decode_credentials_info(value: str) -> Any:
+    """Returns the JSON credentials encoded in base64 in `value`.
+
+    Raises:
+        ValueError: if `value` isn't base64 encoded JSON.
+    """
+    try:
+        return json.loads(base64.b64decode(value, validate=True))
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid GOOGLE_CREDENTIALS_BASE64: {e}") from e
+
+
+def _credentials_from_info(info: Any) -> Credentials:
+    """Returns the credentials of a service account key or authorized user.
+
+    Raises:
+        ValueError: if `info` is neither of them.
+    """
+    kind = info.get("type") if isinstance(info, dict) else None
+    if kind == "service_account":
+        return service_account.Credentials.from_service_account_info(
+            info, scopes=[_READ_ONLY_ADS_SCOPE]
+        )
+    if kind == "authorized_user":
+        return google.oauth2.credentials.Credentials.from_authorized_user_info(
+            info, scopes=[_READ_ONLY_ADS_SCOPE]
+        )
+    raise ValueError(
+        f"Unsupported credentials type {kind!r}, expected a service account "
+        "key or an authorized user file"
+    )
+
+
+def load_credentials() -> Credentials:
+    """Returns the credentials of the server, with read-only scope.
+
+    Credentials in GOOGLE_CREDENTIALS_BASE64, a base64 encoded service
+    account key or authorized user file, are loaded in memory, without
+    writing them to a file. They are ignored if GOOGLE_APPLICATION_CREDENTIALS
+    is set. Otherwise, or if they can't be loaded, the Application Default
+    Credentials are used.
+    """
+    encoded = os.environ.get("GOOGLE_CREDENTIALS_BASE64")
+    if encoded and not os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
+        try:
+            credentials = _credentials_from_info(
+                _decode_credentials_info(encoded)
+            )
+        except (ValueError, exceptions.GoogleAuthError) as e:
+            utils.logger.error(
+                f"Failed to load credentials from GOOGLE_CREDENTIALS_BASE64: {e}"
+            )
+        else:
+            utils.logger.info(
+                "Credentials loaded from GOOGLE_CREDENTIALS_BASE64"
+            )
+            return credentials
+    credentials, _ = google.auth.default(scopes=[_READ_ONLY_ADS_SCOPE])
+    return credentials
+
+
+class TokenRefresher:
+    """Renews the access token of credentials before it expires.
+
+    The first token is fetched when the refresher starts, then renewed
+    `margin` seconds before each expiry. Failed refreshes are tried again
+    until they succeed; meanwhile requests still refresh the token
+    themselves once it is about to expire.
+    """
+
+    def __init__(
+        self,
+        credentials: Credentials,
+        margin: float = _DEFAULT_REFRESH_MARGIN_SECONDS,
+        request_factory: Callable[
+            [], Any
+        ] = google.auth.transport.requests.Request,
+        clock: Callable[[], datetime.datetime] = _utcnow,
+    ):
+        self._credentials = credentials
+        self._margin = max(margin, _MIN_REFRESH_MARGIN_SECONDS)
+        self._request_factory = request_factory
+        self._clock = clock
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0
+        self.failures = 0
+
+    def next_refresh_delay(self) -> float:
+        """Returns the seconds until the token should be refreshed."""
+        if not self._credentials.token:
+            return 0.0
+        expiry = self._credentials.expiry
+        if expiry is None:
+            return _NO_EXPIRY_CHECK_SECONDS
+        remaining = (expiry - self._clock()).total_seconds()
+        return max(0.0, remaining - self._margin)
+
+    def refresh(self) -> bool:
+        """Refreshes the token now. Returns whether it succeeded."""
+        try:
+            self._credentials.refresh(self._request_factory())
+        except (exceptions.GoogleAuthError, OSError) as e:
+            self.failures += 1
+            utils.logger.warning(f"Background token refresh failed: {e}")
+            return False
+        self.refreshes += 1
+        return True
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            delay = self.next_refresh_delay()
+            if delay > 0:
+                self._stopped.wait(delay)
+                continue
+            if not self.refresh():
+                self._stopped.wait(_RETRY_SECONDS)
+
+    def start(self) -> "TokenRefresher":
+        """Fetches the first token if needed, then refreshes on a thread."""
+        if not self._credentials.token:
+            self.refresh()
+        self._thread = threading.Thread(
+            target=self._run, name="ads-mcp-token-refresher", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops refreshing, letting the current refresh finish."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def start_refresher(credentials: Credentials) -> Optional[TokenRefresher]:
+    """Starts refreshing the token of `credentials` in the background.
+
+    GOOGLE_ADS_MCP_TOKEN_REFRESH_MARGIN_SECONDS sets how long before expiry
+    tokens are renewed (default 300, at least 240). Set it to 0 to leave the
+    refresh to the requests.
+
+    Returns:
+        The started refresher, or None if background refresh is disabled.
+    """
+    margin = utils.get_float_env(
+        "GOOGLE_ADS_MCP_TOKEN_REFRESH_MARGIN_SECONDS",
+        _DEFAULT_REFRESH_MARGIN_SECONDS,
+    )
+    if margin <= 0:
+        return None
+    return TokenRefresher(credentials, margin).start()
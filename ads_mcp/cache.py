@@ -0,0 +1,214 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process cache of GAQL query results.
+
+Results are kept in a size-bounded LRU cache. How long an entry stays valid
+depends on the `segments.date` range of its query: reports that include today
+or yesterday are still changing and expire after minutes, while reports over
+a fully historical range are stable and are kept for hours.
+"""
+
+import collections
+import datetime
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from ads_mcp import gaql
+import ads_mcp.utils as utils
+
+_DEFAULT_MAX_ENTRIES = 256
+_DEFAULT_MAX_ROWS = 10000
+_DEFAULT_RECENT_TTL_SECONDS = 300.0
+_DEFAULT_HISTORICAL_TTL_SECONDS = 6 * 3600.0
+
+_DATE_FIELD = "segments.date"
+
+
+def _last_reported_date(query: str) -> Optional[datetime.date]:
+    """Returns the last `segments.date` the query can report on.
+
+    Returns None if the query has no upper bound on `segments.date`, which
+    includes queries that don't segment by date at all, queries using
+    relative date literals such as LAST_7_DAYS and queries that can't be
+    parsed.
+    """
+    try:
+        conditions = gaql.parse(query).conditions
+    except gaql.GaqlSyntaxError:
+        return None
+
+    upper_bounds = []
+    for condition in conditions:
+        if condition.field != _DATE_FIELD:
+            continue
+        dates = [v for v in condition.values if isinstance(v, str)]
+        if condition.operator == "DURING":
+            return None
+        if condition.operator == "BETWEEN" and len(dates) == 2:
+            upper_bounds.append(dates[1])
+        elif condition.operator in ("<", "<=", "=", "IN") and dates:
+            upper_bounds.append(max(dates))
+    if not upper_bounds:
+        return None
+
+    try:
+        # Conditions are combined with AND, so the tightest bound applies.
+        return min(datetime.date.fromisoformat(d) for d in upper_bounds)
+    except ValueError:
+        return None
+
+
+class QueryResultCache:
+    """A size-bounded LRU cache whose entries expire after a per-entry TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        max_rows: int = _DEFAULT_MAX_ROWS,
+        recent_ttl_seconds: float = _DEFAULT_RECENT_TTL_SECONDS,
+        historical_ttl_seconds: float = _DEFAULT_HISTORICAL_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        today: Callable[[], datetime.date] = datetime.date.today,
+    ):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.recent_ttl_seconds = recent_ttl_seconds
+        self.historical_ttl_seconds = historical_ttl_seconds
+        self._clock = clock
+        self._today = today
+        self._lock = threading.Lock()
+        self._entries: "collections.OrderedDict[Hashable, tuple]" = (
+            collections.OrderedDict()
+        )
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(
+        login_customer_id: Optional[str],
+        customer_id: str,
+        query: str,
+        *extra: Hashable,
+    ) -> tuple:
+        """Returns the cache key of a query.
+
+        Args:
+            login_customer_id: the login customer the query is made as.
+            customer_id: the customer the query is made for.
+            query: the GAQL query. Queries with the same canonical form
+                share a key.
+            *extra: anything else that changes the shape of the result, such
+                as the output format.
+        """
+        return (
+            login_customer_id,
+            customer_id,
+            gaql.canonicalize(query),
+            *extra,
+        )
+
+    def ttl_for_query(self, query: str) -> float:
+        """Returns how long the result of `query` may be cached."""
+        last_date = _last_reported_date(query)
+        yesterday = self._today() - datetime.timedelta(days=1)
+        if last_date is None or last_date >= yesterday:
+            return self.recent_ttl_seconds
+        return self.historical_ttl_seconds
+
+    def get(self, key: Hashable) -> Any:
+        """Returns the cached value of `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, query: str, rows: int) -> None:
+        """Caches `value` as the result of `query`.
+
+        Results of more than `max_rows` rows are not cached.
+        """
+        if not self.enabled or rows > self.max_rows:
+            return
+        expires = self._clock() + self.ttl_for_query(query)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Removes every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the cache counters and configuration."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "max_rows": self.max_rows,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "recent_ttl_seconds": self.recent_ttl_seconds,
+                "historical_ttl_seconds": self.historical_ttl_seconds,
+            }
+
+
+def create_cache() -> QueryResultCache:
+    """Returns a cache configured from the environment.
+
+    GOOGLE_ADS_MCP_CACHE_MAX_ENTRIES bounds the number of cached results (0
+    disables the cache) and GOOGLE_ADS_MCP_CACHE_MAX_ROWS the size of a
+    cacheable result. GOOGLE_ADS_MCP_CACHE_RECENT_TTL_SECONDS and
+    GOOGLE_ADS_MCP_CACHE_HISTORICAL_TTL_SECONDS set the lifetime of results
+    that do and don't include today or yesterday.
+    """
+    return QueryResultCache(
+        max_entries=utils.get_int_env(
+            "GOOGLE_ADS_MCP_CACHE_MAX_ENTRIES", _DEFAULT_MAX_ENTRIES
+        ),
+        max_rows=utils.get_int_env(
+            "GOOGLE_ADS_MCP_CACHE_MAX_ROWS", _DEFAULT_MAX_ROWS
+        ),
+        recent_ttl_seconds=utils.get_float_env(
+            "GOOGLE_ADS_MCP_CACHE_RECENT_TTL_SECONDS",
+            _DEFAULT_RECENT_TTL_SECONDS,
+        ),
+        historical_ttl_seconds=utils.get_float_env(
+            "GOOGLE_ADS_MCP_CACHE_HISTORICAL_TTL_SECONDS",
+            _DEFAULT_HISTORICAL_TTL_SECONDS,
+        ),
+    )
@@ -0,0 +1,233 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cancellation and timeouts of tool calls.
+
+Tools wrapped with `tool` run as async functions, synchronous ones on a
+worker thread, with a timeout. When the MCP client cancels the call or goes
+away, or the timeout expires, the task of the call is cancelled and the
+CancelToken of the call is set. The token is visible to the code of the call
+through a context variable: API calls register callbacks with `on_cancel`
+that cancel their gRPC call, and long loops call `check` to stop early.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import inspect
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ads_mcp import metrics
+from ads_mcp import retry
+from ads_mcp import tracing
+import ads_mcp.utils as utils
+
+
+class OperationCancelled(Exception):
+    """Raised to the code of a tool call that was cancelled."""
+
+
+class CancelToken:
+    """Set once when a tool call is cancelled, running its callbacks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        """Sets the token and runs its callbacks, once."""
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                utils.logger.warning(f"Cancellation callback failed: {e}")
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Runs `callback` when the token is set, now if it already is.
+
+        Returns:
+            A function that unregisters the callback.
+        """
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+                return functools.partial(self._remove, callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def check(self) -> None:
+        """Raises OperationCancelled if the token is set."""
+        if self._cancelled:
+            raise OperationCancelled("The tool call was cancelled")
+
+
+# The token of the tool call being run.
+_token: contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar(
+    "ads_mcp_cancel_token", default=None
+)
+
+
+def current_token() -> Optional[CancelToken]:
+    """Returns the token of the tool call being run, if any."""
+    return _token.get()
+
+
+def check() -> None:
+    """Raises OperationCancelled if the tool call being run was cancelled."""
+    token = _token.get()
+    if token is not None:
+        token.check()
+
+
+@contextlib.contextmanager
+def use_token(token: Optional[CancelToken]) -> Iterator[None]:
+    """Runs the context with `token` as the token of the tool call."""
+    reset = _token.set(token)
+    try:
+        yield
+    finally:
+        _token.reset(reset)
+
+
+@contextlib.contextmanager
+def on_cancel(callback: Callable[[], None]) -> Iterator[None]:
+    """Calls `callback` if the tool call is cancelled during the context.
+
+    Raises:
+        OperationCancelled: if the tool call was already cancelled.
+    """
+    token = _token.get()
+    if token is None:
+        yield
+        return
+    token.check()
+    remove = token.add_callback(callback)
+    try:
+        yield
+    finally:
+        remove()
+
+
+def sleep(seconds: float) -> None:
+    """Sleeps, waking up early if the tool call is cancelled.
+
+    Raises:
+        OperationCancelled: if the tool call was cancelled.
+    """
+    woken = threading.Event()
+    with on_cancel(woken.set):
+        woken.wait(seconds)
+    check()
+
+
+def _parse_timeouts(value: str) -> Dict[str, float]:
+    timeouts = {}
+    for item in value.split(","):
+        name, _, seconds = item.partition("=")
+        if not name.strip():
+            continue
+        try:
+            timeouts[name.strip()] = float(seconds)
+        except ValueError:
+            utils.logger.warning(f"Ignoring invalid tool timeout: {item}")
+    return timeouts
+
+
+# Timeouts of specific tools, e.g. "search=60,export_report=1800".
+_TOOL_TIMEOUTS = _parse_timeouts(
+    os.environ.get("GOOGLE_ADS_MCP_TOOL_TIMEOUTS", "")
+)
+
+
+def tool_timeout(name: str) -> float:
+    """Returns the timeout of a tool in seconds, 0 for none.
+
+    Tools without a timeout in GOOGLE_ADS_MCP_TOOL_TIMEOUTS get the one of
+    GOOGLE_ADS_MCP_TOOL_TIMEOUT_SECONDS, by default the deadline budget of
+    the retry policy.
+    """
+    if name in _TOOL_TIMEOUTS:
+        return _TOOL_TIMEOUTS[name]
+    return utils.get_float_env(
+        "GOOGLE_ADS_MCP_TOOL_TIMEOUT_SECONDS", retry.load_policy().deadline
+    )
+
+
+def tool(function: Callable[..., Any]) -> Callable[..., Any]:
+    """Makes a tool cancellable and bounds it by its timeout.
+
+    The returned async function runs `function` with a new CancelToken and
+    a deadline budget equal to the timeout, on a worker thread if it is
+    synchronous. Cancelling the returned function, e.g. because the client
+    cancelled the request, sets the token. Calls are recorded in the tool
+    metrics of the process and run in a tracing span.
+
+    Raises:
+        TimeoutError: if the call didn't finish within the timeout.
+    """
+    name = function.__name__
+
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        seconds = tool_timeout(name)
+        token = CancelToken()
+        customer_id = kwargs.get("customer_id")
+        with (
+            metrics.get_tool_metrics().call(
+                name, customer_id, cancelled=(OperationCancelled,)
+            ) as recorded,
+            tracing.span(
+                f"ads_mcp.{name}", tool=name, customer_id=customer_id
+            ) as span,
+            retry.deadline_scope(seconds),
+            use_token(token),
+        ):
+            if inspect.iscoroutinefunction(function):
+                call = function(*args, **kwargs)
+            else:
+                call = asyncio.to_thread(function, *args, **kwargs)
+            try:
+                result = await asyncio.wait_for(call, seconds or None)
+            except asyncio.TimeoutError as e:
+                token.cancel()
+                raise TimeoutError(
+                    f"The {name} tool didn't finish within {seconds:g}s"
+                ) from e
+            except asyncio.CancelledError:
+                utils.logger.info(f"ads_mcp.{name} call cancelled")
+                token.cancel()
+                raise
+            recorded.result(result)
+            span.set_attribute("rows", recorded.rows)
+            return result
+
+    return wrapper
@@ -0,0 +1,267 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Indexed catalog of the GAQL resources and their fields.
+
+The catalog is loaded once from the resource file generated by
+`update_references.py` and maps every resource to the sets of its
+selectable, filterable and sortable fields. It is used to validate queries
+locally, so that mistakes in a query don't cost an API round trip.
+
+`update_references.py` also writes a precompiled copy of the catalog: a
+versioned header followed by a `marshal` dump of the indexed sets of each
+resource. Loading it only reads the resource names; the sets of a resource
+are decoded when the resource is first used. The header records the hash of the JSON file
+it was compiled from; a missing, stale or incompatible copy is ignored and
+the JSON file is used instead.
+
+Fields are indexed by the resource they belong to, i.e. the part of their
+name before the first dot. The file doesn't record which resources can be
+selected together, so queries are only checked for unknown fields and for
+fields used in a clause that doesn't support them.
+"""
+
+import difflib
+import functools
+import hashlib
+import json
+import marshal
+import struct
+import sys
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from ads_mcp import gaql
+import ads_mcp.utils as utils
+
+
+class InvalidQueryError(ValueError):
+    """Raised when a query uses resources or fields the API doesn't have."""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("Invalid GAQL query: " + " ".join(problems))
+        self.problems = problems
+
+
+class ResourceFields(NamedTuple):
+    """The fields of one resource, by what they can be used for."""
+
+    selectable: frozenset
+    filterable: frozenset
+    sortable: frozenset
+
+
+class FieldCatalog:
+    """The GAQL resources and their fields.
+
+    The fields of a resource may also be given as the `marshal` dump of its
+    ResourceFields, which is then only decoded when first used.
+    """
+
+    def __init__(self, resources: Mapping[str, Union[ResourceFields, bytes]]):
+        self._resources: Dict[str, Union[ResourceFields, bytes]] = dict(
+            resources
+        )
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "FieldCatalog":
+        """Builds the catalog from the records of the resource file."""
+        return cls(
+            {
+                record["resource"]: ResourceFields(
+                    frozenset(record["selectable"]),
+                    frozenset(record["filterable"]),
+                    frozenset(record["sortable"]),
+                )
+                for record in records
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self._resources)
+
+    def __contains__(self, resource: str) -> bool:
+        return resource in self._resources
+
+    def resources(self) -> List[str]:
+        """Returns the sorted names of all resources."""
+        return sorted(self._resources)
+
+    def get(self, resource: str) -> Optional[ResourceFields]:
+        """Returns the fields of a resource, or None if it is unknown."""
+        fields = self._resources.get(resource)
+        if isinstance(fields, bytes):
+            fields = ResourceFields._make(marshal.loads(fields))
+            self._resources[resource] = fields
+        return fields
+
+    def _fields_of(self, field: str) -> Optional[ResourceFields]:
+        return self.get(field.split(".", 1)[0])
+
+    def _check_field(self, field: str, kind: str, problems: List[str]) -> None:
+        fields = self._fields_of(field)
+        if fields is not None and field in getattr(fields, kind):
+            return
+        if fields is None or not any(field in f for f in fields):
+            message = f"Unknown field '{field}'."
+            candidates = fields.selectable if fields else ()
+        else:
+            message = f"Field '{field}' is not {kind}."
+            candidates = getattr(fields, kind)
+        matches = difflib.get_close_matches(field, candidates, n=3)
+        if matches:
+            message += f" Did you mean {', '.join(matches)}?"
+        problems.append(message)
+
+    def validate(self, query: gaql.Query) -> None:
+        """Checks that a query only uses existing resources and fields.
+
+        An empty catalog accepts every query.
+
+        Raises:
+            InvalidQueryError: listing every problem found in the query.
+        """
+        if not self._resources:
+            return
+        problems = []
+        if query.resource not in self._resources:
+            message = f"Unknown resource '{query.resource}'."
+            matches = difflib.get_close_matches(
+                query.resource, self._resources, n=3
+            )
+            if matches:
+                message += f" Did you mean {', '.join(matches)}?"
+            problems.append(message)
+        for field in query.fields:
+            self._check_field(field, "selectable", problems)
+        for condition in query.conditions:
+            self._check_field(condition.field, "filterable", problems)
+        for ordering in query.orderings:
+            self._check_field(ordering.field, "sortable", problems)
+        if problems:
+            raise InvalidQueryError(problems)
+
+
+_COMPILED_MAGIC = b"GAQLCAT\0"
+_COMPILED_VERSION = 1
+# Magic, format version, marshal version and SHA-256 of the JSON source.
+_COMPILED_HEADER = struct.Struct(f"<{len(_COMPILED_MAGIC)}sHH32s")
+
+
+def _read_bytes(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def compile_resource_file(
+    source_path: Optional[str] = None, compiled_path: Optional[str] = None
+) -> None:
+    """Writes the precompiled catalog of a JSON resource file.
+
+    Args:
+        source_path: the JSON resource file, by default
+            `utils.GAQL_FILEPATH`.
+        compiled_path: where to write the precompiled catalog, by default
+            `utils.GAQL_COMPILED_FILEPATH`.
+    """
+    source_path = source_path or utils.GAQL_FILEPATH
+    compiled_path = compiled_path or utils.GAQL_COMPILED_FILEPATH
+    with open(source_path, "rb") as file:
+        source = file.read()
+    # Each resource is dumped separately so that it can be decoded on first
+    # use. Interned names are shared between the sets of a resource, and
+    # marshal writes each shared string once.
+    resources = {
+        record["resource"]: marshal.dumps(
+            tuple(
+                frozenset(sys.intern(field) for field in record[kind])
+                for kind in ResourceFields._fields
+            )
+        )
+        for record in json.loads(source)
+    }
+    header = _COMPILED_HEADER.pack(
+        _COMPILED_MAGIC,
+        _COMPILED_VERSION,
+        marshal.version,
+        hashlib.sha256(source).digest(),
+    )
+    with open(compiled_path, "wb") as file:
+        file.write(header + marshal.dumps(resources))
+
+
+def _load_compiled(
+    compiled: bytes, source: Optional[bytes]
+) -> Optional[FieldCatalog]:
+    """Returns the precompiled catalog, or None if it can't be used."""
+    if len(compiled) < _COMPILED_HEADER.size:
+        return None
+    magic, version, marshal_version, digest = _COMPILED_HEADER.unpack_from(
+        compiled
+    )
+    if (
+        magic != _COMPILED_MAGIC
+        or version != _COMPILED_VERSION
+        or marshal_version != marshal.version
+    ):
+        return None
+    if source is not None and digest != hashlib.sha256(source).digest():
+        utils.logger.warning(
+            "The precompiled GAQL field catalog is out of date"
+        )
+        return None
+    return FieldCatalog(
+        marshal.loads(memoryview(compiled)[_COMPILED_HEADER.size :])
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_catalog() -> FieldCatalog:
+    """Returns the catalog of the resource file.
+
+    The catalog is loaded on the first call only, from the precompiled copy
+    if it is up to date. If the resource file can't be read either, an empty
+    catalog is returned, which disables query validation.
+    """
+    source = _read_bytes(utils.GAQL_FILEPATH)
+    compiled = _read_bytes(utils.GAQL_COMPILED_FILEPATH)
+    if compiled is not None:
+        try:
+            field_catalog = _load_compiled(compiled, source)
+        except (ValueError, EOFError, TypeError) as e:
+            utils.logger.warning(
+                f"Failed to load the precompiled GAQL field catalog: {e}"
+            )
+            field_catalog = None
+        if field_catalog is not None:
+            return field_catalog
+
+    try:
+        if source is None:
+            raise OSError(f"Can't read {utils.GAQL_FILEPATH}")
+        return FieldCatalog.from_records(json.loads(source))
+    except (OSError, ValueError, KeyError) as e:
+        utils.logger.error(f"Failed to load the GAQL field catalog: {e}")
+        return FieldCatalog({})
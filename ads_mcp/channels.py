@@ -0,0 +1,452 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pooled, configurable gRPC channels for the Google Ads API services.
+
+Every service client returned by `utils.get_googleads_service` sends its
+calls through one ChannelPool. The pool spreads calls over several channels,
+so one large stream doesn't hold up the calls behind it on the same HTTP/2
+connection, and its channels are created with the keepalive, message size
+and compression settings below.
+
+Settings are read from the `grpc_channel` section of google-ads.yaml, at
+GOOGLE_ADS_CONFIGURATION_FILE_PATH or in the home directory, and from
+environment variables, which take precedence:
+
+  grpc_channel:
+    pool_size: 4                  # GOOGLE_ADS_MCP_CHANNEL_POOL_SIZE
+    pool_policy: least_loaded     # GOOGLE_ADS_MCP_CHANNEL_POOL_POLICY
+    keepalive_time_seconds: 120   # GOOGLE_ADS_MCP_KEEPALIVE_TIME_SECONDS
+    keepalive_timeout_seconds: 20 # GOOGLE_ADS_MCP_KEEPALIVE_TIMEOUT_SECONDS
+    keepalive_without_calls: no   # GOOGLE_ADS_MCP_KEEPALIVE_WITHOUT_CALLS
+    max_receive_message_mb: 64    # GOOGLE_ADS_MCP_MAX_RECEIVE_MESSAGE_MB
+    compression: gzip             # GOOGLE_ADS_MCP_GRPC_COMPRESSION
+"""
+
+import inspect
+import itertools
+import logging
+import os
+import threading
+from importlib import import_module, metadata
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import grpc
+import yaml
+from google.ads.googleads import util
+from google.ads.googleads.client import GoogleAdsClient
+from google.ads.googleads.interceptors import (
+    ExceptionInterceptor,
+    LoggingInterceptor,
+    MetadataInterceptor,
+)
+from google.ads.googleads.v21.services.services.google_ads_service import (
+    GoogleAdsServiceClient,
+)
+from google.api_core.gapic_v1.client_info import ClientInfo
+
+import ads_mcp.utils as utils
+
+ROUND_ROBIN = "round_robin"
+LEAST_LOADED = "least_loaded"
+_POLICIES = (ROUND_ROBIN, LEAST_LOADED)
+
+_COMPRESSIONS = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+}
+
+# Bits of the encodings a channel accepts in responses, see
+# grpc_compression_algorithm in the gRPC core library.
+_IDENTITY_ENCODING = 1
+_ALL_ENCODINGS = 0b111
+
+# The same metadata size limit as the client library's channels.
+_MAX_METADATA_SIZE = 16 * 1024 * 1024
+
+# The default version of the client library, used when neither the client
+# nor the caller ask for one.
+_DEFAULT_API_VERSION = (
+    inspect.signature(GoogleAdsClient.get_service).parameters["version"].default
+)
+
+# The logger of the client library, which logs the API calls.
+_library_logger = logging.getLogger("google.ads.googleads.client")
+
+try:
+    _CLIENT_INFO = ClientInfo(
+        client_library_version=metadata.version("google-ads")
+    )
+except metadata.PackageNotFoundError:
+    _CLIENT_INFO = ClientInfo()
+
+
+class ChannelSettings(NamedTuple):
+    """How the channels of the pool are created and used."""
+
+    pool_size: int = 1
+    pool_policy: str = ROUND_ROBIN
+    # 0 leaves keepalive pings off, as gRPC does by default.
+    keepalive_time_seconds: float = 0.0
+    keepalive_timeout_seconds: float = 20.0
+    keepalive_without_calls: bool = False
+    max_receive_message_mb: int = 64
+    compression: str = "none"
+
+    def options(self) -> List[Tuple[str, Any]]:
+        """Returns the gRPC channel arguments of these settings."""
+        options = [
+            ("grpc.max_metadata_size", _MAX_METADATA_SIZE),
+            (
+                "grpc.max_receive_message_length",
+                int(self.max_receive_message_mb * 1024 * 1024),
+            ),
+            (
+                "grpc.compression_enabled_algorithms_bitset",
+                (
+                    _IDENTITY_ENCODING
+                    if self.compression == "none"
+                    else _ALL_ENCODINGS
+                ),
+            ),
+            # Keeps the channels of the pool on separate connections.
+            ("grpc.use_local_subchannel_pool", 1),
+        ]
+        if self.keepalive_time_seconds > 0:
+            options += [
+                (
+                    "grpc.keepalive_time_ms",
+                    int(self.keepalive_time_seconds * 1000),
+                ),
+                (
+                    "grpc.keepalive_timeout_ms",
+                    int(self.keepalive_timeout_seconds * 1000),
+                ),
+                (
+                    "grpc.keepalive_permit_without_calls",
+                    int(self.keepalive_without_calls),
+                ),
+            ]
+        return options
+
+    def compression_algorithm(self) -> grpc.Compression:
+        return _COMPRESSIONS[self.compression]
+
+
+def _config_file_path() -> str:
+    return os.environ.get(
+        "GOOGLE_ADS_CONFIGURATION_FILE_PATH",
+        os.path.join(os.path.expanduser("~"), "google-ads.yaml"),
+    )
+
+
+def _load_yaml_settings(path: str) -> Dict[str, Any]:
+    """Returns the `grpc_channel` section of a google-ads.yaml file."""
+    try:
+        with open(path) as f:
+            config = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return {}
+    except (OSError, yaml.YAMLError) as e:
+        utils.logger.warning(f"Ignoring unreadable {path}: {e}")
+        return {}
+    section = config.get("grpc_channel") if isinstance(config, dict) else None
+    if section is None:
+        return {}
+    if not isinstance(section, dict):
+        utils.logger.warning(f"Ignoring invalid grpc_channel section of {path}")
+        return {}
+    return section
+
+
+def load_settings(path: Optional[str] = None) -> ChannelSettings:
+    """Returns the channel settings of the yaml file and the environment."""
+    defaults = ChannelSettings()
+    values = defaults._asdict()
+    for key, value in _load_yaml_settings(path or _config_file_path()).items():
+        if key not in values:
+            utils.logger.warning(f"Ignoring unknown grpc_channel setting {key}")
+            continue
+        try:
+            values[key] = type(getattr(defaults, key))(value)
+        except (TypeError, ValueError):
+            utils.logger.warning(
+                f"Ignoring invalid grpc_channel setting {key}: {value}"
+            )
+    values["pool_size"] = max(
+        1,
+        utils.get_int_env(
+            "GOOGLE_ADS_MCP_CHANNEL_POOL_SIZE", values["pool_size"]
+        ),
+    )
+    values["pool_policy"] = (
+        os.environ.get("GOOGLE_ADS_MCP_CHANNEL_POOL_POLICY")
+        or values["pool_policy"]
+    ).lower()
+    values["keepalive_time_seconds"] = utils.get_float_env(
+        "GOOGLE_ADS_MCP_KEEPALIVE_TIME_SECONDS",
+        values["keepalive_time_seconds"],
+    )
+    values["keepalive_timeout_seconds"] = utils.get_float_env(
+        "GOOGLE_ADS_MCP_KEEPALIVE_TIMEOUT_SECONDS",
+        values["keepalive_timeout_seconds"],
+    )
+    values["keepalive_without_calls"] = utils.get_bool_env(
+        "GOOGLE_ADS_MCP_KEEPALIVE_WITHOUT_CALLS",
+        values["keepalive_without_calls"],
+    )
+    values["max_receive_message_mb"] = utils.get_int_env(
+        "GOOGLE_ADS_MCP_MAX_RECEIVE_MESSAGE_MB",
+        values["max_receive_message_mb"],
+    )
+    values["compression"] = (
+        os.environ.get("GOOGLE_ADS_MCP_GRPC_COMPRESSION")
+        or values["compression"]
+    ).lower()
+    if values["pool_policy"] not in _POLICIES:
+        utils.logger.warning(
+            f"Ignoring unknown channel pool policy {values['pool_policy']}"
+        )
+        values["pool_policy"] = defaults.pool_policy
+    if values["compression"] not in _COMPRESSIONS:
+        utils.logger.warning(
+            f"Ignoring unknown gRPC compression {values['compression']}"
+        )
+        values["compression"] = defaults.compression
+    return ChannelSettings(**values)
+
+
+class _PooledUnaryUnary(grpc.UnaryUnaryMultiCallable):
+    """Sends each call of a unary method on a channel picked by the pool."""
+
+    def __init__(self, pool: "ChannelPool", method: str, args: tuple):
+        self._pool = pool
+        self._method = method
+        self._args = args
+
+    def __call__(self, request, *args, **kwargs):
+        index, callable_ = self._pool._pick(
+            "unary_unary", self._method, self._args
+        )
+        try:
+            return callable_(request, *args, **kwargs)
+        finally:
+            self._pool._release(index)
+
+    def with_call(self, request, *args, **kwargs):
+        index, callable_ = self._pool._pick(
+            "unary_unary", self._method, self._args
+        )
+        try:
+            return callable_.with_call(request, *args, **kwargs)
+        finally:
+            self._pool._release(index)
+
+    def future(self, request, *args, **kwargs):
+        index, callable_ = self._pool._pick(
+            "unary_unary", self._method, self._args
+        )
+        try:
+            future = callable_.future(request, *args, **kwargs)
+        except BaseException:
+            self._pool._release(index)
+            raise
+        future.add_done_callback(lambda _: self._pool._release(index))
+        return future
+
+
+class _PooledUnaryStream(grpc.UnaryStreamMultiCallable):
+    """Sends each call of a streaming method on a channel picked by the pool.
+
+    The channel counts as loaded until the stream ends.
+    """
+
+    def __init__(self, pool: "ChannelPool", method: str, args: tuple):
+        self._pool = pool
+        self._method = method
+        self._args = args
+
+    def __call__(self, request, *args, **kwargs):
+        index, callable_ = self._pool._pick(
+            "unary_stream", self._method, self._args
+        )
+        try:
+            call = callable_(request, *args, **kwargs)
+        except BaseException:
+            self._pool._release(index)
+            raise
+        if not call.add_callback(lambda: self._pool._release(index)):
+            self._pool._release(index)
+        return call
+
+
+class ChannelPool(grpc.Channel):
+    """A channel that sends every call on one of several channels.
+
+    With the round_robin policy, calls take the channels in turn. With
+    least_loaded, they take the channel with the fewest calls in flight.
+    Client streaming methods, which the Google Ads API doesn't have, take
+    the channels in turn.
+    """
+
+    def __init__(self, channels: List[grpc.Channel], policy: str = ROUND_ROBIN):
+        if not channels:
+            raise ValueError("A channel pool needs at least one channel")
+        if policy not in _POLICIES:
+            raise ValueError(f"Unknown channel pool policy: {policy}")
+        self._channels = channels
+        self._policy = policy
+        self._loads = [0] * len(channels)
+        self._turns = itertools.count()
+        self._lock = threading.Lock()
+        self._callables: Dict[tuple, Any] = {}
+
+    @property
+    def loads(self) -> List[int]:
+        """The number of calls in flight on each channel."""
+        with self._lock:
+            return list(self._loads)
+
+    def _next_index(self) -> int:
+        turn = next(self._turns) % len(self._channels)
+        if self._policy == ROUND_ROBIN:
+            return turn
+        # Start from the turn so that ties are spread over the channels.
+        with self._lock:
+            return min(
+                range(turn, turn + len(self._channels)),
+                key=lambda i: self._loads[i % len(self._channels)],
+            ) % len(self._channels)
+
+    def _pick(self, kind: str, method: str, args: tuple) -> Tuple[int, Any]:
+        """Returns a channel index, counted as loaded, and its multicallable."""
+        index = self._next_index()
+        with self._lock:
+            self._loads[index] += 1
+        key = (index, kind, method, args)
+        callable_ = self._callables.get(key)
+        if callable_ is None:
+            callable_ = getattr(self._channels[index], kind)(method, *args)
+            self._callables[key] = callable_
+        return index, callable_
+
+    def _release(self, index: int) -> None:
+        with self._lock:
+            self._loads[index] -= 1
+
+    def unary_unary(
+        self,
+        method,
+        request_serializer=None,
+        response_deserializer=None,
+        _registered_method=False,
+    ):
+        return _PooledUnaryUnary(
+            self,
+            method,
+            (request_serializer, response_deserializer, _registered_method),
+        )
+
+    def unary_stream(
+        self,
+        method,
+        request_serializer=None,
+        response_deserializer=None,
+        _registered_method=False,
+    ):
+        return _PooledUnaryStream(
+            self,
+            method,
+            (request_serializer, response_deserializer, _registered_method),
+        )
+
+    def stream_unary(self, method, *args, **kwargs):
+        channel = self._channels[next(self._turns) % len(self._channels)]
+        return channel.stream_unary(method, *args, **kwargs)
+
+    def stream_stream(self, method, *args, **kwargs):
+        channel = self._channels[next(self._turns) % len(self._channels)]
+        return channel.stream_stream(method, *args, **kwargs)
+
+    def subscribe(self, callback, try_to_connect=False):
+        for channel in self._channels:
+            channel.subscribe(callback, try_to_connect)
+
+    def unsubscribe(self, callback):
+        for channel in self._channels:
+            channel.unsubscribe(callback)
+
+    def close(self):
+        for channel in self._channels:
+            channel.close()
+
+
+def create_pool(
+    client: GoogleAdsClient, settings: ChannelSettings
+) -> ChannelPool:
+    """Creates a channel pool with the credentials and endpoint of a client."""
+    # Every service of every API version shares the host and scopes of the
+    # GoogleAdsService transport.
+    transport_class = GoogleAdsServiceClient.get_transport_class()
+    endpoint = client.endpoint or GoogleAdsServiceClient.DEFAULT_ENDPOINT
+    return ChannelPool(
+        [
+            transport_class.create_channel(
+                host=endpoint,
+                credentials=client.credentials,
+                options=settings.options(),
+                compression=settings.compression_algorithm(),
+            )
+            for _ in range(settings.pool_size)
+        ],
+        settings.pool_policy,
+    )
+
+
+def create_service(
+    client: GoogleAdsClient,
+    pool: ChannelPool,
+    name: str,
+    version: Optional[str] = None,
+    interceptors: Optional[List[Any]] = None,
+) -> Any:
+    """Returns a client of service `name` sending its calls through `pool`.
+
+    The client gets the same interceptors as the ones returned by
+    `GoogleAdsClient.get_service`, after `interceptors`.
+    """
+    version = client.version or version or _DEFAULT_API_VERSION
+    module = import_module(
+        f"google.ads.googleads.{version}.services.services."
+        f"{util.convert_upper_case_to_snake_case(name)}"
+    )
+    service_client_class = getattr(module, f"{name}Client")
+    endpoint = client.endpoint or service_client_class.DEFAULT_ENDPOINT
+    channel = grpc.intercept_channel(
+        pool,
+        *(interceptors or []),
+        MetadataInterceptor(
+            client.developer_token,
+            client.login_customer_id,
+            client.linked_customer_id,
+            client.use_cloud_org_for_api_access,
+            gaada=client.gaada,
+        ),
+        LoggingInterceptor(_library_logger, version, endpoint),
+        ExceptionInterceptor(version, use_proto_plus=client.use_proto_plus),
+    )
+    transport = service_client_class.get_transport_class()(
+        channel=channel, client_info=_CLIENT_INFO
+    )
+    return service_client_class(transport=transport)
@@ -0,0 +1,242 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""API clients of the tenants served by one process.
+
+A tenant is the developer token, login customer and credentials API calls
+are made with. Each tenant gets its own GoogleAdsClient, service clients and
+channel pool, created on first use and kept in a ClientPool. Once the pool
+holds more tenants than its limit, the least recently used tenants without
+calls in flight are evicted and their channels closed.
+
+The login customer of the calls of a tool call can be overridden with
+`login_customer`, which the tools do with their `login_customer_id`
+argument.
+"""
+
+import collections
+import contextlib
+import contextvars
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from google.ads.googleads.client import GoogleAdsClient
+from google.auth.credentials import Credentials
+
+from ads_mcp import channels
+import ads_mcp.utils as utils
+
+_DEFAULT_MAX_CLIENTS = 16
+
+
+def max_clients() -> int:
+    """Returns how many tenants a process keeps clients for.
+
+    Set with GOOGLE_ADS_MCP_MAX_CLIENTS (default 16).
+    """
+    return max(
+        1, utils.get_int_env("GOOGLE_ADS_MCP_MAX_CLIENTS", _DEFAULT_MAX_CLIENTS)
+    )
+
+
+class ClientKey(NamedTuple):
+    """What API calls are made as."""
+
+    developer_token: str
+    login_customer_id: Optional[str]
+    credentials_id: str
+
+
+def credentials_identity(credentials: Credentials) -> str:
+    """Returns a string telling the principal of `credentials` apart.
+
+    Service accounts are told apart by their email, user credentials by
+    their OAuth client and refresh token, other credentials by instance.
+    """
+    email = getattr(credentials, "service_account_email", None)
+    if isinstance(email, str) and email != "default":
+        return f"{type(credentials).__name__}:{email}"
+    client_id = getattr(credentials, "client_id", None)
+    refresh_token = getattr(credentials, "refresh_token", None)
+    if client_id and refresh_token:
+        digest = hashlib.sha256(refresh_token.encode()).hexdigest()[:16]
+        return f"{type(credentials).__name__}:{client_id}:{digest}"
+    return f"{type(credentials).__name__}:{id(credentials)}"
+
+
+# The login customer of the tool call being run, if it overrides the one of
+# the environment.
+_login_customer_id: contextvars.ContextVar[Optional[str]] = (
+    contextvars.ContextVar("ads_mcp_login_customer_id", default=None)
+)
+
+
+def login_customer_override() -> Optional[str]:
+    """Returns the login customer set by `login_customer`, if any."""
+    return _login_customer_id.get()
+
+
+@contextlib.contextmanager
+def login_customer(login_customer_id: Optional[str]) -> Iterator[None]:
+    """Makes the API calls of the context as `login_customer_id`.
+
+    A `login_customer_id` of None keeps the current login customer.
+    """
+    if not login_customer_id:
+        yield
+        return
+    reset = _login_customer_id.set(str(login_customer_id).replace("-", ""))
+    try:
+        yield
+    finally:
+        _login_customer_id.reset(reset)
+
+
+class _Tenant:
+    """The client of a tenant and the service clients built on it."""
+
+    def __init__(self, client: GoogleAdsClient):
+        self.client = client
+        self._lock = threading.Lock()
+        self._channel_pool: Optional["channels.ChannelPool"] = None
+        self._services: Dict[tuple, Any] = {}
+
+    def service(
+        self,
+        name: str,
+        version: Optional[str],
+        interceptors: List[Any],
+        settings: "channels.ChannelSettings",
+    ) -> Any:
+        """Returns the client of a service, creating it on first use."""
+        key = (name, self.client.version or version)
+        service = self._services.get(key)
+        if service is None:
+            with self._lock:
+                service = self._services.get(key)
+                if service is None:
+                    if self._channel_pool is None:
+                        self._channel_pool = channels.create_pool(
+                            self.client, settings
+                        )
+                    service = channels.create_service(
+                        self.client,
+                        self._channel_pool,
+                        name,
+                        version,
+                        interceptors=interceptors,
+                    )
+                    self._services[key] = service
+        return service
+
+    def idle(self) -> bool:
+        """Returns whether none of the channels has calls in flight."""
+        with self._lock:
+            pool = self._channel_pool
+        return pool is None or not any(pool.loads)
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._channel_pool = self._channel_pool, None
+            self._services = {}
+        if pool is not None:
+            pool.close()
+
+
+class ClientPool:
+    """The tenants of the process, with least recently used eviction.
+
+    Tenants with calls in flight are never evicted, so the pool may hold
+    more than `max_clients` tenants while they are busy.
+    """
+
+    def __init__(
+        self,
+        create_client: Callable[[ClientKey], GoogleAdsClient],
+        max_clients: int = _DEFAULT_MAX_CLIENTS,
+        settings: Optional["channels.ChannelSettings"] = None,
+    ):
+        self._create_client = create_client
+        self.max_clients = max(1, max_clients)
+        self._settings = settings
+        self._lock = threading.Lock()
+        # Serializes the creation of clients, which may fetch tokens.
+        self._create_lock = threading.Lock()
+        self._tenants: "collections.OrderedDict[ClientKey, _Tenant]" = (
+            collections.OrderedDict()
+        )
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tenants)
+
+    def _tenant(self, key: ClientKey) -> _Tenant:
+        with self._lock:
+            tenant = self._tenants.get(key)
+            if tenant is not None:
+                self._tenants.move_to_end(key)
+                return tenant
+        with self._create_lock:
+            with self._lock:
+                tenant = self._tenants.get(key)
+            if tenant is None:
+                tenant = _Tenant(self._create_client(key))
+                with self._lock:
+                    self._tenants[key] = tenant
+                self._evict()
+        return tenant
+
+    def _evict(self) -> None:
+        """Closes idle tenants, least recently used first, over the limit."""
+        evicted = []
+        with self._lock:
+            excess = len(self._tenants) - self.max_clients
+            # The most recently used tenant is the one just requested.
+            for key in list(self._tenants)[:-1]:
+                if excess <= 0:
+                    break
+                if self._tenants[key].idle():
+                    evicted.append(self._tenants.pop(key))
+                    excess -= 1
+            self.evictions += len(evicted)
+        for tenant in evicted:
+            tenant.close()
+
+    def client(self, key: ClientKey) -> GoogleAdsClient:
+        """Returns the GoogleAdsClient of a tenant."""
+        return self._tenant(key).client
+
+    def service(
+        self,
+        key: ClientKey,
+        name: str,
+        version: Optional[str] = None,
+        interceptors: Optional[List[Any]] = None,
+    ) -> Any:
+        """Returns the client of a service for a tenant."""
+        if self._settings is None:
+            self._settings = channels.load_settings()
+        return self._tenant(key).service(
+            name, version, interceptors or [], self._settings
+        )
+
+    def close(self) -> None:
+        """Closes the channels of every tenant."""
+        with self._lock:
+            tenants = list(self._tenants.values())
+            self._tenants.clear()
+        for tenant in tenants:
+            tenant.close()
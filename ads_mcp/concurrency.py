@@ -0,0 +1,51 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Concurrency limits shared by the tools."""
+
+import contextlib
+import threading
+from typing import Dict, Hashable, Iterator
+
+
+class KeyedSemaphore:
+    """Limits how many holders may hold the same key at once.
+
+    Unlike a dict of semaphores, keys take no memory while nobody holds them,
+    so the number of distinct keys (e.g. customer ids) is not a concern.
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        self.limit = limit
+        self._cond = threading.Condition()
+        self._holders: Dict[Hashable, int] = {}
+
+    @contextlib.contextmanager
+    def hold(self, key: Hashable) -> Iterator[None]:
+        """Holds `key` for the duration of the context, waiting if needed."""
+        with self._cond:
+            while self._holders.get(key, 0) >= self.limit:
+                self._cond.wait()
+            self._holders[key] = self._holders.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                if self._holders[key] == 1:
+                    del self._holders[key]
+                else:
+                    self._holders[key] -= 1
+                self._cond.notify_all()
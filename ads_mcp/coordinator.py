@@ -19,6 +19,54 @@ server using `@mcp.tool` annotations, thereby 'coordinating' the bootstrapping
 of the server.
 """
 
+from typing import Any, Dict
+
 from mcp.server.fastmcp import FastMCP
+from mcp.types import CallToolResult, TextContent
+
+from ads_mcp import metrics
+from ads_mcp import tracing
+
+
+def _serialized_bytes(result: Any) -> int:
+    """Returns the size of the MCP content a tool result was converted to.
+
+    Text content is counted by its UTF-8 text and other content by its JSON.
+    The structured content sent along is a copy of the same data, which
+    isn't serialized again to be measured.
+    """
+    if isinstance(result, CallToolResult):
+        result = result.content
+    elif isinstance(result, tuple):
+        result = result[0]
+    if not isinstance(result, (list, tuple)):
+        return 0
+    size = 0
+    for block in result:
+        if isinstance(block, TextContent):
+            size += len(block.text.encode())
+        else:
+            size += len(block.model_dump_json(by_alias=True))
+    return size
+
+
+class _TracedFastMCP(FastMCP):
+    """Runs each tool call in a tracing span and measures its result.
+
+    The span also covers the conversion of the result of the tool to MCP
+    content, which is the time it spends outside the span of the tool. The
+    size of that content is recorded as the serialized bytes of the tool.
+    """
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        with tracing.span("ads_mcp.call_tool", tool=name) as span:
+            result = await super().call_tool(name, arguments)
+            serialized_bytes = _serialized_bytes(result)
+            span.set_attribute("bytes", serialized_bytes)
+            metrics.get_tool_metrics().add_serialized_bytes(
+                name, serialized_bytes
+            )
+            return result
+
 
-mcp = FastMCP("Google Ads Server")
+mcp = _TracedFastMCP("Google Ads Server")
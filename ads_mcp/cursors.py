@@ -0,0 +1,232 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Registry of open result cursors used for paged delivery of search results.
+
+A cursor wraps a live row iterator (typically a generator draining a
+`search_stream` call) so that a follow-up tool call can continue reading from
+where the previous page stopped. Cursors are held in a bounded registry and
+evicted after a period of inactivity; evicting a cursor closes its iterator,
+which in turn cancels the underlying gRPC stream.
+"""
+
+import collections
+import secrets
+import threading
+import time
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+import ads_mcp.utils as utils
+
+_DEFAULT_MAX_CURSORS = 32
+_DEFAULT_TTL_SECONDS = 300.0
+
+
+class CursorNotFoundError(ValueError):
+    """Raised when a cursor is unknown, expired or was already exhausted."""
+
+
+class _OpenCursor:
+    """An open cursor: the remaining rows plus one row of lookahead."""
+
+    __slots__ = ("rows", "page_size", "owner", "lookahead", "last_access")
+
+    _NO_ROW = object()
+
+    def __init__(
+        self, rows: Iterator[Any], page_size: int, owner: Any, now: float
+    ):
+        self.rows = rows
+        self.page_size = page_size
+        self.owner = owner
+        self.lookahead = self._NO_ROW
+        self.last_access = now
+
+    def read(self, page_size: int) -> Tuple[List[Any], bool]:
+        """Reads up to `page_size` rows.
+
+        Returns:
+            The rows read and whether more rows remain after them.
+        """
+        page = []
+        if self.lookahead is not self._NO_ROW:
+            page.append(self.lookahead)
+            self.lookahead = self._NO_ROW
+        for row in self.rows:
+            if len(page) == page_size:
+                # Keep the extra row so that an exactly-exhausted stream does
+                # not hand out a cursor that only leads to an empty page.
+                self.lookahead = row
+                return page, True
+            page.append(row)
+        return page, False
+
+    def close(self) -> None:
+        close = getattr(self.rows, "close", None)
+        if close is not None:
+            close()
+
+
+class CursorRegistry:
+    """A bounded, TTL-evicted registry of open cursors.
+
+    The registry holds at most `max_cursors` cursors. Opening a cursor beyond
+    that limit evicts the least recently used one, and cursors not read for
+    `ttl_seconds` are evicted on the next registry access.
+    """
+
+    def __init__(
+        self,
+        max_cursors: int = _DEFAULT_MAX_CURSORS,
+        ttl_seconds: float = _DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_cursors < 1:
+            raise ValueError("max_cursors must be at least 1")
+        self._max_cursors = max_cursors
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cursors: "collections.OrderedDict[str, _OpenCursor]" = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cursors)
+
+    def open(
+        self, rows: Iterator[Any], page_size: int, owner: Any = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Reads the first page of `rows` and registers a cursor for the rest.
+
+        Args:
+            rows: the row iterator to page through.
+            page_size: the maximum number of rows to return.
+            owner: an opaque value that must be presented again when the
+                cursor is resumed, e.g. the customer id the rows belong to.
+
+        Returns:
+            The first page of rows and the cursor for the next page, or None
+            if `rows` was exhausted.
+        """
+        cursor = _OpenCursor(rows, page_size, owner, self._clock())
+        return self._read(secrets.token_urlsafe(16), cursor, page_size)
+
+    def fetch(
+        self, token: str, page_size: Optional[int] = None, owner: Any = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Reads the next page from the cursor identified by `token`.
+
+        The page size defaults to the one the cursor was opened with.
+
+        Raises:
+            CursorNotFoundError: if the cursor is unknown or has expired, or
+                if `owner` does not match the owner it was opened with.
+        """
+        evicted = []
+        with self._lock:
+            evicted.extend(self._pop_expired())
+            cursor = self._cursors.get(token)
+            if cursor is not None and cursor.owner == owner:
+                # Take the cursor out of the registry while it is being read
+                # so that concurrent calls with the same token can't interleave.
+                del self._cursors[token]
+            else:
+                cursor = None
+        self._close_all(evicted)
+        if cursor is None:
+            raise CursorNotFoundError(
+                f"Cursor {token!r} is unknown, expired or already exhausted"
+            )
+        return self._read(token, cursor, page_size)
+
+    def close(self, token: str) -> bool:
+        """Closes the cursor identified by `token`.
+
+        Returns:
+            True if the cursor was open.
+        """
+        with self._lock:
+            cursor = self._cursors.pop(token, None)
+        if cursor is None:
+            return False
+        cursor.close()
+        return True
+
+    def close_all(self) -> None:
+        """Closes every open cursor."""
+        with self._lock:
+            cursors = list(self._cursors.values())
+            self._cursors.clear()
+        self._close_all(cursors)
+
+    def _read(
+        self, token: str, cursor: _OpenCursor, page_size: Optional[int]
+    ) -> Tuple[List[Any], Optional[str]]:
+        try:
+            page, has_more = cursor.read(page_size or cursor.page_size)
+        except BaseException:
+            cursor.close()
+            raise
+        if not has_more:
+            cursor.close()
+            return page, None
+
+        evicted = []
+        with self._lock:
+            cursor.last_access = self._clock()
+            self._cursors[token] = cursor
+            evicted.extend(self._pop_expired())
+            while len(self._cursors) > self._max_cursors:
+                evicted.append(self._cursors.popitem(last=False)[1])
+        self._close_all(evicted)
+        return page, token
+
+    def _pop_expired(self) -> List[_OpenCursor]:
+        """Removes and returns expired cursors. Must hold `self._lock`."""
+        deadline = self._clock() - self._ttl_seconds
+        expired = []
+        # Cursors are kept in access order, so the oldest come first.
+        while self._cursors:
+            token, cursor = next(iter(self._cursors.items()))
+            if cursor.last_access > deadline:
+                break
+            del self._cursors[token]
+            expired.append(cursor)
+        return expired
+
+    @staticmethod
+    def _close_all(cursors: List[_OpenCursor]) -> None:
+        for cursor in cursors:
+            try:
+                cursor.close()
+            except Exception:
+                utils.logger.warning("Error closing cursor", exc_info=True)
+
+
+def create_registry() -> CursorRegistry:
+    """Returns a registry configured from the environment.
+
+    GOOGLE_ADS_MCP_MAX_CURSORS bounds the number of open cursors and
+    GOOGLE_ADS_MCP_CURSOR_TTL_SECONDS sets the idle time before one is evicted.
+    """
+    return CursorRegistry(
+        max_cursors=utils.get_int_env(
+            "GOOGLE_ADS_MCP_MAX_CURSORS", _DEFAULT_MAX_CURSORS
+        ),
+        ttl_seconds=utils.get_float_env(
+            "GOOGLE_ADS_MCP_CURSOR_TTL_SECONDS", _DEFAULT_TTL_SECONDS
+        ),
+    )
@@ -0,0 +1,358 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streaming writers of `search_stream` batches to report files.
+
+Each batch is converted and written as soon as it arrives, so the memory
+used by an export doesn't depend on the size of the report. Reports can be
+written as newline delimited JSON, CSV or Parquet, and the text formats can
+be compressed with gzip or zstd.
+
+Parquet needs the optional `pyarrow` package and zstd compression of text
+formats the optional `zstandard` package.
+"""
+
+import abc
+import csv
+import gzip
+import io
+import json
+import os
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from google.ads.googleads.v21.services.types.google_ads_service import (
+    SearchGoogleAdsStreamResponse,
+)
+from google.protobuf.descriptor import FieldDescriptor
+
+from ads_mcp import projection
+
+FORMATS = ("ndjson", "csv", "parquet")
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+_EXTENSIONS = {"ndjson": ".ndjson", "csv": ".csv", "parquet": ".parquet"}
+_COMPRESSED_EXTENSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+_INTEGER_TYPES = (
+    FieldDescriptor.TYPE_INT32,
+    FieldDescriptor.TYPE_INT64,
+    FieldDescriptor.TYPE_SINT32,
+    FieldDescriptor.TYPE_SINT64,
+    FieldDescriptor.TYPE_SFIXED32,
+    FieldDescriptor.TYPE_SFIXED64,
+)
+_UNSIGNED_TYPES = (
+    FieldDescriptor.TYPE_UINT32,
+    FieldDescriptor.TYPE_UINT64,
+    FieldDescriptor.TYPE_FIXED32,
+    FieldDescriptor.TYPE_FIXED64,
+)
+
+
+def extension(format: str, compression: str) -> str:
+    """Returns the file name extension of a report format."""
+    if format == "parquet":
+        return _EXTENSIONS[format]
+    return _EXTENSIONS[format] + _COMPRESSED_EXTENSIONS[compression]
+
+
+def _column_type(path: projection._CompiledPath) -> str:
+    """Returns the type of the values of a column, as reported to callers."""
+    field = path.field
+    if field is None:
+        return "string"
+    if field.type in _INTEGER_TYPES:
+        name = "int64"
+    elif field.type in _UNSIGNED_TYPES:
+        name = "uint64"
+    elif field.type in (
+        FieldDescriptor.TYPE_DOUBLE,
+        FieldDescriptor.TYPE_FLOAT,
+    ):
+        name = "double"
+    elif field.type == FieldDescriptor.TYPE_BOOL:
+        name = "bool"
+    else:
+        name = "string"
+    if projection._is_repeated(field):
+        return f"list<{name}>"
+    return name
+
+
+class _ReportWriter(abc.ABC):
+    """Base class of the writers of one report file."""
+
+    def __init__(self, file: BinaryIO):
+        self.schema: List[Dict[str, str]] = []
+        self.row_count = 0
+        self._file = file
+        self._paths: Tuple[str, ...] = ()
+        self._fields: Tuple[Optional[FieldDescriptor], ...] = ()
+        self._getters: Tuple[Any, ...] = ()
+
+    def add_batch(self, batch: Any) -> None:
+        """Writes the rows of a `search_stream` batch."""
+        message = getattr(batch, "_pb", batch)
+        projector = projection.get_batch_projector(message)
+        if not self._paths:
+            self._paths = projector.paths
+            self._fields = tuple(p.field for p in projector.compiled_paths)
+            self._getters = tuple(p.getter() for p in projector.compiled_paths)
+            self.schema = [
+                {"name": name, "type": _column_type(path)}
+                for name, path in zip(projector.paths, projector.compiled_paths)
+            ]
+            self._start()
+        elif projector.paths != self._paths:
+            raise ValueError("All batches must have the same field mask")
+        self._write(message.results)
+        self.row_count += len(message.results)
+
+    def _start(self) -> None:
+        """Called with the schema known, before the first rows are written."""
+
+    @abc.abstractmethod
+    def _write(self, rows: Iterable[Any]) -> None:
+        """Writes rows of the report."""
+
+    def close(self) -> None:
+        """Flushes the report. Doesn't close the underlying file."""
+
+
+class _TextWriter(_ReportWriter):
+    """Base class of the writers of, possibly compressed, text formats."""
+
+    def __init__(self, file: BinaryIO, compression: str):
+        super().__init__(file)
+        if compression == "gzip":
+            # No file name in the header, which would be the temporary one.
+            self._stream = gzip.GzipFile(filename="", fileobj=file, mode="wb")
+        elif compression == "zstd":
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ValueError(
+                    "zstd compression needs the zstandard package"
+                ) from e
+            self._stream = zstandard.ZstdCompressor().stream_writer(
+                file, closefd=False
+            )
+        else:
+            self._stream = None
+        self._text = io.TextIOWrapper(
+            self._stream or file, encoding="utf-8", newline=""
+        )
+
+    def close(self) -> None:
+        self._text.flush()
+        self._text.detach()
+        if self._stream is not None:
+            self._stream.close()
+
+
+class _NdjsonWriter(_TextWriter):
+    """Writes one JSON object per row and line."""
+
+    def _write(self, rows: Iterable[Any]) -> None:
+        paths, getters = self._paths, self._getters
+        dumps = json.JSONEncoder(separators=(",", ":")).encode
+        self._text.writelines(
+            dumps({p: get(row) for p, get in zip(paths, getters)}) + "\n"
+            for row in rows
+        )
+
+
+def _csv_value(value: Any) -> Any:
+    # Repeated fields are written as JSON arrays, missing values as "".
+    if isinstance(value, list):
+        return json.dumps(value)
+    return value
+
+
+class _CsvWriter(_TextWriter):
+    """Writes a header row with the field names and one line per row."""
+
+    def _start(self) -> None:
+        self._csv = csv.writer(self._text)
+        self._csv.writerow(self._paths)
+        self._plain = all("list" not in c["type"] for c in self.schema)
+
+    def _write(self, rows: Iterable[Any]) -> None:
+        getters = self._getters
+        if self._plain:
+            self._csv.writerows([get(row) for get in getters] for row in rows)
+        else:
+            self._csv.writerows(
+                [_csv_value(get(row)) for get in getters] for row in rows
+            )
+
+
+def _is_enum(field: Optional[FieldDescriptor]) -> bool:
+    return field is not None and field.type == FieldDescriptor.TYPE_ENUM
+
+
+def _enum_text(value: Any) -> Any:
+    # Enum values unknown to the client library are plain numbers.
+    if isinstance(value, list):
+        return [_enum_text(v) for v in value]
+    return value if isinstance(value, str) else str(value)
+
+
+def _enum_text_getter(get: Any) -> Any:
+    """Returns a getter of the values of an enum column as strings."""
+    return lambda row: _enum_text(get(row))
+
+
+class _ParquetWriter(_ReportWriter):
+    """Writes each batch as a row group of a Parquet file."""
+
+    def __init__(self, file: BinaryIO, compression: str):
+        super().__init__(file)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ValueError("Parquet exports need the pyarrow package") from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._compression = None if compression == "none" else compression
+        self._writer = None
+
+    def _arrow_type(self, column_type: str) -> Any:
+        pa = self._pa
+        if column_type.startswith("list<"):
+            return pa.list_(self._arrow_type(column_type[5:-1]))
+        return {
+            "int64": pa.int64(),
+            "uint64": pa.uint64(),
+            "double": pa.float64(),
+            "bool": pa.bool_(),
+        }.get(column_type, pa.string())
+
+    def _start(self) -> None:
+        self._getters = tuple(
+            _enum_text_getter(get) if _is_enum(field) else get
+            for get, field in zip(self._getters, self._fields)
+        )
+        self._schema = self._pa.schema(
+            [(c["name"], self._arrow_type(c["type"])) for c in self.schema]
+        )
+        self._writer = self._pq.ParquetWriter(
+            self._file, self._schema, compression=self._compression
+        )
+
+    def _write(self, rows: Iterable[Any]) -> None:
+        rows = list(rows)
+        columns = [
+            self._pa.array([get(row) for row in rows], type=field.type)
+            for get, field in zip(self._getters, self._schema)
+        ]
+        self._writer.write_table(
+            self._pa.Table.from_arrays(columns, schema=self._schema)
+        )
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+_WRITERS = {
+    "ndjson": _NdjsonWriter,
+    "csv": _CsvWriter,
+    "parquet": _ParquetWriter,
+}
+
+
+def write_report(
+    batches: Iterable[Any],
+    path: str,
+    format: str = "ndjson",
+    compression: str = "none",
+    fields: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """Writes `search_stream` batches to a report file.
+
+    The report is written to a temporary file next to `path`, which is only
+    renamed to `path` once the whole stream has been written. A stream
+    without batches is written as a report without rows, with the columns
+    of `fields`.
+
+    Args:
+        batches: the SearchGoogleAdsStreamResponse batches, raw or
+            proto-plus.
+        path: the file to write.
+        format: one of FORMATS.
+        compression: one of COMPRESSIONS. Parquet files compress their
+            column chunks with it.
+        fields: the fields selected by the query.
+
+    Returns:
+        The path, format, compression, row count, byte size and schema of
+        the report.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(
+            f"compression must be one of {', '.join(COMPRESSIONS)}"
+        )
+
+    partial_path = path + ".part"
+    try:
+        with open(partial_path, "wb") as file:
+            writer = _WRITERS[format](file, compression)
+            for batch in batches:
+                writer.add_batch(batch)
+            if not writer.schema:
+                empty = SearchGoogleAdsStreamResponse()
+                empty.field_mask.paths.extend(fields)
+                writer.add_batch(empty)
+            writer.close()
+        os.replace(partial_path, path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+    return {
+        "path": path,
+        "format": format,
+        "compression": compression,
+        "rows": writer.row_count,
+        "bytes": os.path.getsize(path),
+        "schema": writer.schema,
+    }
+
+
+def resolve_path(directory: str, path: Optional[str], default_name: str) -> str:
+    """Returns the absolute path of a report inside `directory`.
+
+    Raises:
+        ValueError: if `path` points outside of `directory`.
+    """
+    directory = os.path.realpath(directory)
+    resolved = os.path.realpath(os.path.join(directory, path or default_name))
+    if os.path.commonpath([directory, resolved]) != directory:
+        raise ValueError(f"Reports can only be written to {directory}")
+    os.makedirs(os.path.dirname(resolved), exist_ok=True)
+    return resolved
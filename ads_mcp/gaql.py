@@ -0,0 +1,414 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Parser for the Google Ads Query Language (GAQL).
+
+Queries are tokenized and parsed into an immutable syntax tree following the
+grammar at https://developers.google.com/google-ads/api/docs/query/grammar.
+Every parsed query has a canonical text form, with normalized keyword case,
+spacing and literal quoting, that is also used as the cache key of query
+results. Parsed queries are cached by their raw text, so repeated queries are
+only parsed once.
+"""
+
+import dataclasses
+import functools
+import re
+from typing import Iterator, List, Optional, Tuple, Union
+
+
+class GaqlSyntaxError(ValueError):
+    """Raised when a query doesn't follow the GAQL grammar."""
+
+    def __init__(self, message: str, query: str, position: int):
+        super().__init__(
+            f"Invalid GAQL query: {message} at position {position}: "
+            f"{query[max(0, position - 20):position + 20]!r}"
+        )
+        self.position = position
+
+
+@dataclasses.dataclass(frozen=True)
+class Identifier:
+    """An unquoted literal, e.g. an enum value or a date function."""
+
+    name: str
+
+    def __str__(self) -> str:
+        return self.name
+
+
+Value = Union[str, int, float, Identifier]
+
+
+def format_value(value: Value) -> str:
+    """Returns the GAQL text of a literal value.
+
+    Backslashes are only escaped where they would otherwise start an escape
+    sequence, so that regular expressions such as `\\d+` are sent as given.
+    """
+    if isinstance(value, str):
+        escaped = _BACKSLASH_RE.sub(r"\\\\", value).replace("'", "\\'")
+        return f"'{escaped}'"
+    return str(value)
+
+
+def format_parameters(parameters: Tuple[Tuple[str, Value], ...]) -> str:
+    """Returns the GAQL text of a PARAMETERS clause."""
+    return "PARAMETERS " + ", ".join(
+        f"{name} = {format_value(value)}" for name, value in parameters
+    )
+
+
+# Operators taking a parenthesized list of values.
+LIST_OPERATORS = frozenset(
+    ("IN", "NOT IN", "CONTAINS ANY", "CONTAINS ALL", "CONTAINS NONE")
+)
+# Operators taking no value.
+NULL_OPERATORS = frozenset(("IS NULL", "IS NOT NULL"))
+
+
+@dataclasses.dataclass(frozen=True)
+class Condition:
+    """A `field operator value` condition of the WHERE clause."""
+
+    field: str
+    operator: str
+    values: Tuple[Value, ...] = ()
+
+    def __str__(self) -> str:
+        if self.operator in NULL_OPERATORS:
+            return f"{self.field} {self.operator}"
+        if self.operator in LIST_OPERATORS:
+            values = ", ".join(format_value(v) for v in self.values)
+            return f"{self.field} {self.operator} ({values})"
+        if self.operator == "BETWEEN":
+            low, high = self.values
+            return (
+                f"{self.field} BETWEEN {format_value(low)} "
+                f"AND {format_value(high)}"
+            )
+        return f"{self.field} {self.operator} {format_value(self.values[0])}"
+
+
+@dataclasses.dataclass(frozen=True)
+class Ordering:
+    """A field of the ORDER BY clause and its direction."""
+
+    field: str
+    descending: bool = False
+
+    def __str__(self) -> str:
+        return f"{self.field} {'DESC' if self.descending else 'ASC'}"
+
+
+@dataclasses.dataclass(frozen=True)
+class Query:
+    """A parsed GAQL query."""
+
+    fields: Tuple[str, ...]
+    resource: str
+    conditions: Tuple[Condition, ...] = ()
+    orderings: Tuple[Ordering, ...] = ()
+    limit: Optional[int] = None
+    parameters: Tuple[Tuple[str, Value], ...] = ()
+
+    @functools.cached_property
+    def canonical(self) -> str:
+        """The canonical text of the query."""
+        parts = [f"SELECT {', '.join(self.fields)} FROM {self.resource}"]
+        if self.conditions:
+            parts.append("WHERE " + " AND ".join(map(str, self.conditions)))
+        if self.orderings:
+            parts.append("ORDER BY " + ", ".join(map(str, self.orderings)))
+        if self.limit is not None:
+            parts.append(f"LIMIT {self.limit}")
+        if self.parameters:
+            parts.append(format_parameters(self.parameters))
+        return " ".join(parts)
+
+    def __str__(self) -> str:
+        return self.canonical
+
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    | (?P<number>-?\d+(?:\.\d+)?(?![\w.]))
+    | (?P<operator>!=|>=|<=|=|>|<)
+    | (?P<punctuation>[(),])
+    | (?P<word>[A-Za-z_][\w.]*)
+    """,
+    re.VERBOSE,
+)
+
+_KEYWORDS = frozenset(
+    (
+        "SELECT",
+        "FROM",
+        "WHERE",
+        "AND",
+        "ORDER",
+        "BY",
+        "ASC",
+        "DESC",
+        "LIMIT",
+        "PARAMETERS",
+        "IN",
+        "NOT",
+        "LIKE",
+        "CONTAINS",
+        "ANY",
+        "ALL",
+        "NONE",
+        "IS",
+        "NULL",
+        "DURING",
+        "BETWEEN",
+        "REGEXP_MATCH",
+    )
+)
+
+# Only quotes and backslashes are escaped, other escape sequences such as
+# the `\d` of a regular expression are part of the value.
+_ESCAPE_RE = re.compile(r"\\([\\'\"])")
+_BACKSLASH_RE = re.compile(r"\\(?=[\\'\"]|$)")
+_SPACE_RE = re.compile(r"\s+")
+_LITERAL_RE = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")")
+
+
+@dataclasses.dataclass(frozen=True)
+class _Token:
+    kind: str
+    text: str
+    position: int
+
+    @property
+    def keyword(self) -> Optional[str]:
+        if self.kind == "word" and self.text.upper() in _KEYWORDS:
+            return self.text.upper()
+        return None
+
+
+def _tokenize(query: str) -> Iterator[_Token]:
+    position = 0
+    while position < len(query):
+        match = _TOKEN_RE.match(query, position)
+        if match is None:
+            raise GaqlSyntaxError("unexpected character", query, position)
+        if match.lastgroup != "space":
+            yield _Token(match.lastgroup, match.group(), position)
+        position = match.end()
+
+
+class _Parser:
+    """Recursive descent parser over the tokens of one query."""
+
+    def __init__(self, query: str):
+        self._query = query
+        self._tokens: List[_Token] = list(_tokenize(query))
+        self._index = 0
+
+    def _peek(self) -> Optional[_Token]:
+        if self._index < len(self._tokens):
+            return self._tokens[self._index]
+        return None
+
+    def _error(self, message: str) -> GaqlSyntaxError:
+        token = self._peek()
+        position = token.position if token else len(self._query)
+        return GaqlSyntaxError(message, self._query, position)
+
+    def _next(self, what: str) -> _Token:
+        token = self._peek()
+        if token is None:
+            raise self._error(f"expected {what}")
+        self._index += 1
+        return token
+
+    def _accept(self, keyword: str) -> bool:
+        token = self._peek()
+        if token is not None and token.keyword == keyword:
+            self._index += 1
+            return True
+        return False
+
+    def _expect(self, keyword: str) -> None:
+        if not self._accept(keyword):
+            raise self._error(f"expected {keyword}")
+
+    def _accept_punctuation(self, text: str) -> bool:
+        token = self._peek()
+        if token is not None and token.kind == "punctuation":
+            if token.text == text:
+                self._index += 1
+                return True
+        return False
+
+    def _name(self, what: str) -> str:
+        token = self._peek()
+        if token is None or token.kind != "word" or token.keyword:
+            raise self._error(f"expected {what}")
+        self._index += 1
+        return token.text
+
+    def _value(self) -> Value:
+        token = self._next("a value")
+        if token.kind == "string":
+            return _ESCAPE_RE.sub(r"\1", token.text[1:-1])
+        if token.kind == "number":
+            if "." in token.text:
+                return float(token.text)
+            return int(token.text)
+        if token.kind == "word" and not token.keyword:
+            return Identifier(token.text)
+        self._index -= 1
+        raise self._error("expected a value")
+
+    def _operator(self) -> str:
+        token = self._next("an operator")
+        if token.kind == "operator":
+            return token.text
+        keyword = token.keyword
+        if keyword == "NOT":
+            for negated in ("IN", "LIKE", "REGEXP_MATCH"):
+                if self._accept(negated):
+                    return f"NOT {negated}"
+        elif keyword in ("IN", "LIKE", "REGEXP_MATCH", "DURING", "BETWEEN"):
+            return keyword
+        elif keyword == "CONTAINS":
+            for quantifier in ("ANY", "ALL", "NONE"):
+                if self._accept(quantifier):
+                    return f"CONTAINS {quantifier}"
+        elif keyword == "IS":
+            if self._accept("NOT"):
+                self._expect("NULL")
+                return "IS NOT NULL"
+            self._expect("NULL")
+            return "IS NULL"
+        self._index -= 1
+        raise self._error("expected an operator")
+
+    def _condition(self) -> Condition:
+        field = self._name("a field name")
+        operator = self._operator()
+        if operator in NULL_OPERATORS:
+            values = ()
+        elif operator in LIST_OPERATORS:
+            if not self._accept_punctuation("("):
+                raise self._error("expected (")
+            values = [self._value()]
+            while self._accept_punctuation(","):
+                values.append(self._value())
+            if not self._accept_punctuation(")"):
+                raise self._error("expected )")
+            values = tuple(values)
+        elif operator == "BETWEEN":
+            low = self._value()
+            self._expect("AND")
+            values = (low, self._value())
+        else:
+            values = (self._value(),)
+        return Condition(field, operator, values)
+
+    def _ordering(self) -> Ordering:
+        field = self._name("a field name")
+        if self._accept("DESC"):
+            return Ordering(field, descending=True)
+        self._accept("ASC")
+        return Ordering(field)
+
+    def parse(self) -> Query:
+        self._expect("SELECT")
+        fields = [self._name("a field name")]
+        while self._accept_punctuation(","):
+            fields.append(self._name("a field name"))
+        self._expect("FROM")
+        resource = self._name("a resource name")
+
+        conditions = []
+        if self._accept("WHERE"):
+            conditions.append(self._condition())
+            while self._accept("AND"):
+                conditions.append(self._condition())
+
+        orderings = []
+        if self._accept("ORDER"):
+            self._expect("BY")
+            orderings.append(self._ordering())
+            while self._accept_punctuation(","):
+                orderings.append(self._ordering())
+
+        limit = None
+        if self._accept("LIMIT"):
+            limit = self._value()
+            if not isinstance(limit, int) or limit < 1:
+                self._index -= 1
+                raise self._error("expected a positive integer")
+
+        parameters = []
+        if self._accept("PARAMETERS"):
+            while True:
+                name = self._name("a parameter name")
+                if self._next("=").text != "=":
+                    self._index -= 1
+                    raise self._error("expected =")
+                parameters.append((name, self._value()))
+                if not self._accept_punctuation(","):
+                    break
+
+        if self._peek() is not None:
+            raise self._error("unexpected token")
+        return Query(
+            tuple(fields),
+            resource,
+            tuple(conditions),
+            tuple(orderings),
+            limit,
+            tuple(parameters),
+        )
+
+
+@functools.lru_cache(maxsize=1024)
+def parse(query: str) -> Query:
+    """Parses a GAQL query.
+
+    Results are cached by the query text; the returned Query is immutable
+    and may be shared.
+
+    Raises:
+        GaqlSyntaxError: if the query doesn't follow the GAQL grammar.
+    """
+    return _Parser(query).parse()
+
+
+def canonicalize(query: str) -> str:
+    """Returns the canonical text of a query.
+
+    Queries that can't be parsed are only normalized for whitespace, so that
+    this can be used as a cache key for any query.
+    """
+    try:
+        return parse(query).canonical
+    except GaqlSyntaxError:
+        return _normalize_whitespace(query)
+
+
+def _normalize_whitespace(query: str) -> str:
+    """Collapses whitespace outside of string literals."""
+    parts = _LITERAL_RE.split(query)
+    for i in range(0, len(parts), 2):
+        parts[i] = _SPACE_RE.sub(" ", parts[i])
+    return "".join(parts).strip()
@@ -0,0 +1,414 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process metrics of the API calls made by the server.
+
+The instrumentation interceptors record, per API method, the latency of
+every call, the time to the first response message of streaming calls, the
+number of response messages and the status codes, in the RpcMetrics of the
+process. Latencies are measured until the last message is read, so they
+include the time the caller takes to consume a stream.
+"""
+
+import asyncio
+import bisect
+import copy
+import threading
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import grpc
+import grpc.aio
+from google.ads.googleads.errors import GoogleAdsException
+
+# Upper bounds of the latency buckets, in seconds.
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+# Upper bounds of the response message count buckets.
+MESSAGE_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_OK = grpc.StatusCode.OK.name
+_CANCELLED = grpc.StatusCode.CANCELLED.name
+_UNKNOWN = grpc.StatusCode.UNKNOWN.name
+
+
+class Histogram:
+    """Counts of observed values by bucket, with their sum.
+
+    A value falls in the first bucket whose upper bound is greater than or
+    equal to it, or in the overflow bucket above the last bound.
+    """
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """Returns the cumulative count of each bucket by upper bound.
+
+        The last bucket, with bound infinity, counts every value.
+        """
+        buckets = []
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self._counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Returns an estimate of quantile `q` of the observed values.
+
+        Values are assumed to be spread evenly within their bucket. Returns
+        None without values, and the last bound for quantiles that fall in
+        the overflow bucket.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower = 0.0
+        previous = 0
+        for bound, total in self.buckets():
+            if total >= rank and total > previous:
+                if bound == float("inf"):
+                    return self.bounds[-1] if self.bounds else None
+                return lower + (bound - lower) * (rank - previous) / (
+                    total - previous
+                )
+            lower = bound
+            previous = total
+        return None
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns the count, sum, mean and main quantiles of the values."""
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MethodMetrics:
+    """The metrics of the calls of one API method."""
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        # Only streaming calls have a first message.
+        self.first_message = Histogram(LATENCY_BUCKETS)
+        self.messages = Histogram(MESSAGE_BUCKETS)
+        self.status_codes: Dict[str, int] = {}
+
+
+class RpcMetrics:
+    """The metrics of the API calls of the process, by method."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._methods: Dict[str, MethodMetrics] = {}
+
+    def record(
+        self,
+        method: str,
+        status_code: str,
+        latency: float,
+        messages: int,
+        first_message: Optional[float] = None,
+    ) -> None:
+        """Records a finished call.
+
+        Args:
+            method: the method, e.g. "GoogleAdsService/SearchStream".
+            status_code: the name of the gRPC status code of the call.
+            latency: the seconds from the start to the end of the call.
+            messages: the number of response messages read.
+            first_message: the seconds until the first response message of
+                a streaming call, if there was one.
+        """
+        with self._lock:
+            metrics = self._methods.get(method)
+            if metrics is None:
+                metrics = self._methods[method] = MethodMetrics()
+            metrics.latency.observe(latency)
+            metrics.messages.observe(messages)
+            if first_message is not None:
+                metrics.first_message.observe(first_message)
+            metrics.status_codes[status_code] = (
+                metrics.status_codes.get(status_code, 0) + 1
+            )
+
+    def snapshot(self) -> Dict[str, MethodMetrics]:
+        """Returns a copy of the metrics of every method."""
+        with self._lock:
+            return copy.deepcopy(self._methods)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns summaries of the metrics of every method."""
+        return {
+            method: {
+                "calls": metrics.latency.count,
+                "status_codes": metrics.status_codes,
+                "latency_seconds": metrics.latency.summary(),
+                "first_message_seconds": metrics.first_message.summary(),
+                "messages": metrics.messages.summary(),
+            }
+            for method, metrics in sorted(self.snapshot().items())
+        }
+
+
+# The metrics of every API call of the process.
+_rpc_metrics = RpcMetrics()
+
+
+def get_rpc_metrics() -> RpcMetrics:
+    """Returns the process-wide API call metrics."""
+    return _rpc_metrics
+
+
+def _method_name(method: Any) -> str:
+    """Returns "Service/Method" for a full gRPC method name."""
+    if isinstance(method, bytes):
+        method = method.decode()
+    return method.rsplit(".", 1)[-1]
+
+
+def _status_code(error: BaseException) -> str:
+    """Returns the name of the gRPC status code a call failed with."""
+    if isinstance(error, GoogleAdsException):
+        error = error.error
+    if isinstance(error, asyncio.CancelledError):
+        return _CANCELLED
+    code = getattr(error, "code", None)
+    if isinstance(error, grpc.RpcError) and callable(code):
+        status = code()
+        if isinstance(status, grpc.StatusCode):
+            return status.name
+    return _UNKNOWN
+
+
+class _Recorder:
+    """Times one call and records it when it finishes, only once."""
+
+    __slots__ = (
+        "_metrics",
+        "_method",
+        "_clock",
+        "_start",
+        "_first_message",
+        "_lock",
+        "messages",
+        "finished",
+    )
+
+    def __init__(
+        self, metrics: RpcMetrics, method: Any, clock: Callable[[], float]
+    ):
+        self._metrics = metrics
+        self._method = method
+        self._clock = clock
+        self._start = clock()
+        self._first_message = None
+        self._lock = threading.Lock()
+        self.messages = 0
+        self.finished = False
+
+    def message(self) -> None:
+        if self._first_message is None:
+            self._first_message = self._clock() - self._start
+        self.messages += 1
+
+    def finish(self, status_code: str, streaming: bool = True) -> None:
+        with self._lock:
+            if self.finished:
+                return
+            self.finished = True
+        self._metrics.record(
+            _method_name(self._method),
+            status_code,
+            self._clock() - self._start,
+            self.messages,
+            self._first_message if streaming else None,
+        )
+
+
+class _InstrumentedStream:
+    """Iterates the messages of a unary-stream call, recording the call.
+
+    The call is recorded once it is exhausted, fails or is cancelled. Every
+    other attribute is the one of the call.
+    """
+
+    def __init__(self, call: Any, recorder: _Recorder):
+        self._call = call
+        self._recorder = recorder
+
+    def __iter__(self) -> "_InstrumentedStream":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            message = next(self._call)
+        except StopIteration:
+            self._recorder.finish(_OK)
+            raise
+        except Exception as e:
+            self._recorder.finish(_status_code(e))
+            raise
+        self._recorder.message()
+        return message
+
+    def cancel(self) -> bool:
+        cancelled = self._call.cancel()
+        self._recorder.finish(_CANCELLED)
+        return cancelled
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._call, name)
+
+
+class InstrumentationInterceptor(
+    grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor
+):
+    """Records the metrics of the calls of a channel in an RpcMetrics."""
+
+    def __init__(
+        self,
+        metrics: Optional[RpcMetrics] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self._metrics = metrics or get_rpc_metrics()
+        self._clock = clock
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        recorder = _Recorder(
+            self._metrics, client_call_details.method, self._clock
+        )
+        try:
+            response = continuation(client_call_details, request)
+        except Exception as e:
+            recorder.finish(_status_code(e), streaming=False)
+            raise
+
+        def done(call: Any) -> None:
+            code = call.code()
+            if code == grpc.StatusCode.OK:
+                recorder.message()
+            recorder.finish(
+                code.name if code is not None else _UNKNOWN, streaming=False
+            )
+
+        response.add_done_callback(done)
+        return response
+
+    def intercept_unary_stream(
+        self, continuation, client_call_details, request
+    ):
+        recorder = _Recorder(
+            self._metrics, client_call_details.method, self._clock
+        )
+        try:
+            call = continuation(client_call_details, request)
+        except Exception as e:
+            recorder.finish(_status_code(e))
+            raise
+        return _InstrumentedStream(call, recorder)
+
+
+class AsyncInstrumentationInterceptor(
+    grpc.aio.UnaryUnaryClientInterceptor, grpc.aio.UnaryStreamClientInterceptor
+):
+    """The `InstrumentationInterceptor` equivalent for `grpc.aio` channels."""
+
+    def __init__(
+        self,
+        metrics: Optional[RpcMetrics] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self._metrics = metrics or get_rpc_metrics()
+        self._clock = clock
+
+    async def intercept_unary_unary(
+        self, continuation, client_call_details, request
+    ):
+        recorder = _Recorder(
+            self._metrics, client_call_details.method, self._clock
+        )
+        try:
+            call = await continuation(client_call_details, request)
+            # Waits for the response, which the caller awaits next anyway.
+            await call
+        except BaseException as e:
+            recorder.finish(_status_code(e), streaming=False)
+            raise
+        recorder.message()
+        recorder.finish(_OK, streaming=False)
+        return call
+
+    async def intercept_unary_stream(
+        self, continuation, client_call_details, request
+    ):
+        recorder = _Recorder(
+            self._metrics, client_call_details.method, self._clock
+        )
+        try:
+            call = await continuation(client_call_details, request)
+        except BaseException as e:
+            recorder.finish(_status_code(e))
+            raise
+        return self._messages(call, recorder)
+
+    @staticmethod
+    async def _messages(call: Any, recorder: _Recorder) -> AsyncIterator[Any]:
+        try:
+            async for message in call:
+                recorder.message()
+                yield message
+        except BaseException as e:
+            recorder.finish(
+                _CANCELLED if isinstance(e, GeneratorExit) else _status_code(e)
+            )
+            raise
+        recorder.finish(_OK)
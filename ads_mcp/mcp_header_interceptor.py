@@ -14,13 +14,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+"""Interceptors adding the google-ads-mcp product to the API client header."""
+
 import grpc
+import grpc.aio
 import logging
 from importlib import metadata
+from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 
+def _get_package_version_with_fallback():
+    """Returns the version of the package.
+
+    Falls back to 'unknown' if the version can't be resolved.
+    """
+    try:
+        return metadata.version("google-ads-mcp")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
 class MCPHeaderInterceptor(
     grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor
 ):
@@ -28,20 +43,57 @@ class MCPHeaderInterceptor(
 
     _API_CLIENT_HEADER = "x-goog-api-client"
 
-    def _get_package_version_with_fallback():
-        """Returns the version of the package.
-
-        Falls back to 'unknown' if the version can't be resolved.
-        """
-        try:
-            return metadata.version("google-ads-mcp")
-        except:
-            return "unknown"
-
     _MCP_EXTRA_HEADER = (
         f" google-ads-mcp/{_get_package_version_with_fallback()}"
     )
 
+    # API client headers by the value they were sent with, with the MCP
+    # suffix added, or None if the value already has it. Services send the
+    # same value on every call, so each header is built once.
+    _headers: Dict[str, Optional[Tuple[str, str]]] = {}
+    _MAX_HEADERS = 64
+
+    @classmethod
+    def _mcp_header(cls, value: str) -> Optional[Tuple[str, str]]:
+        """Returns the API client header to send instead of `value`, if any."""
+        try:
+            return cls._headers[value]
+        except KeyError:
+            pass
+        if "google-ads-mcp" in value:
+            header = None
+        else:
+            header = (cls._API_CLIENT_HEADER, value + cls._MCP_EXTRA_HEADER)
+        if len(cls._headers) < cls._MAX_HEADERS:
+            cls._headers[value] = header
+        return header
+
+    @classmethod
+    def _add_mcp_header(cls, metadata):
+        """Returns `metadata` with the MCP header suffix added.
+
+        Lists, which the services build for every call, are updated in
+        place. Other sequences are copied, only if the suffix is missing.
+
+        Args:
+            metadata: a sequence of (key, value) metadata tuples, or None.
+
+        Returns:
+            `metadata` or its updated copy.
+        """
+        if not metadata:
+            return metadata
+        for i in range(len(metadata)):
+            if metadata[i][0] == cls._API_CLIENT_HEADER:
+                header = cls._mcp_header(metadata[i][1])
+                if header is None:
+                    return metadata
+                if isinstance(metadata, list):
+                    metadata[i] = header
+                    return metadata
+                return (*metadata[:i], header, *metadata[i + 1 :])
+        return metadata
+
     def _mcp_intercept(self, continuation, client_call_details, request):
         """Generic interceptor used for Unary-Unary and Unary-Stream requests.
 
@@ -55,36 +107,19 @@ class MCPHeaderInterceptor(
         Returns:
             A grpc.Call/grpc.Future instance representing a service response.
         """
+        metadata = client_call_details.metadata
         try:
-            if client_call_details.metadata is None:
-                metadata = []
-            else:
-                metadata = list(client_call_details.metadata)
-
-            for i, metadatum in enumerate(metadata):
-                # Check if the user agent header key is in the current metadatum
-                if metadatum[0] == self._API_CLIENT_HEADER:
-                    # Convert the tuple to a list so it can be modified.
-                    val = list(metadatum)
-                    # Check that "google-ads-mcp" isn't already included in the user agent.
-                    if "google-ads-mcp" not in val[1]:
-                        # Append the protobuf version key value pair to the end of
-                        # the string.
-                        val[1] += self._MCP_EXTRA_HEADER
-                        # Convert the metadatum back to a tuple and
-                        # Splice it back in its original position in
-                        # order to preserve the order of the metadata list.
-                        metadata[i] = tuple(val)
-                        # Exit the loop since we already found the user agent.
-                        break
-
-            new_client_call_details = client_call_details._replace(
-                metadata=metadata
+            new_metadata = self._add_mcp_header(metadata)
+        except (IndexError, TypeError, ValueError):
+            logger.error(
+                "Malformed metadata in MCPHeaderInterceptor", exc_info=True
+            )
+            new_metadata = metadata
+        if new_metadata is not metadata:
+            client_call_details = client_call_details._replace(
+                metadata=new_metadata
             )
-            return continuation(new_client_call_details, request)
-        except:
-            logger.error("Error in MCPHeaderInterceptor", exc_info=True)
-            return continuation(client_call_details, request)
+        return continuation(client_call_details, request)
 
     def intercept_unary_stream(
         self, continuation, client_call_details, request
@@ -93,3 +128,47 @@ class MCPHeaderInterceptor(
 
     def intercept_unary_unary(self, continuation, client_call_details, request):
         return self._mcp_intercept(continuation, client_call_details, request)
+
+
+class AsyncMCPHeaderInterceptor(
+    grpc.aio.UnaryUnaryClientInterceptor, grpc.aio.UnaryStreamClientInterceptor
+):
+    """The `MCPHeaderInterceptor` equivalent for `grpc.aio` channels."""
+
+    async def _mcp_intercept(self, continuation, client_call_details, request):
+        """Generic interceptor used for Unary-Unary and Unary-Stream requests.
+
+        grpc.aio builds the metadata of every call, so it is updated in
+        place.
+
+        Args:
+            continuation: a coroutine function to continue the request process.
+            client_call_details: a grpc.aio.ClientCallDetails instance
+                containing request metadata.
+            request: the request message.
+
+        Returns:
+            A grpc.aio.Call instance representing a service response.
+        """
+        metadata = client_call_details.metadata
+        if metadata is not None:
+            value = metadata.get(MCPHeaderInterceptor._API_CLIENT_HEADER)
+            if isinstance(value, str):
+                header = MCPHeaderInterceptor._mcp_header(value)
+                if header is not None:
+                    metadata[header[0]] = header[1]
+        return await continuation(client_call_details, request)
+
+    async def intercept_unary_stream(
+        self, continuation, client_call_details, request
+    ):
+        return await self._mcp_intercept(
+            continuation, client_call_details, request
+        )
+
+    async def intercept_unary_unary(
+        self, continuation, client_call_details, request
+    ):
+        return await self._mcp_intercept(
+            continuation, client_call_details, request
+        )
@@ -0,0 +1,488 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Prometheus metrics of the tool calls and API calls of the process.
+
+The ToolMetrics of the process count the tool calls by outcome and record
+their latency, per tool and per customer, the rows they return, the bytes
+the server serialized for them and the calls in flight. `render` writes
+them, the API call metrics of the instrumentation module and the stats of
+the registered collectors, e.g. cache hit ratios, in the Prometheus text
+exposition format, which is served on /metrics.
+
+The number of customers with their own latency series is bounded by
+GOOGLE_ADS_MCP_METRICS_MAX_CUSTOMERS (default 100); the calls of further
+customers are recorded under the customer "other".
+"""
+
+import asyncio
+import contextlib
+import math
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ads_mcp import instrumentation
+import ads_mcp.utils as utils
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds of the returned row count buckets.
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+_DEFAULT_MAX_CUSTOMERS = 100
+_OTHER_CUSTOMER = "other"
+
+OK = "ok"
+ERROR = "error"
+CANCELLED = "cancelled"
+TIMEOUT = "timeout"
+
+
+def max_customers() -> int:
+    """Returns how many customers get their own latency series.
+
+    Set with GOOGLE_ADS_MCP_METRICS_MAX_CUSTOMERS (default 100).
+    """
+    return max(
+        0,
+        utils.get_int_env(
+            "GOOGLE_ADS_MCP_METRICS_MAX_CUSTOMERS", _DEFAULT_MAX_CUSTOMERS
+        ),
+    )
+
+
+def count_rows(result: Any) -> Optional[int]:
+    """Returns the number of rows of a tool result, if it has rows.
+
+    Rows are the items of a list result, the `rows` of a dict result, which
+    may be a count, or the values of the first column of a columnar result.
+    """
+    if isinstance(result, list):
+        return len(result)
+    if not isinstance(result, dict):
+        return None
+    rows = result.get("rows", result.get("results"))
+    if isinstance(rows, list):
+        return len(rows)
+    if isinstance(rows, int) and not isinstance(rows, bool):
+        return rows
+    data = result.get("data")
+    if isinstance(data, dict):
+        return len(next(iter(data.values()), []))
+    return None
+
+
+class ToolCall:
+    """A tool call being recorded by `ToolMetrics.call`."""
+
+    __slots__ = ("rows", "outcome")
+
+    def __init__(self):
+        self.rows: Optional[int] = None
+        # Set to record the outcome of a failed call explicitly.
+        self.outcome: Optional[str] = None
+
+    def result(self, result: Any) -> None:
+        """Records the rows of the result of the call."""
+        self.rows = count_rows(result)
+
+
+class ToolMetrics:
+    """The metrics of the tool calls of the process, by tool."""
+
+    def __init__(
+        self,
+        max_customers: int = _DEFAULT_MAX_CUSTOMERS,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.max_customers = max_customers
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[str, str], int] = {}
+        self._latency: Dict[str, instrumentation.Histogram] = {}
+        self._customer_latency: Dict[
+            Tuple[str, str], instrumentation.Histogram
+        ] = {}
+        self._customers: set = set()
+        self._rows: Dict[str, instrumentation.Histogram] = {}
+        self._bytes: Dict[str, int] = {}
+        self._in_flight: Dict[str, int] = {}
+
+    def _customer(self, customer_id: Optional[str]) -> Optional[str]:
+        """Returns the label of a customer, bounding their number."""
+        if not customer_id:
+            return None
+        customer_id = str(customer_id).replace("-", "")
+        if customer_id not in self._customers:
+            if len(self._customers) >= self.max_customers:
+                return _OTHER_CUSTOMER
+            self._customers.add(customer_id)
+        return customer_id
+
+    def start(self, tool: str) -> None:
+        """Counts a call of `tool` as in flight."""
+        with self._lock:
+            self._in_flight[tool] = self._in_flight.get(tool, 0) + 1
+
+    def finish(
+        self,
+        tool: str,
+        outcome: str,
+        latency: float,
+        customer_id: Optional[str] = None,
+        rows: Optional[int] = None,
+    ) -> None:
+        """Records a finished call of `tool` started with `start`.
+
+        Args:
+            tool: the name of the tool.
+            outcome: OK, ERROR, CANCELLED or TIMEOUT.
+            latency: the seconds from the start to the end of the call.
+            customer_id: the customer the call was for, if any.
+            rows: the number of rows returned, if the result has rows.
+        """
+        with self._lock:
+            self._in_flight[tool] = self._in_flight.get(tool, 1) - 1
+            key = (tool, outcome)
+            self._calls[key] = self._calls.get(key, 0) + 1
+            _histogram(
+                self._latency, tool, instrumentation.LATENCY_BUCKETS
+            ).observe(latency)
+            customer = self._customer(customer_id)
+            if customer is not None:
+                _histogram(
+                    self._customer_latency,
+                    (tool, customer),
+                    instrumentation.LATENCY_BUCKETS,
+                ).observe(latency)
+            if rows is not None:
+                _histogram(self._rows, tool, ROW_BUCKETS).observe(rows)
+
+    def add_serialized_bytes(self, tool: str, serialized_bytes: int) -> None:
+        """Adds to the bytes serialized for the results of `tool`."""
+        with self._lock:
+            self._bytes[tool] = self._bytes.get(tool, 0) + serialized_bytes
+
+    @contextlib.contextmanager
+    def call(
+        self,
+        tool: str,
+        customer_id: Optional[str] = None,
+        cancelled: Tuple[type, ...] = (),
+    ) -> Iterator[ToolCall]:
+        """Records the call of `tool` run in the context.
+
+        Unless the `outcome` of the yielded ToolCall is set, the outcome is
+        TIMEOUT if the context raises TimeoutError, CANCELLED if it raises
+        CancelledError or one of `cancelled`, ERROR if it raises anything
+        else and OK otherwise.
+        """
+        call = ToolCall()
+        self.start(tool)
+        start = self._clock()
+        outcome = OK
+        try:
+            yield call
+        except BaseException as e:
+            outcome = call.outcome or _outcome(e, cancelled)
+            raise
+        finally:
+            self.finish(
+                tool,
+                outcome,
+                self._clock() - start,
+                customer_id,
+                call.rows,
+            )
+
+    def render(self) -> List[str]:
+        """Returns the lines of the metrics in the text format."""
+        with self._lock:
+            calls = dict(self._calls)
+            latency = _copy(self._latency)
+            customer_latency = _copy(self._customer_latency)
+            rows = _copy(self._rows)
+            serialized_bytes = dict(self._bytes)
+            in_flight = dict(self._in_flight)
+        lines = []
+        lines += _samples(
+            "ads_mcp_tool_calls_total",
+            "counter",
+            "Tool calls by outcome.",
+            [(("tool", "outcome"), key, value) for key, value in calls.items()],
+        )
+        lines += _histograms(
+            "ads_mcp_tool_call_duration_seconds",
+            "Latency of the tool calls.",
+            ("tool",),
+            {(tool,): histogram for tool, histogram in latency.items()},
+        )
+        lines += _histograms(
+            "ads_mcp_customer_call_duration_seconds",
+            "Latency of the tool calls, by customer.",
+            ("tool", "customer_id"),
+            customer_latency,
+        )
+        lines += _histograms(
+            "ads_mcp_tool_rows",
+            "Rows returned by the tool calls.",
+            ("tool",),
+            {(tool,): histogram for tool, histogram in rows.items()},
+        )
+        lines += _samples(
+            "ads_mcp_tool_serialized_bytes_total",
+            "counter",
+            "Bytes of the tool results serialized by the server.",
+            [(("tool",), (tool,), n) for tool, n in serialized_bytes.items()],
+        )
+        lines += _samples(
+            "ads_mcp_tool_calls_in_flight",
+            "gauge",
+            "Tool calls being run.",
+            [(("tool",), (tool,), n) for tool, n in in_flight.items()],
+        )
+        return lines
+
+
+def _outcome(error: BaseException, cancelled: Tuple[type, ...]) -> str:
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+        return TIMEOUT
+    if isinstance(error, (asyncio.CancelledError, *cancelled)):
+        return CANCELLED
+    return ERROR
+
+
+def _histogram(
+    histograms: Dict[Any, instrumentation.Histogram],
+    key: Any,
+    bounds: Sequence[float],
+) -> instrumentation.Histogram:
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = instrumentation.Histogram(bounds)
+    return histogram
+
+
+def _copy(
+    histograms: Dict[Any, instrumentation.Histogram],
+) -> Dict[Any, Tuple[List[Tuple[float, int]], float, int]]:
+    return {
+        key: (histogram.buckets(), histogram.sum, histogram.count)
+        for key, histogram in histograms.items()
+    }
+
+
+def _escape(value: Any) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def _labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _header(name: str, kind: str, help: str) -> List[str]:
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+
+
+def _samples(
+    name: str,
+    kind: str,
+    help: str,
+    samples: Iterable[Tuple[Sequence[str], Sequence[Any], float]],
+) -> List[str]:
+    """Returns the lines of a counter or gauge with its labelled samples."""
+    lines = [
+        f"{name}{_labels(names, values)} {_number(value)}"
+        for names, values, value in sorted(samples, key=lambda s: s[1])
+    ]
+    return _header(name, kind, help) + lines if lines else []
+
+
+def _histograms(
+    name: str,
+    help: str,
+    names: Sequence[str],
+    histograms: Dict[Tuple[Any, ...], Any],
+) -> List[str]:
+    """Returns the lines of a histogram with its labelled series.
+
+    `histograms` maps the label values of each series to a Histogram or to
+    its `(buckets, sum, count)`.
+    """
+    if not histograms:
+        return []
+    lines = _header(name, "histogram", help)
+    for values, histogram in sorted(histograms.items()):
+        if isinstance(histogram, instrumentation.Histogram):
+            histogram = (histogram.buckets(), histogram.sum, histogram.count)
+        buckets, total, count = histogram
+        for bound, cumulative in buckets:
+            labels = _labels((*names, "le"), (*values, _number(float(bound))))
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _labels(names, values)
+        lines.append(f"{name}_sum{labels} {_number(total)}")
+        lines.append(f"{name}_count{labels} {count}")
+    return lines
+
+
+def _rpc_lines(rpc_metrics: instrumentation.RpcMetrics) -> List[str]:
+    """Returns the lines of the API call metrics of `rpc_metrics`."""
+    methods = rpc_metrics.snapshot()
+    codes = [
+        (("method", "code"), (method, code), count)
+        for method, metrics in methods.items()
+        for code, count in metrics.status_codes.items()
+    ]
+    lines = _samples(
+        "ads_mcp_rpc_calls_total",
+        "counter",
+        "API calls by gRPC status code.",
+        codes,
+    )
+    lines += _histograms(
+        "ads_mcp_rpc_duration_seconds",
+        "Latency of the API calls.",
+        ("method",),
+        {(method,): m.latency for method, m in methods.items()},
+    )
+    lines += _histograms(
+        "ads_mcp_rpc_first_message_seconds",
+        "Time to the first response message of the streaming API calls.",
+        ("method",),
+        {
+            (method,): m.first_message
+            for method, m in methods.items()
+            if m.first_message.count
+        },
+    )
+    lines += _histograms(
+        "ads_mcp_rpc_messages",
+        "Response messages of the API calls.",
+        ("method",),
+        {(method,): m.messages for method, m in methods.items()},
+    )
+    return lines
+
+
+class _Collector:
+    __slots__ = ("name", "stats", "counters")
+
+    def __init__(
+        self,
+        name: str,
+        stats: Callable[[], Dict[str, Any]],
+        counters: Sequence[str],
+    ):
+        self.name = name
+        self.stats = stats
+        self.counters = frozenset(counters)
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, value in sorted(self.stats().items()):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"ads_mcp_{self.name}_{key}"
+            kind = "gauge"
+            if key in self.counters:
+                kind = "counter"
+                if not name.endswith("_total"):
+                    name += "_total"
+            lines += _samples(
+                name, kind, f"The {key} of the {self.name}.", [((), (), value)]
+            )
+        return lines
+
+
+_collectors: Dict[str, _Collector] = {}
+_collectors_lock = threading.Lock()
+
+
+def register_stats(
+    name: str,
+    stats: Callable[[], Dict[str, Any]],
+    counters: Sequence[str] = (),
+) -> None:
+    """Exports the numeric stats returned by `stats` as metrics.
+
+    Each stat is exported as a gauge named `ads_mcp_<name>_<stat>`, or as a
+    counter, with a `_total` suffix, if it is in `counters`.
+    `stats` is called whenever the metrics are rendered. Registering a name
+    again replaces its stats.
+    """
+    with _collectors_lock:
+        _collectors[name] = _Collector(name, stats, counters)
+
+
+# The metrics of every tool call of the process.
+_tool_metrics = None
+_tool_metrics_lock = threading.Lock()
+
+
+def get_tool_metrics() -> ToolMetrics:
+    """Returns the process-wide tool call metrics, creating them once."""
+    global _tool_metrics
+    with _tool_metrics_lock:
+        if _tool_metrics is None:
+            _tool_metrics = ToolMetrics(max_customers())
+        return _tool_metrics
+
+
+def render() -> str:
+    """Returns every metric of the process in the text format."""
+    lines = get_tool_metrics().render()
+    lines += _rpc_lines(instrumentation.get_rpc_metrics())
+    with _collectors_lock:
+        collectors = list(_collectors.values())
+    for collector in collectors:
+        try:
+            lines += collector.render()
+        except Exception as e:
+            utils.logger.warning(
+                f"Couldn't collect the {collector.name} metrics: {e}"
+            )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,266 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Precompiled projection of GoogleAdsRow messages onto field mask paths.
+
+Every batch of a `search_stream` call carries the same `field_mask.paths`, so
+instead of resolving each path through the proto-plus wrappers for every row,
+the paths are compiled once into getters over the raw protobuf message, each
+paired with a converter chosen from the leaf field's descriptor.
+
+The converters only ever produce `None`, `bool`, `int`, `float`, `str` or
+lists of those, so projected rows are JSON-serializable by construction and
+need no further checks before being handed to the MCP layer.
+"""
+
+import base64
+import functools
+import math
+import operator
+import array
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+
+_Getter = Callable[[Any], Any]
+
+
+def _is_repeated(field: FieldDescriptor) -> bool:
+    try:
+        return field.is_repeated
+    except AttributeError:
+        # protobuf < 5.x has no `is_repeated` property.
+        return field.label == FieldDescriptor.LABEL_REPEATED
+
+
+def _find_field(
+    message_type: Descriptor, name: str
+) -> Optional[FieldDescriptor]:
+    """Returns the field called `name` in an API field mask path.
+
+    proto-plus appends an underscore to field names that collide with Python
+    keywords or builtins (e.g. `type_`), while the API reports the original.
+    """
+    fields = message_type.fields_by_name
+    return fields.get(name) or fields.get(name + "_")
+
+
+def _enum_converter(field: FieldDescriptor) -> Callable[[int], Any]:
+    names = {value.number: value.name for value in field.enum_type.values}
+    # Values unknown to this client version are returned as plain numbers.
+    return lambda number: names.get(number, number)
+
+
+def _float_converter(value: float) -> Optional[float]:
+    # NaN and the infinities have no JSON representation.
+    return value if math.isfinite(value) else None
+
+
+def _bytes_converter(value: bytes) -> str:
+    return base64.b64encode(value).decode("ascii")
+
+
+# Converters of scalar leaf types whose Python values are not JSON-native.
+# All other scalar types (bool, integers and strings) are used as is.
+_SCALAR_CONVERTERS = {
+    FieldDescriptor.TYPE_DOUBLE: _float_converter,
+    FieldDescriptor.TYPE_FLOAT: _float_converter,
+    FieldDescriptor.TYPE_BYTES: _bytes_converter,
+    FieldDescriptor.TYPE_MESSAGE: str,
+    FieldDescriptor.TYPE_GROUP: str,
+}
+
+
+def _leaf_converter(field: FieldDescriptor) -> Optional[Callable[[Any], Any]]:
+    """Returns the converter for values of `field`, or None if not needed."""
+    if field.type == FieldDescriptor.TYPE_ENUM:
+        convert = _enum_converter(field)
+    else:
+        convert = _SCALAR_CONVERTERS.get(field.type)
+
+    if not _is_repeated(field):
+        return convert
+    if convert is None:
+        return list
+    return lambda values: [convert(value) for value in values]
+
+
+# Typecodes of the `array` module able to hold values of scalar leaf types.
+_ARRAY_TYPECODES = {
+    FieldDescriptor.TYPE_INT32: "q",
+    FieldDescriptor.TYPE_INT64: "q",
+    FieldDescriptor.TYPE_SINT32: "q",
+    FieldDescriptor.TYPE_SINT64: "q",
+    FieldDescriptor.TYPE_SFIXED32: "q",
+    FieldDescriptor.TYPE_SFIXED64: "q",
+    FieldDescriptor.TYPE_UINT32: "Q",
+    FieldDescriptor.TYPE_UINT64: "Q",
+    FieldDescriptor.TYPE_FIXED32: "Q",
+    FieldDescriptor.TYPE_FIXED64: "Q",
+    FieldDescriptor.TYPE_DOUBLE: "d",
+    FieldDescriptor.TYPE_FLOAT: "d",
+}
+
+
+class _CompiledPath(NamedTuple):
+    """A field path compiled against a message type.
+
+    Attributes:
+        get: returns the raw leaf value of a message.
+        convert: converts raw leaf values to JSON-native ones, or None if the
+            raw values already are.
+        typecode: the `array` typecode able to hold the raw leaf values, or
+            None if they must be kept in a list.
+        field: the descriptor of the leaf field, or None if the path is
+            unknown.
+    """
+
+    get: _Getter
+    convert: Optional[Callable[[Any], Any]]
+    typecode: Optional[str]
+    field: Optional[FieldDescriptor] = None
+
+    def getter(self) -> _Getter:
+        """Returns a getter of the converted leaf value."""
+        get, convert = self.get, self.convert
+        if convert is None:
+            return get
+        return lambda message: convert(get(message))
+
+
+def _compile_path(descriptor: Descriptor, path: str) -> _CompiledPath:
+    """Compiles a dotted field path into a getter over raw messages."""
+    message_type = descriptor
+    field = None
+    names = []
+    for name in path.split("."):
+        if message_type is None:
+            # The previous field is a scalar or a repeated message.
+            field = None
+            break
+        field = _find_field(message_type, name)
+        if field is None:
+            break
+        names.append(field.name)
+        if _is_repeated(field):
+            message_type = None
+        else:
+            message_type = field.message_type
+
+    if field is None:
+        error = f"Error: unknown field {path}"
+        return _CompiledPath(lambda _: error, None, None)
+
+    typecode = None
+    if not _is_repeated(field):
+        typecode = _ARRAY_TYPECODES.get(field.type)
+    return _CompiledPath(
+        operator.attrgetter(".".join(names)),
+        _leaf_converter(field),
+        typecode,
+        field,
+    )
+
+
+class RowProjector:
+    """Projects rows of one message type onto a fixed list of field paths."""
+
+    __slots__ = ("paths", "compiled_paths", "_getters")
+
+    def __init__(self, descriptor: Descriptor, paths: Tuple[str, ...]):
+        self.paths = paths
+        self.compiled_paths = tuple(
+            _compile_path(descriptor, path) for path in paths
+        )
+        self._getters = tuple(path.getter() for path in self.compiled_paths)
+
+    def __call__(self, row: Any) -> Dict[str, Any]:
+        """Returns a dict mapping each path to its value in `row`.
+
+        Args:
+            row: a proto-plus message or the raw protobuf message it wraps.
+        """
+        message = getattr(row, "_pb", row)
+        return {
+            path: get(message) for path, get in zip(self.paths, self._getters)
+        }
+
+
+@functools.lru_cache(maxsize=256)
+def get_row_projector(
+    descriptor: Descriptor, paths: Tuple[str, ...]
+) -> RowProjector:
+    """Returns the projector for `paths`, compiling it on first use."""
+    return RowProjector(descriptor, paths)
+
+
+def get_batch_projector(batch: Any) -> RowProjector:
+    """Returns the projector for the rows of a `search_stream` batch.
+
+    Args:
+        batch: a SearchGoogleAdsStreamResponse, either proto-plus or raw.
+    """
+    message = getattr(batch, "_pb", batch)
+    row_type = message.DESCRIPTOR.fields_by_name["results"].message_type
+    return get_row_projector(row_type, tuple(message.field_mask.paths))
+
+
+class ColumnBuilder:
+    """Accumulates `search_stream` batches into a columnar result.
+
+    Values are extracted one column at a time per batch. Columns of integer
+    and floating point fields are kept in typed arrays rather than lists of
+    Python objects while the stream is being read.
+    """
+
+    def __init__(self):
+        self.columns: Tuple[str, ...] = ()
+        self._data: List[Any] = []
+        self._compiled_paths: Tuple[_CompiledPath, ...] = ()
+        self.row_count = 0
+
+    def add_batch(self, batch: Any) -> None:
+        """Appends the rows of a `search_stream` batch to the columns."""
+        message = getattr(batch, "_pb", batch)
+        projector = get_batch_projector(message)
+        if not self.columns:
+            self.columns = projector.paths
+            self._compiled_paths = projector.compiled_paths
+            self._data = [
+                array.array(path.typecode) if path.typecode else []
+                for path in projector.compiled_paths
+            ]
+        elif projector.paths != self.columns:
+            raise ValueError("All batches must have the same field mask")
+
+        rows = message.results
+        for column, path in zip(self._data, self._compiled_paths):
+            if path.typecode or path.convert is None:
+                column.extend(map(path.get, rows))
+            else:
+                column.extend(map(path.getter(), rows))
+        self.row_count += len(rows)
+
+    def result(self) -> Dict[str, Any]:
+        """Returns the columns as `{"columns": [...], "data": {...}}`."""
+        data = {}
+        for name, column, path in zip(
+            self.columns, self._data, self._compiled_paths
+        ):
+            if path.typecode:
+                column = column.tolist()
+                if path.typecode == "d":
+                    column = [_float_converter(value) for value in column]
+            data[name] = column
+        return {"columns": list(self.columns), "data": data}
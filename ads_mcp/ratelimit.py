@@ -0,0 +1,395 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Quota-aware scheduling of the API requests made by the tools.
+
+Every request takes a token from the bucket of its developer token and from
+the bucket of its customer. A request that finds a bucket empty is not
+rejected: it reserves the next token and waits until the token is due, so
+waiting requests run in the order they arrived at the configured rate.
+
+When the API still answers with a quota error, the rate of the buckets of
+the request is halved and the buckets are paused for the retry delay the
+error asks for. Every successful request then restores a tenth of the
+configured rate, until the buckets are back to it.
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+)
+
+import grpc
+from google.ads.googleads.errors import GoogleAdsException
+
+from ads_mcp import cancellation
+from ads_mcp import retry
+import ads_mcp.utils as utils
+
+_DEFAULT_DEVELOPER_TOKEN_QPS = 10.0
+_DEFAULT_DEVELOPER_TOKEN_BURST = 20.0
+_DEFAULT_CUSTOMER_QPS = 5.0
+_DEFAULT_CUSTOMER_BURST = 10.0
+
+# Back-off when a quota error doesn't say how long to wait.
+_DEFAULT_RETRY_DELAY_SECONDS = 1.0
+# Throttled buckets don't go below this fraction of their configured rate.
+_MIN_RATE_FACTOR = 1 / 16
+# Fraction of the configured rate a successful request gives back.
+_RECOVERY_STEP = 1 / 10
+# Idle customer buckets are dropped once there are more than this many.
+_MAX_IDLE_BUCKETS = 1024
+
+
+class TokenBucket:
+    """A token bucket whose tokens can be reserved ahead of time.
+
+    Reserving a token from an empty bucket puts the bucket in debt and
+    returns how long the caller has to wait for the token to be refilled.
+    Each reservation waits for the ones before it, so callers are served in
+    order at the rate of the bucket.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be a positive number of requests")
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Takes a token and returns the seconds to wait before using it."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def refund(self) -> None:
+        """Gives back a reserved token that wasn't used."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def throttle(self, delay: float) -> None:
+        """Halves the rate and delays the next token by `delay` seconds."""
+        with self._lock:
+            self._refill()
+            self.rate = max(self.max_rate * _MIN_RATE_FACTOR, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0) - delay * self.rate
+
+    def recover(self) -> None:
+        """Moves the rate of a throttled bucket back towards its maximum."""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(
+                    self.max_rate, self.rate + self.max_rate * _RECOVERY_STEP
+                )
+
+    @property
+    def throttled(self) -> bool:
+        return self.rate < self.max_rate
+
+    def idle(self) -> bool:
+        """Returns whether the bucket is full and not throttled."""
+        with self._lock:
+            self._refill()
+            return self._tokens >= self.burst and not self.throttled
+
+
+def _refund(buckets: List[TokenBucket]) -> None:
+    for bucket in buckets:
+        bucket.refund()
+
+
+def quota_retry_delay(error: BaseException) -> Optional[float]:
+    """Returns how long to back off after an error, if it is a quota error.
+
+    Quota errors are GoogleAdsExceptions with a QuotaError and
+    RESOURCE_EXHAUSTED errors. The delay is the one the API asks for, if
+    any.
+    """
+    if isinstance(error, GoogleAdsException):
+        quota_error = any(
+            getattr(e, "_pb", e).error_code.WhichOneof("error_code")
+            == "quota_error"
+            for e in error.failure.errors
+        )
+    else:
+        quota_error = False
+    if not quota_error:
+        quota_error = (
+            retry.status_code(error) == grpc.StatusCode.RESOURCE_EXHAUSTED
+        )
+    if not quota_error:
+        return None
+    return retry.server_retry_delay(error) or _DEFAULT_RETRY_DELAY_SECONDS
+
+
+class RequestScheduler:
+    """Rate limits requests per developer token and per customer.
+
+    A rate of 0 disables the corresponding buckets.
+    """
+
+    def __init__(
+        self,
+        developer_token_qps: float = _DEFAULT_DEVELOPER_TOKEN_QPS,
+        developer_token_burst: float = _DEFAULT_DEVELOPER_TOKEN_BURST,
+        customer_qps: float = _DEFAULT_CUSTOMER_QPS,
+        customer_burst: float = _DEFAULT_CUSTOMER_BURST,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.developer_token_qps = developer_token_qps
+        self.developer_token_burst = developer_token_burst
+        self.customer_qps = customer_qps
+        self.customer_burst = customer_burst
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._developer_token_buckets: Dict[Hashable, TokenBucket] = {}
+        self._customer_buckets: Dict[Hashable, TokenBucket] = {}
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+        self._requests = 0
+        self._queued = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._quota_errors = 0
+
+    def _bucket(
+        self,
+        buckets: Dict[Hashable, TokenBucket],
+        key: Hashable,
+        rate: float,
+        burst: float,
+    ) -> Optional[TokenBucket]:
+        if rate <= 0:
+            return None
+        with self._lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                if len(buckets) >= _MAX_IDLE_BUCKETS:
+                    for idle_key in [k for k, b in buckets.items() if b.idle()]:
+                        del buckets[idle_key]
+                bucket = TokenBucket(rate, burst, self._clock)
+                buckets[key] = bucket
+            return bucket
+
+    def _buckets(
+        self, developer_token: str, customer_id: Optional[str]
+    ) -> List[TokenBucket]:
+        buckets = [
+            self._bucket(
+                self._developer_token_buckets,
+                developer_token,
+                self.developer_token_qps,
+                self.developer_token_burst,
+            )
+        ]
+        if customer_id:
+            buckets.append(
+                self._bucket(
+                    self._customer_buckets,
+                    (developer_token, str(customer_id)),
+                    self.customer_qps,
+                    self.customer_burst,
+                )
+            )
+        return [b for b in buckets if b is not None]
+
+    def _start_wait(self, delay: float) -> None:
+        with self._lock:
+            self._requests += 1
+            if delay > 0:
+                self._queued += 1
+                self._queue_depth += 1
+                self._max_queue_depth = max(
+                    self._max_queue_depth, self._queue_depth
+                )
+
+    def _end_wait(self, started: float) -> None:
+        waited = self._clock() - started
+        with self._lock:
+            self._queue_depth -= 1
+            self._wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+
+    def _finish(
+        self, buckets: List[TokenBucket], error: Optional[BaseException]
+    ) -> None:
+        delay = None if error is None else quota_retry_delay(error)
+        if delay is not None:
+            with self._lock:
+                self._quota_errors += 1
+            utils.logger.warning(
+                f"Quota error, throttling requests for {delay:.1f}s"
+            )
+            for bucket in buckets:
+                bucket.throttle(delay)
+        elif error is None:
+            for bucket in buckets:
+                bucket.recover()
+
+    @contextlib.contextmanager
+    def request(
+        self, developer_token: str, customer_id: Optional[str] = None
+    ) -> Iterator[None]:
+        """Waits for the turn of a request, which runs inside the context.
+
+        Errors raised inside the context are checked for quota errors. A
+        request whose wait is cancelled gives its tokens back.
+        """
+        buckets = self._buckets(developer_token, customer_id)
+        delay = max((b.reserve() for b in buckets), default=0.0)
+        self._start_wait(delay)
+        if delay > 0:
+            started = self._clock()
+            try:
+                self._sleep(delay)
+            except BaseException:
+                _refund(buckets)
+                raise
+            finally:
+                self._end_wait(started)
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._finish(buckets, error)
+
+    @contextlib.asynccontextmanager
+    async def request_async(
+        self, developer_token: str, customer_id: Optional[str] = None
+    ) -> AsyncIterator[None]:
+        """Like `request`, but waits without blocking the event loop."""
+        buckets = self._buckets(developer_token, customer_id)
+        delay = max((b.reserve() for b in buckets), default=0.0)
+        self._start_wait(delay)
+        if delay > 0:
+            started = self._clock()
+            try:
+                await asyncio.sleep(delay)
+            except BaseException:
+                _refund(buckets)
+                raise
+            finally:
+                self._end_wait(started)
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._finish(buckets, error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the queue and wait time counters and the configuration."""
+        with self._lock:
+            buckets = list(self._developer_token_buckets.values())
+            buckets.extend(self._customer_buckets.values())
+            return {
+                "requests": self._requests,
+                "queued_requests": self._queued,
+                "queue_depth": self._queue_depth,
+                "max_queue_depth": self._max_queue_depth,
+                "wait_seconds_total": self._wait_seconds,
+                "wait_seconds_max": self._max_wait_seconds,
+                "wait_seconds_avg": (
+                    self._wait_seconds / self._requests
+                    if self._requests
+                    else 0.0
+                ),
+                "quota_errors": self._quota_errors,
+                "throttled_buckets": sum(b.throttled for b in buckets),
+                "developer_token_qps": self.developer_token_qps,
+                "developer_token_burst": self.developer_token_burst,
+                "customer_qps": self.customer_qps,
+                "customer_burst": self.customer_burst,
+            }
+
+
+def create_scheduler() -> RequestScheduler:
+    """Returns a scheduler configured from the environment.
+
+    GOOGLE_ADS_MCP_DEVELOPER_TOKEN_QPS and GOOGLE_ADS_MCP_CUSTOMER_QPS set the
+    requests per second of each developer token and customer (default 10 and
+    5, 0 disables the limit), and GOOGLE_ADS_MCP_DEVELOPER_TOKEN_BURST and
+    GOOGLE_ADS_MCP_CUSTOMER_BURST how many requests may run back to back
+    before the rate applies (default 20 and 10).
+    """
+    return RequestScheduler(
+        developer_token_qps=utils.get_float_env(
+            "GOOGLE_ADS_MCP_DEVELOPER_TOKEN_QPS", _DEFAULT_DEVELOPER_TOKEN_QPS
+        ),
+        developer_token_burst=utils.get_float_env(
+            "GOOGLE_ADS_MCP_DEVELOPER_TOKEN_BURST",
+            _DEFAULT_DEVELOPER_TOKEN_BURST,
+        ),
+        customer_qps=utils.get_float_env(
+            "GOOGLE_ADS_MCP_CUSTOMER_QPS", _DEFAULT_CUSTOMER_QPS
+        ),
+        customer_burst=utils.get_float_env(
+            "GOOGLE_ADS_MCP_CUSTOMER_BURST", _DEFAULT_CUSTOMER_BURST
+        ),
+        # Cancelled tool calls stop waiting for their turn.
+        sleep=cancellation.sleep,
+    )
+
+
+# The scheduler of every API request of the process.
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """Returns the process-wide scheduler, creating it on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = create_scheduler()
+        return _scheduler
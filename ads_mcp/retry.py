@@ -0,0 +1,436 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Retries of API calls that fail with transient errors.
+
+Calls failing with UNAVAILABLE, INTERNAL, DEADLINE_EXCEEDED or
+RESOURCE_EXHAUSTED are retried after an exponential backoff with full
+jitter, or after the delay the API asks for in its retry info, if longer.
+
+Every tool call has a deadline budget, shared by all the API calls it makes
+and all their attempts: each attempt gets the remaining budget as its gRPC
+timeout, and a retry is only made if its backoff ends before the deadline.
+
+`search_stream` calls that fail after some of their batches were delivered
+are restarted, and the rows already delivered are skipped. This relies on
+the API returning the rows of the same query in the same order.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import random
+import threading
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
+
+import grpc
+from google.ads.googleads.errors import GoogleAdsException
+from google.rpc import error_details_pb2
+
+import ads_mcp.utils as utils
+
+RETRYABLE_CODES = frozenset(
+    (
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.INTERNAL,
+        grpc.StatusCode.DEADLINE_EXCEEDED,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+    )
+)
+
+_RETRY_INFO_KEY = "google.rpc.retryinfo-bin"
+
+_DEFAULT_MAX_ATTEMPTS = 4
+_DEFAULT_INITIAL_BACKOFF_SECONDS = 0.5
+_DEFAULT_MAX_BACKOFF_SECONDS = 16.0
+_DEFAULT_DEADLINE_SECONDS = 600.0
+
+_T = TypeVar("_T")
+
+
+def status_code(error: BaseException) -> Optional[grpc.StatusCode]:
+    """Returns the gRPC status code of an API call error, if it has one.
+
+    Understands GoogleAdsExceptions, `google.api_core` errors, which the
+    generated services raise for errors without a GoogleAdsFailure, and
+    plain RPC errors.
+    """
+    if isinstance(error, GoogleAdsException):
+        error = error.error
+    code = getattr(error, "grpc_status_code", None)
+    if code is not None:
+        return code
+    code = getattr(error, "code", None)
+    if isinstance(error, grpc.RpcError) and callable(code):
+        return code()
+    return None
+
+
+def _trailing_metadata(error: BaseException) -> tuple:
+    if isinstance(error, GoogleAdsException):
+        call = error.call
+    else:
+        call = getattr(error, "response", None) or error
+    trailing_metadata = getattr(call, "trailing_metadata", None)
+    if not callable(trailing_metadata):
+        return ()
+    return trailing_metadata() or ()
+
+
+def server_retry_delay(error: BaseException) -> Optional[float]:
+    """Returns the seconds the API asked to wait before retrying, if any.
+
+    The delay is read from the RetryInfo of the response and from the quota
+    error details of a GoogleAdsFailure.
+    """
+    delays = []
+    for key, value in _trailing_metadata(error):
+        if key == _RETRY_INFO_KEY:
+            retry_info = error_details_pb2.RetryInfo.FromString(value)
+            delays.append(retry_info.retry_delay.ToTimedelta().total_seconds())
+    if isinstance(error, GoogleAdsException):
+        for ads_error in error.failure.errors:
+            details = getattr(ads_error, "_pb", ads_error).details
+            if details.HasField("quota_error_details"):
+                retry_delay = details.quota_error_details.retry_delay
+                delays.append(retry_delay.ToTimedelta().total_seconds())
+    delays = [delay for delay in delays if delay > 0]
+    return max(delays) if delays else None
+
+
+class Deadline:
+    """The time by which a tool call has to be done."""
+
+    def __init__(
+        self, seconds: float, clock: Callable[[], float] = time.monotonic
+    ):
+        self._clock = clock
+        self.expires = clock() + seconds if seconds > 0 else None
+
+    def remaining(self) -> Optional[float]:
+        """Returns the seconds left, or None if there is no deadline."""
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - self._clock())
+
+
+class RetryPolicy(NamedTuple):
+    """How API calls are retried.
+
+    Attributes:
+        max_attempts: the most attempts made for one call, including the
+            first one.
+        initial_backoff: the longest backoff before the first retry, in
+            seconds. It doubles with every retry.
+        max_backoff: the longest backoff before any retry, in seconds.
+        deadline: the budget of a tool call in seconds, or 0 for none.
+    """
+
+    max_attempts: int = _DEFAULT_MAX_ATTEMPTS
+    initial_backoff: float = _DEFAULT_INITIAL_BACKOFF_SECONDS
+    max_backoff: float = _DEFAULT_MAX_BACKOFF_SECONDS
+    deadline: float = _DEFAULT_DEADLINE_SECONDS
+
+    def backoff(
+        self, attempt: int, uniform: Callable[[float, float], float] = None
+    ) -> float:
+        """Returns a random backoff after the failure of attempt `attempt`.
+
+        This is "full jitter": the backoff is drawn uniformly between 0 and
+        an exponentially growing bound, which spreads out the retries of
+        calls that failed at the same time.
+        """
+        bound = min(self.max_backoff, self.initial_backoff * 2 ** (attempt - 1))
+        return (uniform or random.uniform)(0.0, bound)
+
+    def retry_delay(
+        self, error: BaseException, attempt: int, deadline: Deadline
+    ) -> Optional[float]:
+        """Returns how long to wait before retrying, or None not to retry."""
+        if attempt >= self.max_attempts:
+            return None
+        if status_code(error) not in RETRYABLE_CODES:
+            return None
+        delay = max(self.backoff(attempt), server_retry_delay(error) or 0.0)
+        remaining = deadline.remaining()
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
+
+
+def load_policy() -> RetryPolicy:
+    """Returns the retry policy of the environment.
+
+    GOOGLE_ADS_MCP_RETRY_MAX_ATTEMPTS is the most attempts per call (default
+    4, 1 disables retries), GOOGLE_ADS_MCP_RETRY_INITIAL_BACKOFF_SECONDS and
+    GOOGLE_ADS_MCP_RETRY_MAX_BACKOFF_SECONDS bound the backoffs (default 0.5
+    and 16) and GOOGLE_ADS_MCP_RETRY_DEADLINE_SECONDS is the budget of a
+    tool call (default 600, 0 for none).
+    """
+    return RetryPolicy(
+        max_attempts=max(
+            1,
+            utils.get_int_env(
+                "GOOGLE_ADS_MCP_RETRY_MAX_ATTEMPTS", _DEFAULT_MAX_ATTEMPTS
+            ),
+        ),
+        initial_backoff=utils.get_float_env(
+            "GOOGLE_ADS_MCP_RETRY_INITIAL_BACKOFF_SECONDS",
+            _DEFAULT_INITIAL_BACKOFF_SECONDS,
+        ),
+        max_backoff=utils.get_float_env(
+            "GOOGLE_ADS_MCP_RETRY_MAX_BACKOFF_SECONDS",
+            _DEFAULT_MAX_BACKOFF_SECONDS,
+        ),
+        deadline=utils.get_float_env(
+            "GOOGLE_ADS_MCP_RETRY_DEADLINE_SECONDS", _DEFAULT_DEADLINE_SECONDS
+        ),
+    )
+
+
+_policy = load_policy()
+
+# The deadline of the tool call being run.
+_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "ads_mcp_deadline", default=None
+)
+
+
+@contextlib.contextmanager
+def deadline_scope(seconds: Optional[float] = None) -> Iterator[Deadline]:
+    """Runs the context with the deadline budget of a tool call.
+
+    Scopes opened inside another one keep the outer deadline. Worker
+    threads only see the deadline if they run in a copy of the context, see
+    `contextvars.copy_context`.
+
+    Args:
+        seconds: the budget, by default the one of the retry policy.
+    """
+    deadline = _deadline.get()
+    if deadline is not None:
+        yield deadline
+        return
+    deadline = Deadline(_policy.deadline if seconds is None else seconds)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline(policy: Optional[RetryPolicy] = None) -> Deadline:
+    """Returns the deadline of the tool call, or a new one outside of tools."""
+    deadline = _deadline.get()
+    if deadline is None:
+        deadline = Deadline((policy or _policy).deadline)
+    return deadline
+
+
+def _log_retry(error: BaseException, attempt: int, delay: float) -> None:
+    utils.logger.warning(
+        f"Retrying API call in {delay:.2f}s after attempt {attempt} failed: "
+        f"{utils.describe_error(error)}"
+    )
+
+
+def _skip_rows(batch: Any, count: int) -> int:
+    """Drops up to `count` leading rows of a batch; returns how many."""
+    results = getattr(batch, "_pb", batch).results
+    skipped = min(count, len(results))
+    del results[:skipped]
+    return skipped
+
+
+def _row_count(batch: Any) -> int:
+    return len(getattr(batch, "_pb", batch).results)
+
+
+def call(
+    attempt: Callable[[Optional[float]], _T],
+    policy: Optional[RetryPolicy] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> _T:
+    """Calls `attempt` with the remaining budget until it doesn't fail.
+
+    Args:
+        attempt: makes one attempt of the call, with the given timeout in
+            seconds or None.
+        policy: the retry policy, by default the one of the environment.
+        sleep: waits for the given seconds.
+    """
+    policy = policy or _policy
+    deadline = current_deadline(policy)
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            return attempt(deadline.remaining())
+        except Exception as e:
+            delay = policy.retry_delay(e, attempts, deadline)
+            if delay is None:
+                raise
+            _log_retry(e, attempts, delay)
+        sleep(delay)
+
+
+async def call_async(
+    attempt: Callable[[Optional[float]], Awaitable[_T]],
+    policy: Optional[RetryPolicy] = None,
+) -> _T:
+    """The asyncio equivalent of `call`."""
+    policy = policy or _policy
+    deadline = current_deadline(policy)
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            return await attempt(deadline.remaining())
+        except Exception as e:
+            delay = policy.retry_delay(e, attempts, deadline)
+            if delay is None:
+                raise
+            _log_retry(e, attempts, delay)
+        await asyncio.sleep(delay)
+
+
+def retry_stream(
+    start: Callable[[Optional[float]], Iterator[Any]],
+    policy: Optional[RetryPolicy] = None,
+    sleep: Callable[[float], None] = time.sleep,
+    timeout: bool = True,
+) -> Iterator[Any]:
+    """Yields the `search_stream` batches of `start`, restarting on failure.
+
+    A restarted stream skips the rows that were already yielded, so every
+    row is yielded once. Closing the generator closes the current stream.
+    Retries are bounded by the deadline of the tool call reading the stream
+    when they happen, which for a cursor isn't the one that opened it.
+
+    Args:
+        start: starts one attempt of the stream, with the given timeout in
+            seconds or None, and returns its batches as a generator.
+        policy: the retry policy, by default the one of the environment.
+        sleep: waits for the given seconds.
+        timeout: whether attempts are given the remaining budget as their
+            timeout. Streams read by several tool calls aren't, and bound
+            each read with `expire` instead.
+    """
+    policy = policy or _policy
+    fallback = Deadline(policy.deadline)
+    delivered = 0
+    attempts = 0
+    while True:
+        attempts += 1
+        skip = delivered
+        deadline = _deadline.get() or fallback
+        try:
+            with contextlib.closing(
+                start(deadline.remaining() if timeout else None)
+            ) as batches:
+                for batch in batches:
+                    if skip:
+                        skip -= _skip_rows(batch, skip)
+                        if not _row_count(batch):
+                            continue
+                    delivered += _row_count(batch)
+                    yield batch
+            return
+        except Exception as e:
+            deadline = _deadline.get() or fallback
+            delay = policy.retry_delay(e, attempts, deadline)
+            if delay is None:
+                raise
+            _log_retry(e, attempts, delay)
+        sleep(delay)
+
+
+@contextlib.contextmanager
+def expire(cancel: Callable[[], None]) -> Iterator[None]:
+    """Calls `cancel` if the deadline of the tool call passes in the context.
+
+    Bounds calls made without a timeout, e.g. reading the next batch of a
+    stream that outlives the tool call that started it.
+
+    Raises:
+        TimeoutError: if the context failed after being cancelled, or if
+            the deadline has already passed.
+    """
+    remaining = current_deadline().remaining()
+    if remaining is None:
+        yield
+        return
+    if remaining <= 0:
+        raise TimeoutError("The deadline of the tool call has passed")
+    expired = threading.Event()
+
+    def on_expiry():
+        expired.set()
+        cancel()
+
+    timer = threading.Timer(remaining, on_expiry)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield
+    except Exception as e:
+        if expired.is_set():
+            raise TimeoutError(
+                "The deadline of the tool call has passed"
+            ) from e
+        raise
+    finally:
+        timer.cancel()
+
+
+async def retry_stream_async(
+    start: Callable[[Optional[float]], AsyncIterator[Any]],
+    policy: Optional[RetryPolicy] = None,
+) -> AsyncIterator[Any]:
+    """The asyncio equivalent of `retry_stream`."""
+    policy = policy or _policy
+    deadline = current_deadline(policy)
+    delivered = 0
+    attempts = 0
+    while True:
+        attempts += 1
+        skip = delivered
+        try:
+            async with contextlib.aclosing(
+                start(deadline.remaining())
+            ) as batches:
+                async for batch in batches:
+                    if skip:
+                        skip -= _skip_rows(batch, skip)
+                        if not _row_count(batch):
+                            continue
+                    delivered += _row_count(batch)
+                    yield batch
+            return
+        except Exception as e:
+            delay = policy.retry_delay(e, attempts, deadline)
+            if delay is None:
+                raise
+            _log_retry(e, attempts, delay)
+        await asyncio.sleep(delay)
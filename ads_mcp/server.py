@@ -14,18 +14,53 @@
 
 """Entry point for the MCP server."""
 
+import threading
+
+from starlette.requests import Request
+from starlette.responses import Response
+
 from ads_mcp.coordinator import mcp
+from ads_mcp import metrics
+import ads_mcp.utils as utils
 
 # The following imports are necessary to register the tools with the `mcp`
 # object, even though they are not directly used in this file.
 # The `# noqa: F401` comment tells the linter to ignore the "unused import"
 # warning.
-from ads_mcp.tools import search, core  # noqa: F401
+from ads_mcp.tools import search, core, export, resources  # noqa: F401
+
+
+def _prepare_client() -> None:
+    """Creates the API client, which fetches the first access token."""
+    try:
+        utils.get_googleads_client()
+    except Exception as e:
+        utils.logger.warning(f"Couldn't prepare the Google Ads client: {e}")
+
+
+def _prepare_client_in_background() -> None:
+    # Lets the first tool call find a client with a valid token.
+    threading.Thread(
+        target=_prepare_client, name="ads-mcp-prepare-client", daemon=True
+    ).start()
+
+
+async def _metrics_endpoint(request: Request) -> Response:
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+def _serve_metrics() -> None:
+    """Serves the metrics on /metrics of the HTTP transports, if enabled."""
+    if utils.get_bool_env("GOOGLE_ADS_MCP_METRICS_ENDPOINT"):
+        mcp.custom_route("/metrics", methods=["GET"])(_metrics_endpoint)
 
 
 def run_server() -> None:
+    _prepare_client_in_background()
+    _serve_metrics()
     mcp.run()
 
 
 if __name__ == "__main__":
+    _prepare_client_in_background()
     mcp.run(transport="stdio")
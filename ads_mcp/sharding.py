@@ -0,0 +1,266 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Splitting of long `segments.date` ranges into parallel sub-queries.
+
+A report over a long date range is a single slow stream. When the query
+selects `segments.date` and its WHERE clause bounds it to a finite range
+longer than a threshold, the query is split into one query per week or month window, which can run in
+parallel. Each window keeps the ORDER BY and LIMIT of the query: the windows
+are then merged with a k-way merge on the ORDER BY fields, or concatenated in
+date order without one, and cut to the global LIMIT.
+"""
+
+import dataclasses
+import datetime
+import heapq
+import itertools
+import os
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ads_mcp import gaql
+import ads_mcp.utils as utils
+
+WINDOWS = ("week", "month")
+
+_DATE_FIELD = "segments.date"
+# Date segments whose periods may cross the boundaries of a window.
+_COARSER_DATE_FIELDS = frozenset(
+    ("segments.week", "segments.month", "segments.quarter", "segments.year")
+)
+_DEFAULT_WINDOW = "month"
+_DEFAULT_MIN_DAYS = 90
+_DEFAULT_WORKERS = 4
+
+_Row = Dict[str, Any]
+
+
+class ShardPlan(NamedTuple):
+    """The sub-queries of a sharded query and how to merge their results.
+
+    Attributes:
+        queries: the canonical sub-queries, in date order.
+        orderings: the ORDER BY of the query.
+        limit: the LIMIT of the query.
+    """
+
+    queries: Tuple[str, ...]
+    orderings: Tuple[gaql.Ordering, ...]
+    limit: Optional[int]
+
+
+def _parse_date(value: Any) -> Optional[datetime.date]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def date_range(
+    query: gaql.Query,
+) -> Optional[Tuple[datetime.date, datetime.date]]:
+    """Returns the inclusive `segments.date` range the query is bounded to.
+
+    Only BETWEEN and comparison conditions with literal dates are
+    understood. Returns None if the range is open, empty or uses anything
+    else, such as IN or DURING.
+    """
+    start = end = None
+    day = datetime.timedelta(days=1)
+    for condition in query.conditions:
+        if condition.field != _DATE_FIELD:
+            continue
+        dates = [_parse_date(value) for value in condition.values]
+        if not dates or None in dates:
+            return None
+        if condition.operator == "BETWEEN":
+            low, high = dates
+        elif condition.operator in (">=", ">"):
+            low, high = dates[0], None
+            if condition.operator == ">":
+                low += day
+        elif condition.operator in ("<=", "<"):
+            low, high = None, dates[0]
+            if condition.operator == "<":
+                high -= day
+        else:
+            return None
+        if low is not None:
+            start = low if start is None else max(start, low)
+        if high is not None:
+            end = high if end is None else min(end, high)
+    if start is None or end is None or start > end:
+        return None
+    return start, end
+
+
+def split_range(
+    start: datetime.date, end: datetime.date, window: str
+) -> List[Tuple[datetime.date, datetime.date]]:
+    """Splits an inclusive date range into week or calendar month windows.
+
+    Week windows are consecutive 7 day periods from `start`.
+    """
+    windows = []
+    while start <= end:
+        if window == "week":
+            window_end = start + datetime.timedelta(days=6)
+        else:
+            next_month = start.replace(day=1) + datetime.timedelta(days=32)
+            window_end = next_month.replace(day=1) - datetime.timedelta(days=1)
+        window_end = min(window_end, end)
+        windows.append((start, window_end))
+        start = window_end + datetime.timedelta(days=1)
+    return windows
+
+
+def plan_shards(query: str, window: str, min_days: int) -> Optional[ShardPlan]:
+    """Returns the sub-queries of `query`, or None if it isn't worth it.
+
+    Queries are only split if they are bounded to a date range of more than
+    `min_days` days spanning several windows, and if every ORDER BY field is
+    selected, which the merge needs. They must also be segmented by
+    `segments.date` and by no coarser date segment: metrics of other queries
+    are totals over the whole range, which the windows would split into
+    several rows.
+    """
+    if window not in WINDOWS:
+        return None
+    try:
+        plan = gaql.parse(query)
+    except gaql.GaqlSyntaxError:
+        return None
+    if _DATE_FIELD not in plan.fields or _COARSER_DATE_FIELDS.intersection(
+        plan.fields
+    ):
+        return None
+    bounds = date_range(plan)
+    if bounds is None or (bounds[1] - bounds[0]).days + 1 <= min_days:
+        return None
+    if any(o.field not in plan.fields for o in plan.orderings):
+        return None
+    windows = split_range(*bounds, window)
+    if len(windows) < 2:
+        return None
+
+    conditions = tuple(c for c in plan.conditions if c.field != _DATE_FIELD)
+    queries = tuple(
+        dataclasses.replace(
+            plan,
+            conditions=conditions
+            + (
+                gaql.Condition(
+                    _DATE_FIELD,
+                    "BETWEEN",
+                    (low.isoformat(), high.isoformat()),
+                ),
+            ),
+        ).canonical
+        for low, high in windows
+    )
+    return ShardPlan(queries, plan.orderings, plan.limit)
+
+
+class _Descending:
+    """Inverts the order of a sort key component."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: Any):
+        self.key = key
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other: "_Descending") -> bool:
+        return self.key == other.key
+
+
+def _sort_key(orderings: Sequence[gaql.Ordering]) -> Callable[[_Row], tuple]:
+    def component(ordering: gaql.Ordering, row: _Row) -> Any:
+        value = row.get(ordering.field)
+        if ordering.descending:
+            value = _Descending(value)
+        # Missing values sort last, and never get compared to the others.
+        return (row.get(ordering.field) is None, value)
+
+    return lambda row: tuple(component(o, row) for o in orderings)
+
+
+def merge(plan: ShardPlan, results: Sequence[Iterable[_Row]]) -> List[_Row]:
+    """Merges the rows of the sub-queries into the result of the query.
+
+    Args:
+        plan: the plan the sub-queries come from.
+        results: the rows of each sub-query, in the order of `plan.queries`.
+    """
+    if plan.orderings:
+        rows = heapq.merge(*results, key=_sort_key(plan.orderings))
+    else:
+        rows = itertools.chain.from_iterable(results)
+    return list(itertools.islice(rows, plan.limit))
+
+
+class ShardConfig(NamedTuple):
+    """When and how queries are sharded.
+
+    Attributes:
+        window: "week" or "month", or "" if sharding is disabled.
+        min_days: the longest date range that is not split.
+        workers: how many windows of one query may run at once.
+    """
+
+    window: str = _DEFAULT_WINDOW
+    min_days: int = _DEFAULT_MIN_DAYS
+    workers: int = _DEFAULT_WORKERS
+
+    def plan(self, query: str) -> Optional[ShardPlan]:
+        """Returns the sub-queries of `query`, see `plan_shards`."""
+        if not self.window:
+            return None
+        return plan_shards(query, self.window, self.min_days)
+
+
+def load_config() -> ShardConfig:
+    """Returns the sharding configuration of the environment.
+
+    GOOGLE_ADS_MCP_SHARD_WINDOW is "week", "month" (default) or "none" to
+    disable sharding. GOOGLE_ADS_MCP_SHARD_MIN_DAYS is the longest range
+    that is not split (default 90) and GOOGLE_ADS_MCP_SHARD_WORKERS how many
+    windows of one query run at once (default 4).
+    """
+    window = os.environ.get("GOOGLE_ADS_MCP_SHARD_WINDOW") or _DEFAULT_WINDOW
+    window = window.strip().lower()
+    return ShardConfig(
+        window=window if window in WINDOWS else "",
+        min_days=utils.get_int_env(
+            "GOOGLE_ADS_MCP_SHARD_MIN_DAYS", _DEFAULT_MIN_DAYS
+        ),
+        workers=max(
+            1,
+            utils.get_int_env("GOOGLE_ADS_MCP_SHARD_WORKERS", _DEFAULT_WORKERS),
+        ),
+    )
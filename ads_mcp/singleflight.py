@@ -0,0 +1,285 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Coalescing of identical concurrent upstream streams.
+
+While a stream for a given key is in flight, further requests for the same key
+join it instead of opening their own upstream call. Every reader receives all
+items of the stream from the start, including items that arrived before it
+joined, and then follows the stream as new items arrive.
+
+Items are only buffered until the slowest reader has read them. A stream can
+therefore only be joined until its first item was read by every reader;
+later requests open a stream of their own.
+
+A reader whose tool call is cancelled stops reading at its next item, and
+at once if it is waiting for another reader to pull one. The reader pulling
+an item runs the upstream stream and can't leave it halfway, so it stops
+once that item has arrived, which is at once only if it was the last reader:
+the upstream stream is cancelled once every one of its readers was cancelled
+or closed.
+"""
+
+import collections
+import threading
+from typing import Any, Callable, Deque, Dict, Hashable, Iterator, Optional
+
+from ads_mcp import cancellation
+
+
+class StreamAbandonedError(RuntimeError):
+    """Raised to readers of a stream that was closed by all its readers."""
+
+
+class _Flight:
+    """One upstream stream shared by any number of readers."""
+
+    def __init__(
+        self,
+        open_source: Callable[[], Iterator[Any]],
+        on_done: Callable[["_Flight"], None],
+    ):
+        self._open_source = open_source
+        self._on_done = on_done
+        self._source: Optional[Iterator[Any]] = None
+        # The items not read by every reader yet, the first being item
+        # `_offset` of the stream.
+        self._items: Deque[Any] = collections.deque()
+        self._offset = 0
+        # The number of readers at each position of the stream.
+        self._positions: "collections.Counter[int]" = collections.Counter()
+        self._cond = threading.Condition()
+        self._pulling = False
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._readers = 0
+        self._cancelled_readers = 0
+        # Set when every reader was cancelled, which cancels the source.
+        self._token = cancellation.CancelToken()
+
+    def join(self) -> bool:
+        """Registers a reader at the start of the stream.
+
+        Returns:
+            False if the flight is done or its first item was dropped.
+        """
+        with self._cond:
+            if self._done or self._offset:
+                return False
+            self._readers += 1
+            self._positions[0] += 1
+            return True
+
+    def release(self, index: int, cancelled: bool = False) -> None:
+        """Unregisters a reader, closing the source if it was the last one.
+
+        Args:
+            index: the position of the reader in the stream.
+            cancelled: whether the reader was cancelled before.
+        """
+        with self._cond:
+            self._readers -= 1
+            self._move(index, None)
+            if cancelled:
+                self._cancelled_readers -= 1
+            if self._readers > 0 or self._done:
+                abandoned = self._readers == self._cancelled_readers
+                source = None
+            else:
+                self._set_done(StreamAbandonedError("All readers closed"))
+                abandoned = False
+                source = self._source
+        if abandoned:
+            self._token.cancel()
+        if source is None:
+            return
+        self._on_done(self)
+        close = getattr(source, "close", None)
+        if close is not None:
+            close()
+
+    def cancel_reader(self) -> None:
+        """Records that a reader was cancelled, waking it up if it waits."""
+        with self._cond:
+            self._cancelled_readers += 1
+            abandoned = self._readers == self._cancelled_readers
+            self._cond.notify_all()
+        if abandoned:
+            self._token.cancel()
+
+    def get(
+        self, index: int, token: Optional[cancellation.CancelToken] = None
+    ) -> Any:
+        """Returns item `index`, waiting for it or pulling it if needed.
+
+        Raises:
+            StopIteration: if the stream ended before item `index`.
+            cancellation.OperationCancelled: if `token` is set.
+        """
+        with self._cond:
+            while True:
+                if token is not None:
+                    token.check()
+                if index - self._offset < len(self._items):
+                    item = self._items[index - self._offset]
+                    self._move(index, index + 1)
+                    return item
+                if self._done:
+                    if self._error is not None:
+                        raise self._error
+                    raise StopIteration
+                if not self._pulling:
+                    self._pulling = True
+                    break
+                self._cond.wait()
+
+        # Pull the next item outside of the lock so that readers which are
+        # behind can keep reading buffered items meanwhile.
+        try:
+            # The source runs with the token of the flight rather than that
+            # of the reader that happens to pull, which therefore only stops
+            # once the item arrived, unless it was the last reader.
+            with cancellation.use_token(self._token):
+                if self._source is None:
+                    self._source = self._open_source()
+                item = next(self._source)
+        except StopIteration:
+            self._finish(None)
+            raise
+        except BaseException as e:
+            self._finish(e)
+            raise
+        with self._cond:
+            self._items.append(item)
+            self._move(index, index + 1)
+            self._pulling = False
+            self._cond.notify_all()
+        return item
+
+    def _move(self, index: int, new_index: Optional[int]) -> None:
+        """Moves a reader in the stream, or out of it if `new_index` is None.
+
+        Items that every reader has read are dropped. Must hold
+        `self._cond`.
+        """
+        self._positions[index] -= 1
+        if not self._positions[index]:
+            del self._positions[index]
+        if new_index is not None:
+            self._positions[new_index] += 1
+        slowest = min(self._positions, default=self._offset + len(self._items))
+        while self._offset < slowest and self._items:
+            self._items.popleft()
+            self._offset += 1
+
+    def _finish(self, error: Optional[BaseException]) -> None:
+        with self._cond:
+            self._pulling = False
+            self._set_done(error)
+        self._on_done(self)
+
+    def _set_done(self, error: Optional[BaseException]) -> None:
+        """Marks the flight as done. Must hold `self._cond`."""
+        self._done = True
+        self._error = error
+        self._cond.notify_all()
+
+
+class _Reader:
+    """Iterator over the items of a flight."""
+
+    def __init__(self, flight: _Flight):
+        self._flight = flight
+        self._index = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._token = cancellation.current_token()
+        self._remove_callback = (
+            self._token.add_callback(self._cancel)
+            if self._token is not None
+            else None
+        )
+
+    def __iter__(self) -> "_Reader":
+        return self
+
+    def __next__(self) -> Any:
+        if self._closed:
+            raise StopIteration
+        try:
+            item = self._flight.get(self._index, self._token)
+        except BaseException:
+            self.close()
+            raise
+        self._index += 1
+        return item
+
+    def _cancel(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._cancelled = True
+            self._flight.cancel_reader()
+
+    def close(self) -> None:
+        if self._remove_callback is not None:
+            self._remove_callback()
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._flight.release(self._index, self._cancelled)
+
+
+class SingleFlight:
+    """Shares in-flight streams between callers requesting the same key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def stream(
+        self, key: Hashable, open_source: Callable[[], Iterator[Any]]
+    ) -> Iterator[Any]:
+        """Returns an iterator over the stream identified by `key`.
+
+        If a stream for `key` is in flight, the iterator reads from it.
+        Otherwise `open_source` is called to open a new stream, which other
+        callers can join until it ends. Closing the iterator before the
+        stream ends leaves it to its other readers; once every reader has
+        closed, the upstream iterator is closed too.
+
+        Args:
+            key: identifies streams that produce the same items.
+            open_source: opens the upstream iterator. It is called lazily, on
+                the first read.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None or not flight.join():
+                flight = _Flight(open_source, lambda f: self._forget(key, f))
+                flight.join()
+                self._flights[key] = flight
+        return _Reader(flight)
+
+    def in_flight(self) -> int:
+        """Returns the number of streams currently in flight."""
+        with self._lock:
+            return len(self._flights)
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
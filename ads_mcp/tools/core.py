@@ -14,9 +14,17 @@
 
 """Tools for exposing simple, core API methods to the MCP server."""
 
-from typing import List
+import functools
+from typing import Any, Dict, Iterable, List, Optional
 from ads_mcp.coordinator import mcp
 
+from ads_mcp import aio
+from ads_mcp import cancellation
+from ads_mcp import instrumentation
+from ads_mcp import metrics
+from ads_mcp import ratelimit
+from ads_mcp import retry
+from ads_mcp import tracing
 import ads_mcp.utils as utils
 
 from google.ads.googleads.v21.services.types.customer_service import (
@@ -24,15 +32,71 @@ from google.ads.googleads.v21.services.types.customer_service import (
 )
 
 
-@mcp.tool()
 def list_accessible_customers() -> List[str]:
     """Returns ids of customers directly accessible by the user authenticating the call."""
-    ga_service = utils.get_googleads_service("CustomerService")
-    accessible_customers: ListAccessibleCustomersResponse = (
-        ga_service.list_accessible_customers()
+    with tracing.span("ads_mcp.rpc", method="ListAccessibleCustomers"):
+        accessible_customers = retry.call(
+            _list_accessible_customers, sleep=cancellation.sleep
+        )
+    return _customer_ids(accessible_customers.resource_names)
+
+
+def _customer_ids(resource_names: Iterable[str]) -> List[str]:
+    with tracing.span("ads_mcp.format") as span:
+        # remove customer/ from the start of each resource
+        customer_ids = [
+            cust_rn.removeprefix("customers/") for cust_rn in resource_names
+        ]
+        span.set_attribute("rows", len(customer_ids))
+    return customer_ids
+
+
+def _list_accessible_customers(
+    timeout: Optional[float],
+) -> ListAccessibleCustomersResponse:
+    """Makes one attempt of the ListAccessibleCustomers call."""
+    developer_token = utils.get_googleads_client().developer_token
+    with ratelimit.get_scheduler().request(developer_token):
+        ga_service = utils.get_googleads_service("CustomerService")
+        return ga_service.list_accessible_customers(timeout=timeout)
+
+
+@functools.wraps(list_accessible_customers)
+async def _list_accessible_customers_async() -> List[str]:
+    with tracing.span("ads_mcp.rpc", method="ListAccessibleCustomers"):
+        api = await aio.get_async_api()
+        resource_names = await api.list_accessible_customers()
+    return _customer_ids(resource_names)
+
+
+mcp.add_tool(
+    cancellation.tool(
+        _list_accessible_customers_async
+        if aio.enabled()
+        else list_accessible_customers
     )
-    # remove customer/ from the start of each resource
-    return [
-        cust_rn.removeprefix("customers/")
-        for cust_rn in accessible_customers.resource_names
-    ]
+)
+
+
+metrics.register_stats(
+    "rate_limit",
+    lambda: ratelimit.get_scheduler().stats(),
+    counters=(
+        "requests",
+        "queued_requests",
+        "wait_seconds_total",
+        "quota_errors",
+    ),
+)
+
+
+@mcp.tool()
+def rate_limit_stats() -> Dict[str, Any]:
+    """Returns queue depth, wait time and quota error counters of the API request scheduler."""
+    return ratelimit.get_scheduler().stats()
+
+
+@mcp.tool()
+def rpc_stats() -> Dict[str, Any]:
+    """Returns latency, time to first message, response message count and status code statistics of the API calls, per method."""
+    return instrumentation.get_rpc_metrics().stats()
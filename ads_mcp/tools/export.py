@@ -0,0 +1,93 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tools for exporting large reports to files instead of tool results."""
+
+import contextlib
+import datetime
+import os
+from typing import Any, Dict
+from ads_mcp.coordinator import mcp
+
+from ads_mcp import cancellation
+from ads_mcp import clients
+from ads_mcp import export
+from ads_mcp import gaql
+from ads_mcp.tools import search
+import ads_mcp.utils as utils
+
+# Directory reports are written to; `export_report` paths are relative to it.
+_EXPORT_DIR = os.environ.get("GOOGLE_ADS_MCP_EXPORT_DIR") or os.path.expanduser(
+    "~/google-ads-mcp-exports"
+)
+
+
+def export_report(
+    customer_id: str,
+    query: str,
+    format: str = "ndjson",
+    path: str = None,
+    compression: str = "none",
+    login_customer_id: str = None,
+) -> Dict[str, Any]:
+    """Writes the full result of a GAQL query to a file on the server
+
+    Use this instead of `search` for reports that are too large to read,
+    e.g. to hand them to another program. The rows are streamed to the file
+    and never returned.
+
+    Args:
+        customer_id: The id of the customer
+        query: Full GAQL query, see the `search` tool for the syntax
+        format: "ndjson" (default, one JSON object per line), "csv" or
+            "parquet"
+        path: The file to write, relative to the export directory of the
+            server. Defaults to a new file named after the customer and time.
+        compression: "none" (default), "gzip" or "zstd"
+        login_customer_id: The id of the manager account to access the
+            customer through, if not the one the server is configured with
+
+    Returns:
+        The `path`, `format`, `compression`, number of `rows`, size in
+        `bytes` and `schema` (column names and types) of the written file.
+    """
+    customer_id = customer_id.replace("-", "")
+    query = search._build_query(None, None, None, None, None, query)
+    if format not in export.FORMATS:
+        raise ValueError(f"format must be one of {', '.join(export.FORMATS)}")
+    if compression not in export.COMPRESSIONS:
+        raise ValueError(
+            f"compression must be one of {', '.join(export.COMPRESSIONS)}"
+        )
+    timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = export.resolve_path(
+        _EXPORT_DIR,
+        path,
+        f"report-{customer_id}-{timestamp}"
+        + export.extension(format, compression),
+    )
+    utils.logger.info(f"ads_mcp.export_report query {query} to {path}")
+
+    # Not shared with concurrent searches, whose buffers would grow with the
+    # size of the report.
+    with clients.login_customer(login_customer_id):
+        batches = search._stream_batches(customer_id, query)
+        with contextlib.closing(batches):
+            return export.write_report(
+                batches, path, format, compression, gaql.parse(query).fields
+            )
+
+
+# Runs on a worker thread, which keeps the blocking writes off the loop.
+mcp.add_tool(cancellation.tool(export_report))
@@ -0,0 +1,65 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tools for discovering the GAQL resources and their fields."""
+
+import difflib
+from typing import Dict, List
+from ads_mcp.coordinator import mcp
+
+from ads_mcp import catalog
+
+_KINDS = ("selectable", "filterable", "sortable")
+
+
+@mcp.tool()
+def list_resources() -> List[str]:
+    """Returns the names of all resources that can be queried with `search`.
+
+    `metrics` and `segments` are listed too; their fields can be selected
+    together with most resources. Use `describe_resource` for the fields of
+    a resource.
+    """
+    return catalog.get_catalog().resources()
+
+
+@mcp.tool()
+def describe_resource(name: str, kind: str = "all") -> Dict[str, List[str]]:
+    """Returns the fields of a resource that can be used in `search` queries
+
+    Args:
+        name: The name of the resource, e.g. campaign, metrics or segments
+        kind: Which fields to return: "selectable" (SELECT clause),
+            "filterable" (WHERE clause), "sortable" (ORDER BY clause) or
+            "all" (default) for all three lists.
+
+    Returns:
+        The sorted field names, keyed by kind.
+    """
+    if kind != "all" and kind not in _KINDS:
+        raise ValueError(
+            f"kind must be one of {', '.join(_KINDS)} or all, got {kind!r}"
+        )
+    field_catalog = catalog.get_catalog()
+    fields = field_catalog.get(name)
+    if fields is None:
+        message = f"Unknown resource {name!r}."
+        matches = difflib.get_close_matches(
+            name, field_catalog.resources(), n=3
+        )
+        if matches:
+            message += f" Did you mean {', '.join(matches)}?"
+        raise ValueError(message)
+    kinds = _KINDS if kind == "all" else (kind,)
+    return {k: sorted(getattr(fields, k)) for k in kinds}
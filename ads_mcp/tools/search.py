@@ -14,10 +14,61 @@
 
 """Tools for exposing the API Search method to the MCP server."""
 
-from typing import Any, Dict, List
+import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
 from ads_mcp.coordinator import mcp
+from ads_mcp import aggregation
+from ads_mcp import aio
+from ads_mcp import cache
+from ads_mcp import cancellation
+from ads_mcp import catalog
+from ads_mcp import clients
+from ads_mcp import concurrency
+from ads_mcp import cursors
+from ads_mcp import gaql
+from ads_mcp import metrics
+from ads_mcp import projection
+from ads_mcp import ratelimit
+from ads_mcp import retry
+from ads_mcp import sharding
+from ads_mcp import singleflight
+from ads_mcp import tracing
 import ads_mcp.utils as utils
 
+# Open cursors of paged `search` calls.
+_cursors = cursors.create_registry()
+
+# Results of recent `search` calls.
+_results = cache.create_cache()
+metrics.register_stats(
+    "search_cache",
+    _results.stats,
+    counters=("hits", "misses", "evictions", "expirations"),
+)
+
+# In-flight `search_stream` calls, shared by identical concurrent searches.
+_flights = singleflight.SingleFlight()
+
+# How queries over long date ranges are split into parallel sub-queries.
+_shard_config = sharding.load_config()
+
+# Upper bound of the customers `search_many` queries at the same time.
+_SEARCH_MANY_WORKERS = utils.get_int_env(
+    "GOOGLE_ADS_MCP_SEARCH_MANY_WORKERS", 8
+)
+
+# Limits concurrent `search_many` streams per customer across tool calls.
+_customer_slots = concurrency.KeyedSemaphore(
+    utils.get_int_env("GOOGLE_ADS_MCP_PER_CUSTOMER_CONCURRENCY", 2)
+)
+
 
 def search(
     customer_id: str,
@@ -27,7 +78,13 @@ def search(
     orderings: List[str] = None,
     limit: int | str = None,
     query: str = None,
-) -> List[Dict[str, Any]]:
+    page_size: int = None,
+    cursor: str = None,
+    format: str = "rows",
+    group_by: List[str] = None,
+    aggregates: List[str] = None,
+    login_customer_id: str = None,
+) -> List[Dict[str, Any]] | Dict[str, Any]:
     """Fetches data from the Google Ads API using the search method
 
     Args:
@@ -38,45 +95,572 @@ def search(
         orderings: How the data is ordered
         limit: The maximum number of rows to return
         query: Full GAQL query (alternative to fields/resource parameters)
+        page_size: Return results in pages of at most this many rows. The
+            result is then an object with the `rows` of the page and a
+            `cursor` for the next page, which is null on the last page.
+        cursor: The cursor returned by a previous paged call. Fetches the
+            next page of that call, by default with the same page_size; all
+            other arguments except customer_id and page_size are ignored.
+        format: "rows" (default) returns a list with one object per row.
+            "columnar" returns {"columns": [...], "data": {column: [values]}},
+            which is much more compact for reports with many rows. Columnar
+            results can't be paged.
+        group_by: Aggregate the rows by these selected fields and return one
+            row per group instead of every row, e.g. ["campaign.name"].
+        aggregates: Aggregate columns to compute over the selected fields of
+            each group (or of all rows if group_by is not given), one of
+            sum, avg, min, max or count, e.g. ["sum(metrics.clicks)",
+            "avg(metrics.ctr)", "count(*)"]. The LIMIT of the query applies
+            to the rows before aggregation. Aggregated results can't be
+            paged and are always returned as rows.
+        login_customer_id: The id of the manager account to access the
+            customer through, if not the one the server is configured with.
+            Pages of a cursor are always fetched through the manager account
+            of its first page.
+
+    """
+    grouping = aggregation.parse_aggregation(group_by, aggregates)
+    _check_output_args(page_size, cursor, format, grouping)
+
+    if cursor:
+        rows, next_cursor = _cursors.fetch(
+            cursor, page_size, owner=customer_id
+        )
+        return {"rows": rows, "cursor": next_cursor}
+
+    query = _parse_query(
+        grouping, fields, resource, conditions, orderings, limit, query
+    )
+    utils.logger.info(f"ads_mcp.search query {query}")
+
+    with clients.login_customer(login_customer_id):
+        if page_size:
+            rows, next_cursor = _cursors.open(
+                _stream_rows(customer_id, query, paged=True),
+                page_size,
+                owner=customer_id,
+            )
+            return {"rows": rows, "cursor": next_cursor}
+
+        return _run_query(customer_id, query, format, grouping)
+
+
+def _check_output_args(
+    page_size: int,
+    cursor: str,
+    format: str,
+    grouping: aggregation.Aggregation = None,
+) -> None:
+    """Validates the `search` arguments controlling the result shape."""
+    if page_size is not None and page_size < 1:
+        raise ValueError("page_size must be a positive number of rows")
+    if format not in ("rows", "columnar"):
+        raise ValueError("format must be either 'rows' or 'columnar'")
+    if format == "columnar" and (page_size or cursor):
+        raise ValueError("Columnar results can't be paged")
+    if grouping and (page_size or cursor or format != "rows"):
+        raise ValueError("Aggregated results can't be paged or columnar")
+
+
+def _parse_query(
+    grouping: Optional[aggregation.Aggregation],
+    fields: List[str],
+    resource: str,
+    conditions: List[str],
+    orderings: List[str],
+    limit: int | str,
+    query: str,
+) -> str:
+    """Builds and checks the query of a `search` call, in a parse span."""
+    with tracing.span("ads_mcp.parse") as span:
+        query = _build_query(
+            fields, resource, conditions, orderings, limit, query
+        )
+        _check_grouping(grouping, query)
+        if span.recording:
+            span.set_attribute("resource", gaql.parse(query).resource)
+    return query
+
+
+def _check_grouping(grouping: aggregation.Aggregation, query: str) -> None:
+    """Checks that the query selects every field the aggregation reads."""
+    if grouping:
+        selected = gaql.parse(query).fields
+        missing = [f for f in grouping.fields if f not in selected]
+        if missing:
+            raise ValueError(
+                "Aggregated fields must be selected by the query: "
+                + ", ".join(missing)
+            )
+
+
+class _RowsBuilder:
+    """Accumulates `search_stream` batches into a list of formatted rows."""
+
+    def __init__(self):
+        self.rows: List[Dict[str, Any]] = []
+
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    def add_batch(self, batch: Any) -> None:
+        self.rows.extend(utils.format_output_rows(batch))
+
+    def result(self) -> List[Dict[str, Any]]:
+        return self.rows
+
+
+def _result_builder(
+    format: str, grouping: aggregation.Aggregation = None
+) -> Any:
+    """Returns the accumulator of stream batches for a result shape."""
+    if grouping:
+        return aggregation.AggregateBuilder(grouping)
+    if format == "columnar":
+        return projection.ColumnBuilder()
+    return _RowsBuilder()
+
+
+class _ShardedBuilder:
+    """Accumulates the batches of the sub-queries of a sharded query.
+
+    Rows are kept per sub-query and merged at the end, while aggregates fold
+    the batches of all sub-queries into one AggregateBuilder.
+    """
+
+    def __init__(
+        self,
+        shards: sharding.ShardPlan,
+        grouping: Optional[aggregation.Aggregation],
+    ):
+        self.shards = shards
+        self._lock = threading.Lock()
+        self._aggregate = grouping and aggregation.AggregateBuilder(grouping)
+        self._rows = [_RowsBuilder() for _ in shards.queries]
+        self._result = None
+
+    @property
+    def row_count(self) -> int:
+        return len(self.result())
+
+    def add_batch(self, shard: int, batch: Any) -> None:
+        """Adds a batch of the sub-query at index `shard`."""
+        if self._aggregate:
+            with self._lock:
+                self._aggregate.add_batch(batch)
+        else:
+            self._rows[shard].add_batch(batch)
+
+    def result(self) -> List[Dict[str, Any]]:
+        if self._result is None:
+            if self._aggregate:
+                self._result = self._aggregate.result()
+            else:
+                self._result = sharding.merge(
+                    self.shards, [builder.rows for builder in self._rows]
+                )
+        return self._result
+
+
+def _shard_plan(
+    query: str, format: str, grouping: Optional[aggregation.Aggregation]
+) -> Optional[sharding.ShardPlan]:
+    """Returns the sub-queries to run instead of `query`, if any.
+
+    Columnar results are not sharded, nor are aggregates of queries with a
+    LIMIT, which applies to the rows before aggregation.
+    """
+    if format != "rows":
+        return None
+    shards = _shard_config.plan(query)
+    if shards is None or (grouping and shards.limit):
+        return None
+    return shards
+
+
+def _run_shards(
+    customer_id: str,
+    shards: sharding.ShardPlan,
+    grouping: Optional[aggregation.Aggregation],
+) -> _ShardedBuilder:
+    """Runs the sub-queries of a sharded query in parallel."""
+    builder = _ShardedBuilder(shards, grouping)
+
+    def run(shard: int) -> None:
+        _read_stream(
+            customer_id,
+            _shared_batches(customer_id, shards.queries[shard]),
+            functools.partial(builder.add_batch, shard),
+        )
+
+    workers = min(_shard_config.workers, len(shards.queries))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        # Each window runs in a copy of the context, with the deadline of
+        # the tool call.
+        futures = [
+            pool.submit(contextvars.copy_context().run, run, shard)
+            for shard in range(len(shards.queries))
+        ]
+        for future in futures:
+            future.result()
+    return builder
+
+
+def _batch_rows(batch: Any) -> int:
+    return len(getattr(batch, "_pb", batch).results)
+
 
+def _read_stream(
+    customer_id: str,
+    batches: Iterator[Any],
+    add_batch: Callable[[Any], None],
+) -> None:
+    """Adds every batch of a stream with `add_batch`, then closes it.
+
+    The stream is read in a search_stream span, with the time to the first
+    batch and the batch and row counts, and each batch is added in a format
+    span. The rest of the stream span is spent waiting for the API.
     """
+    with contextlib.closing(batches), tracing.span(
+        "ads_mcp.search_stream", customer_id=customer_id
+    ) as span:
+        start = time.perf_counter()
+        batch_count = row_count = 0
+        for batch in batches:
+            if span.recording:
+                if not batch_count:
+                    span.set_attribute(
+                        "first_batch_seconds", time.perf_counter() - start
+                    )
+                rows = _batch_rows(batch)
+                batch_count += 1
+                row_count += rows
+                with tracing.span("ads_mcp.format", rows=rows):
+                    add_batch(batch)
+            else:
+                add_batch(batch)
+        span.set_attributes(
+            {"batch_count": batch_count, "row_count": row_count}
+        )
+
+
+async def _read_stream_async(
+    customer_id: str,
+    batches: AsyncIterator[Any],
+    add_batch: Callable[[Any], None],
+) -> None:
+    """The asyncio equivalent of `_read_stream`."""
+    async with contextlib.aclosing(batches):
+        with tracing.span(
+            "ads_mcp.search_stream", customer_id=customer_id
+        ) as span:
+            start = time.perf_counter()
+            batch_count = row_count = 0
+            async for batch in batches:
+                if span.recording:
+                    if not batch_count:
+                        span.set_attribute(
+                            "first_batch_seconds", time.perf_counter() - start
+                        )
+                    rows = _batch_rows(batch)
+                    batch_count += 1
+                    row_count += rows
+                    with tracing.span("ads_mcp.format", rows=rows):
+                        add_batch(batch)
+                else:
+                    add_batch(batch)
+            span.set_attributes(
+                {"batch_count": batch_count, "row_count": row_count}
+            )
+
+
+def _shared_batches(customer_id: str, query: str) -> Iterator[Any]:
+    """Returns the batches of `query`, shared with identical searches."""
+    query_key = _results.make_key(
+        utils.get_login_customer_id(), customer_id, query
+    )
+    return _flights.stream(
+        query_key, lambda: _stream_batches(customer_id, query)
+    )
+
+
+def _run_query(
+    customer_id: str,
+    query: str,
+    format: str = "rows",
+    grouping: aggregation.Aggregation = None,
+) -> Any:
+    """Returns the full result of `query`, from the cache if possible."""
+    query_key = _results.make_key(
+        utils.get_login_customer_id(), customer_id, query
+    )
+    cache_key = query_key + (format, grouping)
+    if _results.enabled:
+        cached = _results.get(cache_key)
+        if cached is not None:
+            return cached
+
+    shards = _shard_plan(query, format, grouping)
+    if shards:
+        builder = _run_shards(customer_id, shards, grouping)
+    else:
+        # Identical queries running concurrently share one upstream stream.
+        builder = _result_builder(format, grouping)
+        _read_stream(
+            customer_id,
+            _shared_batches(customer_id, query),
+            builder.add_batch,
+        )
+
+    result = builder.result()
+    _results.put(cache_key, result, query, builder.row_count)
+    return result
+
+
+@functools.wraps(search)
+async def _search_async(customer_id: str, **kwargs) -> Any:
+    """The `search` tool on the asyncio execution path (see `ads_mcp.aio`)."""
+    arguments = inspect.signature(search).bind(customer_id, **kwargs)
+    arguments.apply_defaults()
+    args = arguments.arguments
+    if args["page_size"] or args["cursor"]:
+        # Cursors keep reading from synchronous streams, so paged searches
+        # run the synchronous implementation on a worker thread.
+        return await asyncio.to_thread(search, customer_id, **kwargs)
+
+    grouping = aggregation.parse_aggregation(
+        args["group_by"], args["aggregates"]
+    )
+    _check_output_args(None, None, args["format"], grouping)
+    query = _parse_query(
+        grouping,
+        args["fields"],
+        args["resource"],
+        args["conditions"],
+        args["orderings"],
+        args["limit"],
+        args["query"],
+    )
+    utils.logger.info(f"ads_mcp.search query {query}")
+    with clients.login_customer(args["login_customer_id"]):
+        return await _run_query_async(
+            customer_id, query, args["format"], grouping
+        )
+
+
+class _AsyncFlight:
+    """An in-flight async query and the number of calls waiting for it."""
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+# In-flight async queries by cache key, shared by identical concurrent calls.
+_async_flights: Dict[tuple, _AsyncFlight] = {}
+
+
+async def _run_query_async(
+    customer_id: str,
+    query: str,
+    format: str = "rows",
+    grouping: aggregation.Aggregation = None,
+) -> Any:
+    """The asyncio equivalent of `_run_query`."""
+    cache_key = _results.make_key(
+        utils.get_login_customer_id(), customer_id, query, format, grouping
+    )
+    if _results.enabled:
+        cached = _results.get(cache_key)
+        if cached is not None:
+            return cached
+
+    flight = _async_flights.get(cache_key)
+    if flight is None:
+        flight = _AsyncFlight(
+            asyncio.ensure_future(
+                _fetch_async(customer_id, query, format, grouping, cache_key)
+            )
+        )
+        _async_flights[cache_key] = flight
+        flight.task.add_done_callback(
+            lambda _: _async_flights.pop(cache_key, None)
+        )
+    # Shielded so that one caller going away doesn't fail the others, but
+    # cancelled once no caller is waiting for it any more.
+    flight.waiters += 1
+    try:
+        return await asyncio.shield(flight.task)
+    finally:
+        flight.waiters -= 1
+        if not flight.waiters and not flight.task.done():
+            flight.task.cancel()
+
+
+async def _fetch_async(
+    customer_id: str,
+    query: str,
+    format: str,
+    grouping: Optional[aggregation.Aggregation],
+    cache_key: tuple,
+) -> Any:
+    shards = _shard_plan(query, format, grouping)
+    if shards:
+        builder = await _run_shards_async(customer_id, shards, grouping)
+    else:
+        builder = _result_builder(format, grouping)
+        await _read_stream_async(
+            customer_id,
+            (await aio.get_async_api()).search_stream(customer_id, query),
+            builder.add_batch,
+        )
+
+    result = builder.result()
+    _results.put(cache_key, result, query, builder.row_count)
+    return result
+
+
+async def _run_shards_async(
+    customer_id: str,
+    shards: sharding.ShardPlan,
+    grouping: Optional[aggregation.Aggregation],
+) -> _ShardedBuilder:
+    """The asyncio equivalent of `_run_shards`."""
+    builder = _ShardedBuilder(shards, grouping)
+    slots = asyncio.Semaphore(_shard_config.workers)
+
+    async def run(shard: int) -> None:
+        async with slots:
+            await _read_stream_async(
+                customer_id,
+                (await aio.get_async_api()).search_stream(
+                    customer_id, shards.queries[shard]
+                ),
+                functools.partial(builder.add_batch, shard),
+            )
+
+    await asyncio.gather(*(run(i) for i in range(len(shards.queries))))
+    return builder
+
+
+def search_many(
+    customer_ids: List[str],
+    query: str,
+    max_workers: int = None,
+    login_customer_id: str = None,
+) -> Dict[str, Any]:
+    """Runs one GAQL query against many customers concurrently
+
+    Use this instead of calling `search` once per customer, e.g. to build a
+    report across all accounts of a manager account.
+
+    Args:
+        customer_ids: The ids of the customers to query
+        query: Full GAQL query, see the `search` tool for the syntax
+        max_workers: How many customers to query at the same time
+        login_customer_id: The id of the manager account to access the
+            customers through, if not the one the server is configured with
+
+    Returns:
+        An object with the merged `rows` of all customers, each with an extra
+        `customer_id` column, and the `errors` of customers whose query
+        failed, as a list of objects with `customer_id` and `error`.
+    """
+    customer_ids = list(
+        dict.fromkeys(cid.replace("-", "") for cid in customer_ids)
+    )
+    query = _build_query(None, None, None, None, None, query)
+    utils.logger.info(
+        f"ads_mcp.search_many query {query} for {len(customer_ids)} customers"
+    )
+
+    def run(customer_id: str) -> List[Dict[str, Any]]:
+        with _customer_slots.hold(customer_id):
+            return _run_query(customer_id, query)
+
+    workers = min(max_workers or _SEARCH_MANY_WORKERS, _SEARCH_MANY_WORKERS)
+    workers = max(1, min(workers, len(customer_ids)))
+    rows = []
+    errors = []
+    with (
+        clients.login_customer(login_customer_id),
+        concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool,
+    ):
+        futures = [
+            pool.submit(contextvars.copy_context().run, run, cid)
+            for cid in customer_ids
+        ]
+        # Merge in the order of `customer_ids` so the output is stable.
+        for customer_id, future in zip(customer_ids, futures):
+            try:
+                customer_rows = future.result()
+            except cancellation.OperationCancelled:
+                raise
+            except Exception as e:
+                utils.logger.warning(
+                    f"ads_mcp.search_many failed for {customer_id}: {e}"
+                )
+                errors.append(
+                    {
+                        "customer_id": customer_id,
+                        "error": utils.describe_error(e),
+                    }
+                )
+                continue
+            # Cached rows are shared, so they are copied rather than updated.
+            rows.extend(
+                {"customer_id": customer_id, **row} for row in customer_rows
+            )
+    return {"rows": rows, "errors": errors}
+
+
+mcp.add_tool(cancellation.tool(search_many))
+
+
+@mcp.tool()
+def search_cache_stats() -> Dict[str, Any]:
+    """Returns hit, miss and eviction counters of the search result cache."""
+    return _results.stats()
+
+
+def _build_query(
+    fields: List[str],
+    resource: str,
+    conditions: List[str],
+    orderings: List[str],
+    limit: int | str,
+    query: str,
+) -> str:
+    """Builds the canonical GAQL query from the `search` tool arguments.
+
+    The SELECT and FROM clauses of `query` take precedence over `fields` and
+    `resource`, while `conditions`, `orderings` and `limit` replace the
+    corresponding clauses of `query`.
+
+    Raises:
+        gaql.GaqlSyntaxError: if the resulting query isn't valid GAQL.
+        catalog.InvalidQueryError: if the query uses unknown resources or
+            fields, or fields in clauses that don't support them.
+    """
+    parameters = ""
     # Handle query parameter for Claude.ai compatibility
     if query:
-        import re
-        query = query.strip()
-        
-        # Extract SELECT fields and FROM resource
-        select_match = re.search(r'SELECT\s+(.+?)\s+FROM\s+(\w+)', query, re.IGNORECASE)
-        if select_match:
-            fields = [field.strip() for field in select_match.group(1).split(',')]
-            resource = select_match.group(2)
-            
-            # Parse WHERE conditions
-            if not conditions:
-                where_match = re.search(r'WHERE\s+(.+?)(?:\s+ORDER\s+BY|\s+LIMIT|$)', query, re.IGNORECASE)
-                if where_match:
-                    conditions = [where_match.group(1)]
-            
-            # Parse ORDER BY
-            if not orderings:
-                order_match = re.search(r'ORDER\s+BY\s+(.+?)(?:\s+LIMIT|$)', query, re.IGNORECASE)
-                if order_match:
-                    orderings = [order_match.group(1)]
-            
-            # Parse LIMIT
-            if not limit:
-                limit_match = re.search(r'LIMIT\s+(\d+)', query, re.IGNORECASE)
-                if limit_match:
-                    limit = int(limit_match.group(1))
-        else:
-            raise ValueError("Invalid GAQL query: missing SELECT and FROM clauses")
-    
+        plan = gaql.parse(query)
+        if not (conditions or orderings or limit):
+            catalog.get_catalog().validate(plan)
+            return plan.canonical
+        fields, resource = plan.fields, plan.resource
+        conditions = conditions or [str(c) for c in plan.conditions]
+        orderings = orderings or [str(o) for o in plan.orderings]
+        limit = limit or plan.limit
+        if plan.parameters:
+            parameters = " " + gaql.format_parameters(plan.parameters)
+
     # Validate required parameters
     if not fields or not resource:
         raise ValueError("Either 'query' parameter or both 'fields' and 'resource' parameters are required")
 
-    ga_service = utils.get_googleads_service("GoogleAdsService")
-
     query_parts = [f"SELECT {','.join(fields)} FROM {resource}"]
 
     if conditions:
@@ -88,36 +672,97 @@ def search(
     if limit:
         query_parts.append(f" LIMIT {limit}")
 
-    query = "".join(query_parts)
-    utils.logger.info(f"ads_mcp.search query {query}")
+    query_parts.append(parameters)
 
-    query_result = ga_service.search_stream(
-        customer_id=customer_id, query=query
-    )
+    plan = gaql.parse("".join(query_parts))
+    catalog.get_catalog().validate(plan)
+    return plan.canonical
 
-    final_output: List = []
-    for batch in query_result:
-        for row in batch.results:
-            final_output.append(
-                utils.format_output_row(row, batch.field_mask.paths)
-            )
-    return final_output
 
+def _stream_batches(
+    customer_id: str, query: str, paged: bool = False
+) -> Iterator[Any]:
+    """Yields the response batches of a `search_stream` call as they arrive.
 
-def _search_tool_description() -> str:
-    """Returns the description for the `search` tool."""
-    # Add a warning that will be part of the description
-    file_content = (
-        "WARNING: The table of selectable fields is missing. "
-        "Tool may not function correctly."
+    Transient errors are retried, see `retry.retry_stream`. Closing the
+    generator before it is exhausted cancels the stream. The stream is made
+    as the tenant of the current context, even if the generator is resumed
+    from another one, e.g. by a cursor.
+
+    Paged streams are read by several tool calls, so the gRPC call has no
+    timeout and every batch is read within the deadline and cancellation of
+    the tool call reading it.
+    """
+    return retry.retry_stream(
+        functools.partial(
+            _search_stream, utils.get_client_key(), customer_id, query
+        ),
+        sleep=cancellation.sleep,
+        timeout=not paged,
     )
 
-    try:
-        with open(utils.GAQL_FILEPATH, "r") as file:
-            file_content = file.read()
-    except FileNotFoundError:
-        utils.logger.error("The specified file was not found.")
 
+_END = object()
+
+
+def _search_stream(
+    key: clients.ClientKey,
+    customer_id: str,
+    query: str,
+    timeout: Optional[float],
+) -> Iterator[Any]:
+    """Yields the response batches of one `search_stream` attempt.
+
+    Cancelling the tool call reading a batch cancels the gRPC call, and so
+    does passing its deadline if the call has no timeout.
+    """
+    with ratelimit.get_scheduler().request(key.developer_token, customer_id):
+        ga_service = utils.get_googleads_service("GoogleAdsService", key=key)
+        query_result = ga_service.search_stream(
+            customer_id=customer_id, query=query, timeout=timeout
+        )
+        expire = retry.expire if timeout is None else contextlib.nullcontext
+        batches = iter(query_result)
+        try:
+            while True:
+                # Registered per batch, as the generator is resumed by the
+                # tool call reading it, which for a cursor isn't the one that
+                # started it.
+                with cancellation.on_cancel(query_result.cancel):
+                    with expire(query_result.cancel):
+                        batch = next(batches, _END)
+                if batch is _END:
+                    return
+                cancellation.check()
+                yield batch
+        except GeneratorExit:
+            query_result.cancel()
+            raise
+        except Exception:
+            query_result.cancel()
+            # Calls cancelled through the token fail with CANCELLED.
+            cancellation.check()
+            raise
+
+
+def _stream_rows(
+    customer_id: str, query: str, paged: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Yields the formatted rows of a `search_stream` call as they arrive.
+
+    Closing the generator before it is exhausted cancels the stream.
+    """
+    batches = _stream_batches(customer_id, query, paged)
+    with contextlib.closing(batches):
+        for batch in batches:
+            # Formatted before yielding, as spans can't span a yield.
+            with tracing.span("ads_mcp.format", customer_id=customer_id):
+                rows = list(utils.format_output_rows(batch))
+            yield from rows
+
+
+def _search_tool_description() -> str:
+    """Returns the description for the `search` tool."""
     return f"""
 {search.__doc__}
 
@@ -144,10 +789,9 @@ def _search_tool_description() -> str:
 
 
 ### Hints for all fields
-    What follows is a table of resources and their selectable fields (fields), filterable fields (used in the condition) and sortable fields (use in the ordering)
+    Use the `list_resources` tool for the resources that can be searched, and the `describe_resource` tool for their selectable fields (fields), filterable fields (used in the condition) and sortable fields (use in the ordering)
     Fields are comma separated, the whole field must be used, wildcards and partial fields are not allowed
-    All fields must come from this table and be prefixed with the resource being searched
-    {file_content}
+    All fields must come from `describe_resource` and be prefixed with the resource they belong to
 """
 
 
@@ -156,7 +800,7 @@ def _search_tool_description() -> str:
 # provides the flexibility needed to generate the description while also
 # including the `search` method's docstring.
 mcp.add_tool(
-    search,
+    cancellation.tool(_search_async if aio.enabled() else search),
     title="Fetches data from the Google Ads API using the search method",
     description=_search_tool_description(),
 )
@@ -0,0 +1,284 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tracing spans of the stages of the tool calls.
+
+Tool calls are traced in spans for each stage: building and validating the
+query, reading the response stream of an API call and formatting each of
+its batches. Spans carry attributes such as the customer, the resource, the
+row and batch counts, and nest through context variables, including on the
+worker threads a tool call runs on.
+
+GOOGLE_ADS_MCP_TRACING selects where spans go:
+
+- `off` (default): nowhere, spans cost a no-op context manager.
+- `opentelemetry`: to the OpenTelemetry tracer provider of the process,
+  which is configured outside the server, e.g. with `opentelemetry-instrument`.
+  Falls back to `jsonl` if the `opentelemetry-api` package isn't installed.
+- `jsonl`: one JSON object per finished span, appended to
+  GOOGLE_ADS_MCP_TRACE_FILE (default `~/google-ads-mcp-traces.jsonl`).
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    Optional,
+    TextIO,
+)
+
+import ads_mcp.utils as utils
+
+_DEFAULT_TRACE_FILE = "~/google-ads-mcp-traces.jsonl"
+
+OFF = "off"
+OPENTELEMETRY = "opentelemetry"
+JSONL = "jsonl"
+
+
+class Span:
+    """A span of a tracer that doesn't record anything."""
+
+    recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+
+class Tracer:
+    """A tracer that doesn't record anything."""
+
+    _span = Span()
+
+    @contextlib.contextmanager
+    def span(self, name: str, attributes: Dict[str, Any]) -> Iterator[Span]:
+        """Runs the context in a span named `name`."""
+        yield self._span
+
+    def close(self) -> None:
+        pass
+
+
+class _OpenTelemetrySpan(Span):
+    """An OpenTelemetry span, without attributes set to None."""
+
+    recording = True
+
+    def __init__(self, span: Any):
+        self._span = span
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self._span.set_attribute(key, value)
+
+
+class OpenTelemetryTracer(Tracer):
+    """Records spans with the OpenTelemetry tracer provider of the process.
+
+    Errors raised by the context are recorded on the span and set its
+    status, as `start_as_current_span` does.
+    """
+
+    def __init__(self, tracer: Optional[Any] = None):
+        if tracer is None:
+            from opentelemetry import trace
+
+            tracer = trace.get_tracer("ads_mcp")
+        self._tracer = tracer
+
+    @contextlib.contextmanager
+    def span(self, name: str, attributes: Dict[str, Any]) -> Iterator[Span]:
+        with self._tracer.start_as_current_span(
+            name, attributes=_defined(attributes)
+        ) as span:
+            yield _OpenTelemetrySpan(span)
+
+
+class _JsonSpan(Span):
+    """A span recorded by a JsonLinesTracer."""
+
+    recording = True
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        attributes: Dict[str, Any],
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.attributes = _defined(attributes)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+
+# The span of a JsonLinesTracer the code being run is in.
+_current_span: contextvars.ContextVar[Optional[_JsonSpan]] = (
+    contextvars.ContextVar("ads_mcp_span", default=None)
+)
+
+
+class JsonLinesTracer(Tracer):
+    """Appends every finished span to a file, as one JSON object per line.
+
+    Each line has the `name`, `trace_id`, `span_id` and `parent_span_id` of
+    the span, its start and end times in nanoseconds since the epoch, its
+    `duration_seconds`, its `status` (OK or ERROR, with the `error`) and its
+    `attributes`.
+    """
+
+    def __init__(self, path: str = None, stream: Optional[TextIO] = None):
+        self.path = path
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            if self._stream is None:
+                path = os.path.expanduser(self.path)
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._stream = open(path, "a", encoding="utf-8")
+            self._stream.write(line)
+            self._stream.flush()
+
+    @contextlib.contextmanager
+    def span(self, name: str, attributes: Dict[str, Any]) -> Iterator[Span]:
+        parent = _current_span.get()
+        span = _JsonSpan(
+            name,
+            parent.trace_id if parent else secrets.token_hex(16),
+            parent.span_id if parent else None,
+            attributes,
+        )
+        start_time = time.time_ns()
+        start = time.perf_counter()
+        error = None
+        reset = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(reset)
+            duration = time.perf_counter() - start
+            record = {
+                "name": span.name,
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_span_id": span.parent_span_id,
+                "start_time_unix_nano": start_time,
+                "end_time_unix_nano": start_time + int(duration * 1e9),
+                "duration_seconds": duration,
+                "status": "OK" if error is None else "ERROR",
+                "attributes": span.attributes,
+            }
+            if error is not None:
+                record["error"] = f"{type(error).__name__}: {error}"
+            try:
+                self._write(record)
+            except OSError as e:
+                utils.logger.warning(f"Couldn't write the span {name}: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            stream, self._stream = self._stream, None
+        if stream is not None and self.path is not None:
+            stream.close()
+
+
+def _defined(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in attributes.items() if v is not None}
+
+
+def create_tracer() -> Tracer:
+    """Returns the tracer configured by the environment."""
+    mode = os.environ.get("GOOGLE_ADS_MCP_TRACING", OFF).strip().lower()
+    path = os.environ.get("GOOGLE_ADS_MCP_TRACE_FILE", _DEFAULT_TRACE_FILE)
+    if mode == OPENTELEMETRY:
+        try:
+            return OpenTelemetryTracer()
+        except ImportError:
+            utils.logger.warning(
+                "opentelemetry-api is not installed, writing spans to "
+                f"{path} instead"
+            )
+            return JsonLinesTracer(path)
+    if mode == JSONL:
+        return JsonLinesTracer(path)
+    if mode not in ("", OFF):
+        utils.logger.warning(f"Ignoring unknown tracing mode: {mode}")
+    return Tracer()
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Returns the process-wide tracer, creating it on first use."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = create_tracer()
+    return _tracer
+
+
+def span(name: str, **attributes: Any) -> ContextManager[Span]:
+    """Runs the context in a span of the process-wide tracer.
+
+    Attributes set to None are left out. The yielded Span takes further
+    attributes with `set_attribute`.
+    """
+    return get_tracer().span(name, attributes)
+
+
+def traced(function: Callable[..., Any]) -> Callable[..., Any]:
+    """Runs a synchronous tool in a span named after it.
+
+    The span has the `customer_id` argument of the call, if any, and the
+    number of rows of a list result.
+    """
+    name = f"ads_mcp.{function.__name__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with span(name, customer_id=kwargs.get("customer_id")) as current:
+            result = function(*args, **kwargs)
+            if isinstance(result, list):
+                current.set_attribute("rows", len(result))
+            return result
+
+    return wrapper
@@ -14,7 +14,8 @@
 
 """Tools for generating file containing a list of resources and their fields."""
 
-import utils
+import ads_mcp.utils as utils
+from ads_mcp import catalog
 import json
 import collections
 
@@ -86,6 +87,14 @@ def update_gaql_resource_file():
             f"Failed to write to file {utils.GAQL_FILEPATH}: {e}"
         )
 
+    try:
+        catalog.compile_resource_file()
+        print(f"Successfully compiled: {utils.GAQL_COMPILED_FILEPATH}")
+    except IOError as e:
+        raise RuntimeError(
+            f"Failed to write to file {utils.GAQL_COMPILED_FILEPATH}: {e}"
+        )
+
 
 if __name__ == "__main__":
     update_gaql_resource_file()
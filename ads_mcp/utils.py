@@ -16,58 +16,34 @@
 
 """Common utilities used by the MCP server."""
 
-from typing import Any
+from typing import Any, Dict, Iterator, Optional
 import proto
 import logging
+import threading
 from google.ads.googleads.client import GoogleAdsClient
+from google.auth.credentials import Credentials
 from google.ads.googleads.v21.services.services.google_ads_service import (
     GoogleAdsServiceClient,
 )
 
-from google.ads.googleads.util import get_nested_attr
-import google.auth
+from ads_mcp import auth
+from ads_mcp import clients
+from ads_mcp import instrumentation
 from ads_mcp.mcp_header_interceptor import MCPHeaderInterceptor
+from ads_mcp.projection import get_batch_projector, get_row_projector
 import os
-import base64
-import json
-import tempfile
 
-GAQL_FILEPATH = "ads_mcp/gaql_resources.txt"
+GAQL_FILEPATH = os.path.join(
+    os.path.dirname(__file__), "gaql_resources.txt"
+)
+# Precompiled copy of GAQL_FILEPATH, see `catalog.compile_resource_file`.
+GAQL_COMPILED_FILEPATH = os.path.join(
+    os.path.dirname(__file__), "gaql_resources.bin"
+)
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-# Read-only scope for Analytics Admin API and Analytics Data API.
-_READ_ONLY_ADS_SCOPE = "https://www.googleapis.com/auth/adwords"
-
-
-def _setup_credentials_from_base64():
-    """Setup credentials from base64 encoded environment variable."""
-    creds_b64 = os.environ.get("GOOGLE_CREDENTIALS_BASE64")
-    if creds_b64 and not os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
-        try:
-            # Decode base64 and write to temporary file
-            creds_json = base64.b64decode(creds_b64).decode('utf-8')
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-                f.write(creds_json)
-                temp_path = f.name
-            
-            # Set environment variable for Google Auth
-            os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = temp_path
-            logger.info(f"Credentials set from GOOGLE_CREDENTIALS_BASE64 to {temp_path}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to setup credentials from base64: {e}")
-            return False
-    return False
-
-
-def _create_credentials() -> google.auth.credentials.Credentials:
-    """Returns Application Default Credentials with read-only scope."""
-    (credentials, _) = google.auth.default(scopes=[_READ_ONLY_ADS_SCOPE])
-    return credentials
-
-
 def _get_developer_token() -> str:
     """Returns the developer token from the environment variable GOOGLE_ADS_DEVELOPER_TOKEN."""
     dev_token = os.environ.get("GOOGLE_ADS_DEVELOPER_TOKEN")
@@ -78,43 +54,158 @@ def _get_developer_token() -> str:
     return dev_token
 
 
-def _get_login_customer_id() -> str:
-    """Returns login customer id, if set, from the environment variable GOOGLE_ADS_LOGIN_CUSTOMER_ID."""
-    return os.environ.get("GOOGLE_ADS_LOGIN_CUSTOMER_ID")
+def get_login_customer_id() -> str:
+    """Returns login customer id of the current tool call, if overridden, or else from the environment variable GOOGLE_ADS_LOGIN_CUSTOMER_ID."""
+    return clients.login_customer_override() or os.environ.get(
+        "GOOGLE_ADS_LOGIN_CUSTOMER_ID"
+    )
 
 
-def _get_googleads_client() -> GoogleAdsClient:
-    # Setup credentials from base64 if available
-    _setup_credentials_from_base64()
-    
-    # Use this line if you have a google-ads.yaml file
-    # client = GoogleAdsClient.load_from_storage()
-    client = GoogleAdsClient(
-        credentials=_create_credentials(),
-        developer_token=_get_developer_token(),
-        login_customer_id=_get_login_customer_id()
-    )
+def get_int_env(name: str, default: int) -> int:
+    """Returns the integer value of environment variable `name`.
+
+    Falls back to `default` if the variable is unset or not a valid integer.
+    """
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid integer value for {name}: {value}")
+        return default
 
-    return client
 
+def get_float_env(name: str, default: float) -> float:
+    """Returns the float value of environment variable `name`.
 
-_googleads_client = None
+    Falls back to `default` if the variable is unset or not a valid number.
+    """
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid numeric value for {name}: {value}")
+        return default
+
+
+def get_bool_env(name: str, default: bool = False) -> bool:
+    """Returns whether environment variable `name` is set to a true value."""
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+_credentials = None
+_credentials_id = None
+_token_refresher = None
+_credentials_lock = threading.Lock()
+
+
+def get_credentials() -> Credentials:
+    """Returns the credentials of the process, loading them on first use.
+
+    Every tenant's GoogleAdsClient shares these credentials, whose token is
+    fetched once and renewed before it expires so that tool calls don't
+    wait for the token endpoint.
+    """
+    global _credentials, _credentials_id, _token_refresher
+    if _credentials is None:
+        with _credentials_lock:
+            if _credentials is None:
+                credentials = auth.load_credentials()
+                _credentials_id = clients.credentials_identity(credentials)
+                _token_refresher = auth.start_refresher(credentials)
+                _credentials = credentials
+    return _credentials
+
+
+def get_client_key() -> "clients.ClientKey":
+    """Returns the tenant the API calls of the current context are made as."""
+    get_credentials()
+    return clients.ClientKey(
+        _get_developer_token(), get_login_customer_id(), _credentials_id
+    )
 
 
-def get_googleads_service(serviceName: str) -> GoogleAdsServiceClient:
-    global _googleads_client
-    if _googleads_client is None:
-        _googleads_client = _get_googleads_client()
-    return _googleads_client.get_service(
-        serviceName, interceptors=[MCPHeaderInterceptor()]
+def _get_googleads_client(key: "clients.ClientKey") -> GoogleAdsClient:
+    # Use this line if you have a google-ads.yaml file
+    # client = GoogleAdsClient.load_from_storage()
+    return GoogleAdsClient(
+        credentials=get_credentials(),
+        developer_token=key.developer_token,
+        login_customer_id=key.login_customer_id,
+    )
+
+
+# The interceptors are stateless, so every service client shares them.
+_mcp_header_interceptor = MCPHeaderInterceptor()
+_instrumentation_interceptor = instrumentation.InstrumentationInterceptor()
+
+# GoogleAdsClients and service clients by tenant. The service clients of a
+# tenant send their calls through the same pool of gRPC channels.
+_clients = None
+_clients_lock = threading.Lock()
+
+
+def _get_clients() -> "clients.ClientPool":
+    global _clients
+    if _clients is None:
+        with _clients_lock:
+            if _clients is None:
+                _clients = clients.ClientPool(
+                    _get_googleads_client, clients.max_clients()
+                )
+    return _clients
+
+
+def get_googleads_client(
+    key: Optional["clients.ClientKey"] = None,
+) -> GoogleAdsClient:
+    """Returns the GoogleAdsClient of a tenant, creating it on first use.
+
+    Args:
+        key: the tenant, by default the one of the current context (see
+            `get_client_key`).
+    """
+    return _get_clients().client(key or get_client_key())
+
+
+def get_googleads_service(
+    serviceName: str,
+    version: Optional[str] = None,
+    key: Optional["clients.ClientKey"] = None,
+) -> GoogleAdsServiceClient:
+    """Returns the client of a service for a tenant, creating it on first use.
+
+    Args:
+        serviceName: the name of the service, e.g. "GoogleAdsService".
+        version: the API version, by default the one of the GoogleAdsClient
+            or else the default of the client library.
+        key: the tenant, by default the one of the current context (see
+            `get_client_key`).
+    """
+    return _get_clients().service(
+        key or get_client_key(),
+        serviceName,
+        version,
+        interceptors=[_mcp_header_interceptor, _instrumentation_interceptor],
     )
 
 
 def get_googleads_type(typeName: str):
-    global _googleads_client
-    if _googleads_client is None:
-        _googleads_client = _get_googleads_client()
-    return _googleads_client.get_type(typeName)
+    return get_googleads_client().get_type(typeName)
+
+
+def describe_error(error: Exception) -> str:
+    """Returns a short, readable description of an API call error."""
+    failure = getattr(error, "failure", None)
+    if failure is not None and failure.errors:
+        return "; ".join(e.message for e in failure.errors)
+    return str(error) or type(error).__name__
 
 
 def _ensure_serializable(obj: Any) -> Any:
@@ -143,23 +234,21 @@ def format_output_value(value: Any) -> Any:
         return str(value)
 
 
-def format_output_row(row: proto.Message, attributes):
-    """Format a row for safe JSON serialization, avoiding protobuf errors."""
-    result = {}
-    for attr in attributes:
-        try:
-            value = get_nested_attr(row, attr)
-            result[attr] = format_output_value(value)
-        except Exception as e:
-            logger.warning(f"Error getting attribute {attr}: {e}")
-            result[attr] = f"Error: {str(e)}"
-    
-    # Final safety check - ensure entire result is serializable
-    try:
-        import json
-        json.dumps(result)  # Test serialization
-        return result
-    except Exception as e:
-        logger.error(f"Row serialization failed: {e}")
-        # Return a safe fallback
-        return {attr: str(getattr(row, attr.split('.')[0], 'N/A')) for attr in attributes}
+def format_output_row(row: proto.Message, attributes) -> Dict[str, Any]:
+    """Format a row for JSON serialization.
+
+    Values are converted based on the type of their field, so the result is
+    always JSON-serializable.
+    """
+    message = getattr(row, "_pb", row)
+    return get_row_projector(message.DESCRIPTOR, tuple(attributes))(message)
+
+
+def format_output_rows(batch: Any) -> Iterator[Dict[str, Any]]:
+    """Formats every row of a `search_stream` response batch.
+
+    The batch's field mask is compiled into a projector once, and rows are
+    read from the raw protobuf message to skip proto-plus wrapping.
+    """
+    message = getattr(batch, "_pb", batch)
+    return map(get_batch_projector(message), message.results)
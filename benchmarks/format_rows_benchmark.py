@@ -0,0 +1,134 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Microbenchmark for formatting `search_stream` rows.
+
+Compares the rows/sec of the previous row formatting (per-row
+`get_nested_attr`, recursive `_ensure_serializable` and a `json.dumps`
+safety check) with the compiled projector used by `utils.format_output_rows`.
+
+Usage:
+    python -m benchmarks.format_rows_benchmark [--rows N] [--repeat R]
+"""
+
+import argparse
+import json
+import time
+
+import proto
+from google.ads.googleads.util import get_nested_attr
+from google.ads.googleads.v21.services.types.google_ads_service import (
+    SearchGoogleAdsStreamResponse,
+)
+
+from ads_mcp import utils
+
+_PATHS = [
+    "campaign.id",
+    "campaign.name",
+    "campaign.status",
+    "ad_group.id",
+    "ad_group.name",
+    "ad_group_criterion.keyword.text",
+    "ad_group_criterion.keyword.match_type",
+    "segments.date",
+    "metrics.impressions",
+    "metrics.clicks",
+    "metrics.cost_micros",
+    "metrics.conversions",
+    "metrics.ctr",
+]
+
+
+def _make_batch(rows: int) -> SearchGoogleAdsStreamResponse:
+    batch = SearchGoogleAdsStreamResponse()
+    batch.field_mask.paths.extend(_PATHS)
+    results = batch._pb.results
+    for i in range(rows):
+        row = results.add()
+        row.campaign.id = 1000 + i % 50
+        row.campaign.name = f"Campaign {i % 50}"
+        row.campaign.status = 2
+        row.ad_group.id = 20000 + i % 500
+        row.ad_group.name = f"Ad group {i % 500}"
+        row.ad_group_criterion.keyword.text = f"keyword {i}"
+        row.ad_group_criterion.keyword.match_type = 2 + i % 3
+        row.segments.date = f"2025-01-{1 + i % 28:02d}"
+        row.metrics.impressions = i * 7
+        row.metrics.clicks = i % 13
+        row.metrics.cost_micros = i * 12345
+        row.metrics.conversions = (i % 5) / 2
+        row.metrics.ctr = (i % 13) / (i * 7 + 1)
+    return batch
+
+
+def _ensure_serializable(obj):
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    elif isinstance(obj, proto.Enum):
+        return obj.name
+    elif hasattr(obj, "_pb"):
+        return str(obj)
+    elif isinstance(obj, dict):
+        return {key: _ensure_serializable(value) for key, value in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [_ensure_serializable(item) for item in obj]
+    else:
+        return str(obj)
+
+
+def _legacy_format_rows(batch):
+    """The row formatting used before the compiled projector."""
+    for row in batch.results:
+        result = {}
+        for attr in batch.field_mask.paths:
+            try:
+                result[attr] = _ensure_serializable(get_nested_attr(row, attr))
+            except Exception as e:
+                result[attr] = f"Error: {str(e)}"
+        json.dumps(result)
+        yield result
+
+
+def _rows_per_second(format_rows, batch, rows: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in format_rows(batch):
+            pass
+        best = min(best, time.perf_counter() - start)
+    return rows / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    batch = _make_batch(args.rows)
+    before = _rows_per_second(
+        _legacy_format_rows, batch, args.rows, args.repeat
+    )
+    after = _rows_per_second(
+        utils.format_output_rows, batch, args.rows, args.repeat
+    )
+    print(f"rows: {args.rows}, fields per row: {len(_PATHS)}")
+    print(f"before (get_nested_attr + json.dumps): {before:12,.0f} rows/sec")
+    print(f"after (compiled projector):            {after:12,.0f} rows/sec")
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
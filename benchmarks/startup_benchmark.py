@@ -0,0 +1,79 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Startup benchmark for the GAQL field catalog.
+
+Measures, in fresh interpreters, the time from importing `ads_mcp.server` to
+a server that has listed its tools and loaded the field catalog, once with
+the catalog parsed from the JSON resource file and once loaded from the
+precompiled copy. Also reports the catalog load time alone.
+
+Usage:
+    python -m benchmarks.startup_benchmark [--repeat R]
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Prints the import-to-ready and catalog load times in seconds.
+_STARTUP_SCRIPT = """
+import asyncio, time
+start = time.perf_counter()
+from ads_mcp import catalog, server, utils
+if {use_json}:
+    utils.GAQL_COMPILED_FILEPATH = "/nonexistent"
+asyncio.run(server.mcp.list_tools())
+loaded = time.perf_counter()
+catalog.get_catalog()
+end = time.perf_counter()
+print(end - start, end - loaded)
+"""
+
+
+def _startup_seconds(use_json: bool, repeat: int) -> tuple:
+    best = (float("inf"), float("inf"))
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SCRIPT.format(use_json=use_json)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        total, load = map(float, output.split())
+        best = (min(best[0], total), min(best[1], load))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    before = _startup_seconds(True, args.repeat)
+    after = _startup_seconds(False, args.repeat)
+    print("                     import-to-ready   catalog load")
+    print(
+        f"before (JSON):       {before[0] * 1000:12.1f} ms"
+        f" {before[1] * 1000:11.1f} ms"
+    )
+    print(
+        f"after (precompiled): {after[0] * 1000:12.1f} ms"
+        f" {after[1] * 1000:11.1f} ms"
+    )
+    print(f"catalog load speedup: {before[1] / after[1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ Based on successful GA MCP API implementation
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
 import uvicorn
@@ -17,6 +17,10 @@ import base64
 import asyncio
 from dotenv import load_dotenv
 
+from ads_mcp import cancellation
+from ads_mcp import metrics
+from ads_mcp import tracing
+
 # Try to load from .env file
 load_dotenv()
 
@@ -111,6 +115,41 @@ class SearchRequest(BaseModel):
     customer_id: str
     query: str
 
+# How often a running request checks whether its client went away
+DISCONNECT_POLL_SECONDS = 0.5
+
+async def run_until_disconnected(request: Request, function, *args, customer_id=None):
+    """Runs a blocking tool on a worker thread, cancelling it if the client disconnects.
+
+    The tool runs with a cancellation token, which cancels its gRPC call and
+    stops the formatting of its rows once set. The call is recorded in the
+    tool metrics, under the name of `function` without its `_sync` suffix.
+    """
+    tool = function.__name__.removesuffix("_sync")
+    token = cancellation.CancelToken()
+    with cancellation.use_token(token):
+        task = asyncio.ensure_future(asyncio.to_thread(function, *args))
+    try:
+        with metrics.get_tool_metrics().call(tool, customer_id) as recorded:
+            try:
+                while True:
+                    done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+                    if done:
+                        result = task.result()
+                        recorded.result(result)
+                        return result
+                    if await request.is_disconnected():
+                        print("Client disconnected, cancelling the request")
+                        token.cancel()
+                        raise HTTPException(status_code=499, detail="Client disconnected")
+            except HTTPException as e:
+                if e.status_code == 499:
+                    recorded.outcome = metrics.CANCELLED
+                raise
+    finally:
+        # Also reached when the server cancels the handler itself
+        token.cancel()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -138,9 +177,9 @@ async def health_check():
 
 # ===== MCP TOOL 1: list_accessible_customers =====
 @app.get("/customers")
-def list_accessible_customers_endpoint():
+async def list_accessible_customers_endpoint(request: Request):
     """HTTP endpoint for listing customers"""
-    return list_accessible_customers_sync()
+    return await run_until_disconnected(request, list_accessible_customers_sync)
 
 def list_accessible_customers_sync():
     """List accessible customers - MCP Tool: list_accessible_customers"""
@@ -152,6 +191,7 @@ def list_accessible_customers_sync():
         customer_service = client.get_service("CustomerService")
         
         # Call the list_accessible_customers method
+        cancellation.check()
         accessible_customers = customer_service.list_accessible_customers()
         
         result = []
@@ -166,14 +206,18 @@ def list_accessible_customers_sync():
             "total_count": len(result)
         }
         
+    except cancellation.OperationCancelled:
+        raise HTTPException(status_code=499, detail="Request cancelled")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching accessible customers: {str(e)}")
 
 # ===== MCP TOOL 2: search =====
 @app.post("/search")
-def search_endpoint(search_request: SearchRequest):
+async def search_endpoint(search_request: SearchRequest, request: Request):
     """HTTP endpoint for search"""
-    return search_sync(search_request)
+    return await run_until_disconnected(
+        request, search_sync, search_request, customer_id=search_request.customer_id
+    )
 
 def search_sync(search_request: SearchRequest):
     """Search Google Ads data - MCP Tool: search"""
@@ -185,31 +229,35 @@ def search_sync(search_request: SearchRequest):
         ga_service = client.get_service("GoogleAdsService")
         
         # Execute the search query
-        search_request_obj = client.get_type("SearchGoogleAdsRequest")
+        search_request_obj = client.get_type("SearchGoogleAdsStreamRequest")
         search_request_obj.customer_id = search_request.customer_id.replace('-', '')
         search_request_obj.query = search_request.query
         
-        results = ga_service.search(request=search_request_obj)
+        # Stream the rows so that a cancelled request also cancels the gRPC call
+        stream = ga_service.search_stream(request=search_request_obj)
         
-        # Format results
+        # Format results, stopping as soon as the request is cancelled
         formatted_results = []
-        for row in results:
-            # Convert proto message to dict
-            row_dict = {}
-            for field in row._pb.DESCRIPTOR.fields:
-                if hasattr(row, field.name):
-                    value = getattr(row, field.name)
-                    # Handle nested objects
-                    if hasattr(value, '_pb'):
-                        nested_dict = {}
-                        for nested_field in value._pb.DESCRIPTOR.fields:
-                            if hasattr(value, nested_field.name):
-                                nested_dict[nested_field.name] = str(getattr(value, nested_field.name))
-                        row_dict[field.name] = nested_dict
-                    else:
-                        row_dict[field.name] = str(value)
+        with cancellation.on_cancel(stream.cancel):
+            rows = (row for batch in stream for row in batch.results)
+            for row in rows:
+                cancellation.check()
+                # Convert proto message to dict
+                row_dict = {}
+                for field in row._pb.DESCRIPTOR.fields:
+                    if hasattr(row, field.name):
+                        value = getattr(row, field.name)
+                        # Handle nested objects
+                        if hasattr(value, '_pb'):
+                            nested_dict = {}
+                            for nested_field in value._pb.DESCRIPTOR.fields:
+                                if hasattr(value, nested_field.name):
+                                    nested_dict[nested_field.name] = str(getattr(value, nested_field.name))
+                            row_dict[field.name] = nested_dict
+                        else:
+                            row_dict[field.name] = str(value)
             
-            formatted_results.append(row_dict)
+                formatted_results.append(row_dict)
         
         return {
             "customer_id": search_request.customer_id,
@@ -218,14 +266,18 @@ def search_sync(search_request: SearchRequest):
             "total_results": len(formatted_results)
         }
         
+    except cancellation.OperationCancelled:
+        raise HTTPException(status_code=499, detail="Request cancelled")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error executing search: {str(e)}")
 
 # ===== HELPER ENDPOINTS =====
 @app.get("/campaigns/{customer_id}")
-def get_campaigns_endpoint(customer_id: str):
+async def get_campaigns_endpoint(customer_id: str, request: Request):
     """HTTP endpoint for campaigns"""
-    return get_campaigns_sync(customer_id)
+    return await run_until_disconnected(
+        request, get_campaigns_sync, customer_id, customer_id=customer_id
+    )
 
 def get_campaigns_sync(customer_id: str):
     """Get campaigns for a customer - Helper endpoint"""
@@ -235,6 +287,11 @@ def get_campaigns_sync(customer_id: str):
     )
     return search_sync(search_request)
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics of the tool calls and API calls"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/debug")
 async def debug_endpoint():
     """Debug endpoint for credentials and status"""
@@ -298,7 +355,7 @@ async def mcp_get_endpoint():
     }
 
 @app.post("/mcp")
-async def mcp_post_endpoint(mcp_request: MCPRequest):
+async def mcp_post_endpoint(mcp_request: MCPRequest, request: Request):
     """MCP Protocol endpoint for JSON-RPC over HTTP"""
     try:
         if mcp_request.method == "initialize":
@@ -363,22 +420,33 @@ async def mcp_post_endpoint(mcp_request: MCPRequest):
             arguments = mcp_request.params.get("arguments", {})
             
             if tool_name == "list_accessible_customers":
-                result = list_accessible_customers_sync()
+                result = await run_until_disconnected(request, list_accessible_customers_sync)
             elif tool_name == "search":
                 customer_id = arguments.get("customer_id")
                 query = arguments.get("query")
                 if not customer_id or not query:
                     raise ValueError("Missing required parameters: customer_id, query")
                 search_request = SearchRequest(customer_id=customer_id, query=query)
-                result = search_sync(search_request)
+                result = await run_until_disconnected(
+                    request, search_sync, search_request, customer_id=customer_id
+                )
             elif tool_name == "get_campaigns":
                 customer_id = arguments.get("customer_id")
                 if not customer_id:
                     raise ValueError("Missing required parameter: customer_id")
-                result = get_campaigns_sync(customer_id)
+                result = await run_until_disconnected(
+                    request, get_campaigns_sync, customer_id, customer_id=customer_id
+                )
             else:
                 raise ValueError(f"Unknown tool: {tool_name}")
             
+            with tracing.span("ads_mcp.serialize", tool=tool_name) as span:
+                text = json.dumps(result, indent=2)
+                serialized_bytes = len(text.encode())
+                span.set_attribute("bytes", serialized_bytes)
+            metrics.get_tool_metrics().add_serialized_bytes(
+                tool_name, serialized_bytes
+            )
             return {
                 "jsonrpc": "2.0",
                 "id": mcp_request.id,
@@ -386,7 +454,7 @@ async def mcp_post_endpoint(mcp_request: MCPRequest):
                     "content": [
                         {
                             "type": "text",
-                            "text": json.dumps(result, indent=2)
+                            "text": text
                         }
                     ]
                 }
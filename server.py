@@ -1,10 +1,9 @@
 #!/usr/bin/env python3
 """Google Ads MCP Server - HTTP transport compatible implementation"""
 
+import copy
 import os
-import base64
 import json
-import tempfile
 import logging
 from typing import Any, List, Dict
 import proto
@@ -18,7 +17,10 @@ from google.ads.googleads.util import get_nested_attr
 from dotenv import load_dotenv
 
 from fastmcp import FastMCP
+from ads_mcp import auth
+from ads_mcp import clients
 from ads_mcp.mcp_header_interceptor import MCPHeaderInterceptor
+from ads_mcp.singleflight import SingleFlight
 
 # Load environment variables
 load_dotenv()
@@ -30,37 +32,22 @@ mcp = FastMCP("Google Ads MCP Server")
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-# Read-only scope for Google Ads API
-_READ_ONLY_ADS_SCOPE = "https://www.googleapis.com/auth/adwords"
-
-# Global client instance
+# Client configured by the environment or google-ads.yaml
 _googleads_client = None
 
+# API clients by tenant, see ads_mcp.clients
+_clients = None
+_mcp_header_interceptor = MCPHeaderInterceptor()
 
-def _setup_credentials_from_base64():
-    """Setup credentials from base64 encoded environment variable."""
-    creds_b64 = os.environ.get("GOOGLE_CREDENTIALS_BASE64")
-    if creds_b64 and not os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
-        try:
-            # Decode base64 and write to temporary file
-            creds_json = base64.b64decode(creds_b64).decode('utf-8')
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-                f.write(creds_json)
-                temp_path = f.name
-            
-            # Set environment variable for Google Auth
-            os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = temp_path
-            logger.info(f"Credentials set from GOOGLE_CREDENTIALS_BASE64")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to setup credentials from base64: {e}")
-            return False
-    return False
+# In-flight search streams, shared by identical concurrent searches
+_search_flights = SingleFlight()
 
 
 def _create_credentials() -> google.auth.credentials.Credentials:
-    """Returns Application Default Credentials with read-only scope."""
-    (credentials, _) = google.auth.default(scopes=[_READ_ONLY_ADS_SCOPE])
+    """Returns the credentials of GOOGLE_CREDENTIALS_BASE64, loaded in memory, or Application Default Credentials."""
+    credentials = auth.load_credentials()
+    # Renew the token in the background so that tool calls don't wait for it
+    auth.start_refresher(credentials)
     return credentials
 
 
@@ -78,9 +65,6 @@ def _get_login_customer_id() -> str:
 
 
 def _get_googleads_client() -> GoogleAdsClient:
-    # Setup credentials from base64 if available
-    _setup_credentials_from_base64()
-    
     # Try to load from google-ads.yaml if exists
     yaml_path = os.environ.get('GOOGLE_ADS_YAML_PATH', 'google-ads.yaml')
     if os.path.exists(yaml_path):
@@ -98,12 +82,43 @@ def _get_googleads_client() -> GoogleAdsClient:
     return client
 
 
-def get_googleads_service(serviceName: str) -> GoogleAdsServiceClient:
+def _get_configured_client() -> GoogleAdsClient:
     global _googleads_client
     if _googleads_client is None:
         _googleads_client = _get_googleads_client()
-    return _googleads_client.get_service(
-        serviceName, interceptors=[MCPHeaderInterceptor()]
+    return _googleads_client
+
+
+def _create_tenant_client(key: clients.ClientKey) -> GoogleAdsClient:
+    """Returns a copy of the configured client for the login customer of the tenant."""
+    client = copy.copy(_get_configured_client())
+    client.login_customer_id = key.login_customer_id
+    return client
+
+
+def _client_key(login_customer_id: str = None) -> clients.ClientKey:
+    """Returns the tenant of the configured client, with `login_customer_id` if given."""
+    client = _get_configured_client()
+    if login_customer_id:
+        login_customer_id = str(login_customer_id).replace("-", "")
+    return clients.ClientKey(
+        client.developer_token,
+        login_customer_id or client.login_customer_id,
+        clients.credentials_identity(client.credentials),
+    )
+
+
+def get_googleads_service(
+    serviceName: str, login_customer_id: str = None
+) -> GoogleAdsServiceClient:
+    """Returns the client of a service, as the login customer `login_customer_id` if given."""
+    global _clients
+    if _clients is None:
+        _clients = clients.ClientPool(_create_tenant_client, clients.max_clients())
+    return _clients.service(
+        _client_key(login_customer_id),
+        serviceName,
+        interceptors=[_mcp_header_interceptor],
     )
 
 
@@ -177,6 +192,7 @@ def search(
     orderings: List[str] = None,
     limit: int = None,
     query: str = None,
+    login_customer_id: str = None,
 ) -> List[Dict[str, Any]]:
     """Fetches data from the Google Ads API using the search method
 
@@ -188,6 +204,7 @@ def search(
         orderings: How the data is ordered
         limit: The maximum number of rows to return
         query: Full GAQL query (alternative to fields/resource parameters)
+        login_customer_id: The id of the manager account to access the customer through, if not the configured one
     """
     # Handle query parameter for Claude.ai compatibility
     if query:
@@ -223,7 +240,7 @@ def search(
     if not fields or not resource:
         raise ValueError("Either 'query' parameter or both 'fields' and 'resource' parameters are required")
 
-    ga_service = get_googleads_service("GoogleAdsService")
+    ga_service = get_googleads_service("GoogleAdsService", login_customer_id)
 
     query_parts = [f"SELECT {','.join(fields)} FROM {resource}"]
 
@@ -239,16 +256,27 @@ def search(
     query = "".join(query_parts)
     logger.info(f"Google Ads MCP search query: {query}")
 
-    query_result = ga_service.search_stream(
-        customer_id=customer_id, query=query
+    # Identical queries running concurrently share one upstream stream
+    query_result = _search_flights.stream(
+        (
+            _client_key(login_customer_id).login_customer_id,
+            customer_id,
+            query,
+        ),
+        lambda: iter(
+            ga_service.search_stream(customer_id=customer_id, query=query)
+        ),
     )
 
     final_output: List = []
-    for batch in query_result:
-        for row in batch.results:
-            final_output.append(
-                format_output_row(row, batch.field_mask.paths)
-            )
+    try:
+        for batch in query_result:
+            for row in batch.results:
+                final_output.append(
+                    format_output_row(row, batch.field_mask.paths)
+                )
+    finally:
+        query_result.close()
     return final_output
 
 
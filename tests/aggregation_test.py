@@ -0,0 +1,110 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the aggregation module."""
+
+import unittest
+
+from google.ads.googleads.v21.services.types.google_ads_service import (
+    SearchGoogleAdsStreamResponse,
+)
+
+from ads_mcp import aggregation
+
+_PATHS = ["campaign.name", "metrics.clicks", "metrics.ctr", "segments.date"]
+
+
+def _batch(*rows):
+    batch = SearchGoogleAdsStreamResponse()
+    batch.field_mask.paths.extend(_PATHS)
+    for name, clicks, ctr, date in rows:
+        row = batch._pb.results.add()
+        row.campaign.name = name
+        row.metrics.clicks = clicks
+        row.metrics.ctr = ctr
+        row.segments.date = date
+    return batch._pb
+
+
+class TestAggregateBuilder(unittest.TestCase):
+    """Test cases for the AggregateBuilder class."""
+
+    def test_groups_across_batches(self):
+        """Tests that rows of all batches are folded into their groups."""
+        builder = aggregation.AggregateBuilder(
+            aggregation.parse_aggregation(
+                ["campaign.name"],
+                [
+                    "sum(metrics.clicks)",
+                    "avg(metrics.ctr)",
+                    "max(segments.date)",
+                    "COUNT(*)",
+                ],
+            )
+        )
+        builder.add_batch(
+            _batch(
+                ("a", 1, 0.5, "2025-01-01"),
+                ("b", 2, float("nan"), "2025-01-01"),
+            )
+        )
+        builder.add_batch(_batch(("a", 3, 0.25, "2025-01-02")))
+
+        self.assertEqual(builder.row_count, 2)
+        self.assertEqual(
+            builder.result(),
+            [
+                {
+                    "campaign.name": "a",
+                    "sum(metrics.clicks)": 4,
+                    "avg(metrics.ctr)": 0.375,
+                    "max(segments.date)": "2025-01-02",
+                    "count(*)": 2,
+                },
+                {
+                    "campaign.name": "b",
+                    "sum(metrics.clicks)": 2,
+                    "avg(metrics.ctr)": None,
+                    "max(segments.date)": "2025-01-01",
+                    "count(*)": 1,
+                },
+            ],
+        )
+
+    def test_totals_without_group_by(self):
+        """Tests that all rows form one group without group-by fields."""
+        builder = aggregation.AggregateBuilder(
+            aggregation.parse_aggregation(None, ["min(metrics.clicks)"])
+        )
+        builder.add_batch(
+            _batch(("a", 5, 0, "2025-01-01"), ("b", 2, 0, "2025-01-01"))
+        )
+        self.assertEqual(builder.result(), [{"min(metrics.clicks)": 2}])
+
+    def test_invalid_aggregates(self):
+        """Tests that malformed or unsupported aggregates are rejected."""
+        for spec in ("median(metrics.clicks)", "sum(*)", "metrics.clicks"):
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    aggregation.parse_aggregate(spec)
+
+        builder = aggregation.AggregateBuilder(
+            aggregation.parse_aggregation(None, ["sum(campaign.name)"])
+        )
+        with self.assertRaisesRegex(ValueError, "numeric"):
+            builder.add_batch(_batch(("a", 1, 0, "2025-01-01")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the auth module."""
+
+import base64
+import datetime
+import json
+import os
+import threading
+import unittest
+from unittest import mock
+
+from google.auth import exceptions
+import google.auth._helpers
+import google.oauth2.credentials
+
+from ads_mcp import auth
+
+_NOW = datetime.datetime(2025, 1, 1)
+
+_AUTHORIZED_USER = {
+    "type": "authorized_user",
+    "client_id": "client-id",
+    "client_secret": "client-secret",
+    "refresh_token": "refresh-token",
+}
+
+
+class _Credentials:
+    """Credentials whose tokens last an hour."""
+
+    def __init__(self, now, fail=False):
+        self.token = None
+        self.expiry = None
+        self.now = now
+        self.fail = fail
+        self.refreshed = threading.Event()
+
+    def refresh(self, request):
+        if self.fail:
+            raise exceptions.RefreshError("invalid_grant")
+        self.token = "token"
+        self.expiry = self.now() + datetime.timedelta(hours=1)
+        self.refreshed.set()
+
+
+class TestLoadCredentials(unittest.TestCase):
+    """Test cases for the load_credentials function."""
+
+    def test_base64_credentials_are_loaded_in_memory(self):
+        """Tests that encoded credentials don't go through a file."""
+        encoded = base64.b64encode(json.dumps(_AUTHORIZED_USER).encode())
+        with mock.patch.dict(
+            os.environ, {"GOOGLE_CREDENTIALS_BASE64": encoded.decode()}
+        ):
+            os.environ.pop("GOOGLE_APPLICATION_CREDENTIALS", None)
+            credentials = auth.load_credentials()
+            self.assertNotIn("GOOGLE_APPLICATION_CREDENTIALS", os.environ)
+        self.assertIsInstance(
+            credentials, google.oauth2.credentials.Credentials
+        )
+        self.assertEqual(credentials.refresh_token, "refresh-token")
+        self.assertEqual(credentials.scopes, [auth._READ_ONLY_ADS_SCOPE])
+
+    def test_other_credential_types_fall_back(self):
+        """Tests that only service accounts and authorized users are loaded."""
+        info = {"type": "external_account", "audience": "audience"}
+        encoded = base64.b64encode(json.dumps(info).encode())
+        default = mock.Mock()
+        with (
+            mock.patch.dict(
+                os.environ, {"GOOGLE_CREDENTIALS_BASE64": encoded.decode()}
+            ),
+            mock.patch("google.auth.default", return_value=(default, None)),
+        ):
+            os.environ.pop("GOOGLE_APPLICATION_CREDENTIALS", None)
+            self.assertIs(auth.load_credentials(), default)
+
+    def test_invalid_base64_falls_back(self):
+        """Tests that invalid encoded credentials fall back to ADC."""
+        default = mock.Mock()
+        with (
+            mock.patch.dict(
+                os.environ, {"GOOGLE_CREDENTIALS_BASE64": "not base64!"}
+            ),
+            mock.patch("google.auth.default", return_value=(default, None)),
+        ):
+            os.environ.pop("GOOGLE_APPLICATION_CREDENTIALS", None)
+            self.assertIs(auth.load_credentials(), default)
+
+
+class TestTokenRefresher(unittest.TestCase):
+    """Test cases for the TokenRefresher class."""
+
+    def setUp(self):
+        self.now = _NOW
+        self.credentials = _Credentials(lambda: self.now)
+        self.refresher = auth.TokenRefresher(
+            self.credentials,
+            margin=300,
+            request_factory=lambda: None,
+            clock=lambda: self.now,
+        )
+
+    def test_refresh_delay(self):
+        """Tests that tokens are renewed `margin` seconds before expiry."""
+        self.assertEqual(self.refresher.next_refresh_delay(), 0)
+        self.assertTrue(self.refresher.refresh())
+        self.assertEqual(self.refresher.next_refresh_delay(), 3300)
+        self.now += datetime.timedelta(minutes=58)
+        self.assertEqual(self.refresher.next_refresh_delay(), 0)
+
+    def test_margin_is_before_request_path_refresh(self):
+        """Tests that the margin stays ahead of google-auth's own refresh."""
+        refresher = auth.TokenRefresher(self.credentials, margin=10)
+        self.assertGreater(
+            refresher._margin,
+            google.auth._helpers.REFRESH_THRESHOLD.total_seconds(),
+        )
+
+    def test_failures_are_counted(self):
+        """Tests that failed refreshes are logged, not raised."""
+        self.credentials.fail = True
+        self.assertFalse(self.refresher.refresh())
+        self.assertEqual(self.refresher.failures, 1)
+
+    def test_start_fetches_first_token(self):
+        """Tests that the first token is there once the refresher started."""
+        self.refresher.start()
+        self.addCleanup(self.refresher.stop)
+        self.assertEqual(self.credentials.token, "token")
+        self.assertEqual(self.refresher.refreshes, 1)
+
+    def test_thread_renews_expiring_tokens(self):
+        """Tests that a token close to its expiry is renewed right away."""
+        self.credentials.token = "old-token"
+        self.credentials.expiry = self.now + datetime.timedelta(minutes=2)
+        self.refresher.start()
+        self.addCleanup(self.refresher.stop)
+        self.assertTrue(self.credentials.refreshed.wait(5))
+        self.assertEqual(self.credentials.token, "token")
+
+    def test_disabled(self):
+        """Tests that a margin of 0 disables background refresh."""
+        with mock.patch.dict(
+            os.environ, {"GOOGLE_ADS_MCP_TOKEN_REFRESH_MARGIN_SECONDS": "0"}
+        ):
+            self.assertIsNone(auth.start_refresher(self.credentials))
+
+
+if __name__ == "__main__":
+    unittest.main()
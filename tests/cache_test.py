@@ -0,0 +1,100 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the cache module."""
+
+import datetime
+import unittest
+
+from ads_mcp import cache
+
+_QUERY = "SELECT campaign.id, metrics.clicks FROM campaign WHERE {}"
+
+
+class TestQueryResultCache(unittest.TestCase):
+    """Test cases for the QueryResultCache class."""
+
+    def setUp(self):
+        self.now = 0.0
+        self.cache = cache.QueryResultCache(
+            max_entries=2,
+            max_rows=10,
+            recent_ttl_seconds=60,
+            historical_ttl_seconds=3600,
+            clock=lambda: self.now,
+            today=lambda: datetime.date(2025, 6, 15),
+        )
+
+    def test_ttl_depends_on_date_range(self):
+        """Tests that only fully historical ranges get the long TTL."""
+        cases = {
+            "segments.date BETWEEN '2025-01-01' AND '2025-01-31'": 3600,
+            "segments.date BETWEEN '2025-06-01' AND '2025-06-14'": 60,
+            "segments.date >= '2025-01-01' AND segments.date <= '2025-06-13'": (
+                3600
+            ),
+            "segments.date >= '2025-01-01'": 60,
+            "segments.date DURING LAST_30_DAYS": 60,
+            "segments.date IN ('2025-05-01', '2025-05-02')": 3600,
+            "campaign.status = 'ENABLED'": 60,
+        }
+        for condition, ttl in cases.items():
+            with self.subTest(condition=condition):
+                self.assertEqual(
+                    self.cache.ttl_for_query(_QUERY.format(condition)), ttl
+                )
+
+    def test_key_ignores_whitespace(self):
+        """Tests that queries differing only in whitespace share a key."""
+        self.assertEqual(
+            self.cache.make_key(
+                None, "1", "SELECT  campaign.id\n FROM campaign"
+            ),
+            self.cache.make_key(None, "1", "SELECT campaign.id FROM campaign"),
+        )
+        self.assertNotEqual(
+            self.cache.make_key(None, "1", "WHERE campaign.name = 'a  b'"),
+            self.cache.make_key(None, "1", "WHERE campaign.name = 'a b'"),
+        )
+
+    def test_entries_expire(self):
+        """Tests that entries are dropped after their TTL."""
+        query = _QUERY.format("segments.date DURING TODAY")
+        self.cache.put("key", ["row"], query, rows=1)
+        self.assertEqual(self.cache.get("key"), ["row"])
+        self.now = 61
+        self.assertIsNone(self.cache.get("key"))
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["expirations"], 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Tests that the cache stays within max_entries."""
+        for key in ("a", "b"):
+            self.cache.put(key, [key], "", rows=1)
+        self.cache.get("a")
+        self.cache.put("c", ["c"], "", rows=1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), ["a"])
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_large_results_are_not_cached(self):
+        """Tests that results over max_rows are not cached."""
+        self.cache.put("key", ["row"] * 11, "", rows=11)
+        self.assertIsNone(self.cache.get("key"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the cancellation module."""
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+
+from ads_mcp import cancellation
+from ads_mcp import retry
+from ads_mcp import singleflight
+
+
+class TestCancelToken(unittest.TestCase):
+    """Test cases for the CancelToken class."""
+
+    def test_callbacks_run_once(self):
+        """Tests that callbacks run when the token is set, and only then."""
+        token = cancellation.CancelToken()
+        calls = []
+        token.add_callback(lambda: calls.append("a"))
+        remove = token.add_callback(lambda: calls.append("b"))
+        remove()
+        token.cancel()
+        token.cancel()
+        self.assertEqual(calls, ["a"])
+        token.add_callback(lambda: calls.append("late"))
+        self.assertEqual(calls, ["a", "late"])
+        with self.assertRaises(cancellation.OperationCancelled):
+            token.check()
+
+    def test_on_cancel(self):
+        """Tests that on_cancel only calls back during its context."""
+        token = cancellation.CancelToken()
+        calls = []
+        with cancellation.use_token(token):
+            with cancellation.on_cancel(lambda: calls.append("in")):
+                pass
+            with cancellation.on_cancel(lambda: calls.append("out")):
+                token.cancel()
+            with self.assertRaises(cancellation.OperationCancelled):
+                with cancellation.on_cancel(self.fail):
+                    pass
+        self.assertEqual(calls, ["out"])
+
+    def test_without_token(self):
+        """Tests that code outside of tool calls is never cancelled."""
+        cancellation.check()
+        with cancellation.on_cancel(self.fail):
+            pass
+        cancellation.sleep(0)
+
+    def test_sleep_wakes_up(self):
+        """Tests that sleeps end as soon as the token is set."""
+        token = cancellation.CancelToken()
+        threading.Timer(0.05, token.cancel).start()
+        started = time.monotonic()
+        with cancellation.use_token(token):
+            with self.assertRaises(cancellation.OperationCancelled):
+                cancellation.sleep(10)
+        self.assertLess(time.monotonic() - started, 5)
+
+
+class TestTool(unittest.TestCase):
+    """Test cases for the tool wrapper."""
+
+    def test_parse_timeouts(self):
+        """Tests that per-tool timeouts are parsed, skipping invalid ones."""
+        self.assertEqual(
+            cancellation._parse_timeouts("search=60, export_report=1800,x=y"),
+            {"search": 60.0, "export_report": 1800.0},
+        )
+        self.assertEqual(cancellation._parse_timeouts(""), {})
+
+    def test_tool_timeout(self):
+        """Tests that per-tool timeouts override the default one."""
+        with (
+            mock.patch.dict(cancellation._TOOL_TIMEOUTS, {"search": 5.0}),
+            mock.patch.dict(
+                "os.environ", {"GOOGLE_ADS_MCP_TOOL_TIMEOUT_SECONDS": "30"}
+            ),
+        ):
+            self.assertEqual(cancellation.tool_timeout("search"), 5.0)
+            self.assertEqual(cancellation.tool_timeout("other"), 30.0)
+
+    def test_sync_tool(self):
+        """Tests that sync tools run with a token and a deadline."""
+
+        def sync_tool(value):
+            self.assertIsNotNone(cancellation.current_token())
+            self.assertIsNotNone(retry.current_deadline().remaining())
+            return value * 2
+
+        wrapper = cancellation.tool(sync_tool)
+        self.assertEqual(wrapper.__name__, "sync_tool")
+        self.assertEqual(asyncio.run(wrapper(21)), 42)
+
+    def test_timeout_cancels(self):
+        """Tests that a tool running past its timeout is cancelled."""
+        tokens = []
+
+        def slow_tool():
+            tokens.append(cancellation.current_token())
+            cancellation.sleep(10)
+
+        with mock.patch.dict(cancellation._TOOL_TIMEOUTS, {"slow_tool": 0.05}):
+            with self.assertRaisesRegex(TimeoutError, "slow_tool"):
+                asyncio.run(cancellation.tool(slow_tool)())
+        self.assertTrue(tokens[0].cancelled)
+
+    def test_cancelling_the_call_sets_the_token(self):
+        """Tests that a cancelled tool call cancels its token."""
+        tokens = []
+        started = threading.Event()
+
+        def blocking_tool():
+            tokens.append(cancellation.current_token())
+            started.set()
+            cancellation.sleep(10)
+
+        async def run():
+            task = asyncio.ensure_future(cancellation.tool(blocking_tool)())
+            await asyncio.to_thread(started.wait, 5)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        self.assertTrue(tokens[0].cancelled)
+
+
+class TestSingleFlightCancellation(unittest.TestCase):
+    """Test cases for the cancellation of shared streams."""
+
+    def setUp(self):
+        self.group = singleflight.SingleFlight()
+        self.source_tokens = []
+
+    def _open(self):
+        def source():
+            self.source_tokens.append(cancellation.current_token())
+            yield 1
+            yield 2
+
+        return source
+
+    def _join(self, token):
+        with cancellation.use_token(token):
+            return self.group.stream("key", self._open())
+
+    def test_upstream_cancelled_with_last_reader(self):
+        """Tests that the source is only cancelled with all its readers."""
+        first_token = cancellation.CancelToken()
+        second_token = cancellation.CancelToken()
+        first = self._join(first_token)
+        second = self._join(second_token)
+        self.assertEqual(next(first), 1)
+        self.assertEqual(next(second), 1)
+
+        first_token.cancel()
+        with self.assertRaises(cancellation.OperationCancelled):
+            next(first)
+        self.assertFalse(self.source_tokens[0].cancelled)
+
+        second_token.cancel()
+        self.assertTrue(self.source_tokens[0].cancelled)
+        second.close()
+        self.assertEqual(self.group.in_flight(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the catalog module."""
+
+import json
+import os
+import tempfile
+import unittest
+
+from ads_mcp import catalog
+from ads_mcp import gaql
+
+_RECORDS = [
+    {
+        "resource": "campaign",
+        "selectable": ["campaign.id", "campaign.name", "campaign.labels"],
+        "filterable": ["campaign.id", "campaign.name", "campaign.labels"],
+        "sortable": ["campaign.id", "campaign.name"],
+    },
+    {
+        "resource": "metrics",
+        "selectable": ["metrics.clicks"],
+        "filterable": ["metrics.clicks"],
+        "sortable": ["metrics.clicks"],
+    },
+]
+
+
+class TestFieldCatalog(unittest.TestCase):
+    """Test cases for the FieldCatalog class."""
+
+    def setUp(self):
+        self.catalog = catalog.FieldCatalog.from_records(_RECORDS)
+
+    def test_valid_query(self):
+        """Tests that queries using known fields pass validation."""
+        self.catalog.validate(
+            gaql.parse(
+                "SELECT campaign.name, metrics.clicks FROM campaign"
+                " WHERE campaign.id = 1 ORDER BY metrics.clicks DESC"
+            )
+        )
+
+    def test_reports_every_problem(self):
+        """Tests that all problems of a query are reported at once."""
+        with self.assertRaises(catalog.InvalidQueryError) as raised:
+            self.catalog.validate(
+                gaql.parse(
+                    "SELECT campaign.nam, ad_group.id FROM campaing"
+                    " ORDER BY campaign.labels"
+                )
+            )
+        problems = raised.exception.problems
+        self.assertEqual(
+            [problem.split(" Did you mean ")[0] for problem in problems],
+            [
+                "Unknown resource 'campaing'.",
+                "Unknown field 'campaign.nam'.",
+                "Unknown field 'ad_group.id'.",
+                "Field 'campaign.labels' is not sortable.",
+            ],
+        )
+        self.assertIn("Did you mean campaign.name", problems[1])
+
+    def test_empty_catalog_accepts_everything(self):
+        """Tests that validation is skipped without a catalog."""
+        catalog.FieldCatalog({}).validate(
+            gaql.parse("SELECT anything.at_all FROM nowhere")
+        )
+
+    def test_loads_resource_file(self):
+        """Tests that the bundled resource file is indexed."""
+        fields = catalog.get_catalog().get("campaign")
+        self.assertIn("campaign.id", fields.selectable)
+        self.assertIn("campaign.id", fields.filterable)
+
+
+class TestCompiledCatalog(unittest.TestCase):
+    """Test cases for the precompiled catalog."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.source_path = os.path.join(directory.name, "resources.txt")
+        self.compiled_path = os.path.join(directory.name, "resources.bin")
+        with open(self.source_path, "w") as file:
+            json.dump(_RECORDS, file)
+        catalog.compile_resource_file(self.source_path, self.compiled_path)
+        with open(self.source_path, "rb") as file:
+            self.source = file.read()
+        with open(self.compiled_path, "rb") as file:
+            self.compiled = file.read()
+
+    def test_round_trip(self):
+        """Tests that the compiled catalog has the same fields."""
+        loaded = catalog._load_compiled(self.compiled, self.source)
+        expected = catalog.FieldCatalog.from_records(_RECORDS)
+        self.assertEqual(loaded.resources(), expected.resources())
+        for resource in expected.resources():
+            self.assertEqual(loaded.get(resource), expected.get(resource))
+
+    def test_stale_or_foreign_files_are_ignored(self):
+        """Tests that unusable compiled catalogs fall back to JSON."""
+        self.assertIsNone(
+            catalog._load_compiled(self.compiled, self.source + b" ")
+        )
+        self.assertIsNone(
+            catalog._load_compiled(b"x" + self.compiled[1:], self.source)
+        )
+        self.assertIsNone(catalog._load_compiled(b"", self.source))
+
+    def test_bundled_file_is_up_to_date(self):
+        """Tests that the bundled compiled catalog matches the JSON file."""
+        with open(catalog.utils.GAQL_FILEPATH, "rb") as file:
+            source = file.read()
+        with open(catalog.utils.GAQL_COMPILED_FILEPATH, "rb") as file:
+            compiled = file.read()
+        self.assertIsNotNone(catalog._load_compiled(compiled, source))
+
+
+if __name__ == "__main__":
+    unittest.main()
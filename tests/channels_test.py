@@ -0,0 +1,159 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the channels module."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ads_mcp import channels
+
+
+class _Call:
+    """A streaming call that ends when `end` is called."""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self._callbacks = []
+
+    def add_callback(self, callback):
+        self._callbacks.append(callback)
+        return True
+
+    def end(self):
+        for callback in self._callbacks:
+            callback()
+
+
+class _Channel:
+    """A channel whose multicallables return the channel."""
+
+    def __init__(self, name):
+        self.name = name
+        self.created = 0
+
+    def unary_unary(self, method, *args):
+        self.created += 1
+        return lambda request, **kwargs: self.name
+
+    def unary_stream(self, method, *args):
+        self.created += 1
+        return lambda request, **kwargs: _Call(self.name)
+
+
+class TestSettings(unittest.TestCase):
+    """Test cases for the loading of the channel settings."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "google-ads.yaml")
+
+    def _write(self, text):
+        with open(self.path, "w") as f:
+            f.write(text)
+
+    def test_defaults(self):
+        """Tests the settings without a file or environment variables."""
+        with mock.patch.dict(os.environ, clear=True):
+            settings = channels.load_settings(self.path)
+        self.assertEqual(settings, channels.ChannelSettings())
+        options = dict(settings.options())
+        self.assertNotIn("grpc.keepalive_time_ms", options)
+        self.assertEqual(
+            options["grpc.max_receive_message_length"], 64 * 1024 * 1024
+        )
+
+    def test_yaml_and_environment(self):
+        """Tests that environment variables override the yaml file."""
+        self._write(
+            "developer_token: abc\n"
+            "grpc_channel:\n"
+            "  pool_size: 4\n"
+            "  pool_policy: least_loaded\n"
+            "  keepalive_time_seconds: 120\n"
+            "  compression: gzip\n"
+            "  unknown: 1\n"
+        )
+        with mock.patch.dict(
+            os.environ,
+            {"GOOGLE_ADS_MCP_CHANNEL_POOL_SIZE": "2"},
+            clear=True,
+        ):
+            settings = channels.load_settings(self.path)
+        self.assertEqual(settings.pool_size, 2)
+        self.assertEqual(settings.pool_policy, channels.LEAST_LOADED)
+        self.assertEqual(settings.compression, "gzip")
+        options = dict(settings.options())
+        self.assertEqual(options["grpc.keepalive_time_ms"], 120000)
+        self.assertEqual(options["grpc.keepalive_permit_without_calls"], 0)
+
+    def test_invalid_values(self):
+        """Tests that invalid values fall back to the defaults."""
+        self._write("grpc_channel:\n  pool_size: many\n")
+        with mock.patch.dict(
+            os.environ,
+            {
+                "GOOGLE_ADS_MCP_CHANNEL_POOL_POLICY": "random",
+                "GOOGLE_ADS_MCP_GRPC_COMPRESSION": "brotli",
+            },
+            clear=True,
+        ):
+            settings = channels.load_settings(self.path)
+        self.assertEqual(settings, channels.ChannelSettings())
+
+
+class TestChannelPool(unittest.TestCase):
+    """Test cases for the ChannelPool class."""
+
+    def setUp(self):
+        self.channels = [_Channel("a"), _Channel("b"), _Channel("c")]
+
+    def test_round_robin(self):
+        """Tests that calls take the channels in turn."""
+        pool = channels.ChannelPool(self.channels)
+        method = pool.unary_unary("/Service/Method")
+        self.assertEqual([method(None) for _ in range(4)], list("abca"))
+        self.assertEqual(pool.loads, [0, 0, 0])
+        # Multicallables are created once per channel and method.
+        for _ in range(3):
+            pool.unary_unary("/Service/Method")(None)
+        self.assertEqual([c.created for c in self.channels], [1, 1, 1])
+
+    def test_least_loaded(self):
+        """Tests that streams go to the channel with the fewest calls."""
+        pool = channels.ChannelPool(self.channels, channels.LEAST_LOADED)
+        method = pool.unary_stream("/Service/Stream")
+        calls = [method(None) for _ in range(3)]
+        self.assertEqual(
+            sorted(call.channel for call in calls), ["a", "b", "c"]
+        )
+        self.assertEqual(pool.loads, [1, 1, 1])
+        ended = calls[1]
+        ended.end()
+        self.assertEqual(method(None).channel, ended.channel)
+        self.assertEqual(pool.loads, [1, 1, 1])
+
+    def test_invalid_pool(self):
+        """Tests that pools need channels and a known policy."""
+        with self.assertRaises(ValueError):
+            channels.ChannelPool([])
+        with self.assertRaises(ValueError):
+            channels.ChannelPool(self.channels, "random")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the clients module."""
+
+import unittest
+from unittest import mock
+
+import google.oauth2.credentials
+
+from ads_mcp import clients
+
+
+def _key(login_customer_id):
+    return clients.ClientKey("token", login_customer_id, "credentials")
+
+
+class _Pool:
+    """A channel pool whose loads are set by the test."""
+
+    def __init__(self):
+        self.loads = [0]
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestLoginCustomer(unittest.TestCase):
+    """Test cases for the login_customer context manager."""
+
+    def test_override(self):
+        """Tests that overrides are scoped to the context."""
+        self.assertIsNone(clients.login_customer_override())
+        with clients.login_customer("123-456-7890"):
+            self.assertEqual(clients.login_customer_override(), "1234567890")
+            with clients.login_customer(None):
+                self.assertEqual(
+                    clients.login_customer_override(), "1234567890"
+                )
+        self.assertIsNone(clients.login_customer_override())
+
+    def test_credentials_identity(self):
+        """Tests that user credentials are told apart by refresh token."""
+
+        def credentials(refresh_token):
+            return google.oauth2.credentials.Credentials(
+                None, refresh_token=refresh_token, client_id="client"
+            )
+
+        self.assertEqual(
+            clients.credentials_identity(credentials("secret")),
+            clients.credentials_identity(credentials("secret")),
+        )
+        self.assertNotEqual(
+            clients.credentials_identity(credentials("secret")),
+            clients.credentials_identity(credentials("other")),
+        )
+        self.assertNotIn(
+            "secret", clients.credentials_identity(credentials("secret"))
+        )
+
+
+class TestClientPool(unittest.TestCase):
+    """Test cases for the ClientPool class."""
+
+    def setUp(self):
+        self.pools = []
+
+        def create_pool(client, settings):
+            self.pools.append(_Pool())
+            return self.pools[-1]
+
+        patches = [
+            mock.patch.object(clients.channels, "create_pool", create_pool),
+            mock.patch.object(
+                clients.channels,
+                "create_service",
+                side_effect=lambda *args, **kwargs: object(),
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.pool = clients.ClientPool(
+            lambda key: mock.Mock(version=None, key=key),
+            max_clients=2,
+            settings=clients.channels.ChannelSettings(),
+        )
+
+    def test_clients_by_tenant(self):
+        """Tests that each tenant has its own client and services."""
+        self.assertIs(self.pool.client(_key("1")), self.pool.client(_key("1")))
+        self.assertEqual(self.pool.client(_key("2")).key, _key("2"))
+        service = self.pool.service(_key("1"), "GoogleAdsService")
+        self.assertIs(self.pool.service(_key("1"), "GoogleAdsService"), service)
+        self.assertIsNot(
+            self.pool.service(_key("2"), "GoogleAdsService"), service
+        )
+        self.assertEqual(len(self.pools), 2)
+
+    def test_least_recently_used_are_evicted(self):
+        """Tests that idle tenants over the limit are evicted and closed."""
+        for login_customer_id in "12":
+            self.pool.service(_key(login_customer_id), "GoogleAdsService")
+        # Tenant 1 was used last, so tenant 2 goes first.
+        self.pool.client(_key("1"))
+        self.pool.service(_key("3"), "GoogleAdsService")
+        self.assertEqual(len(self.pool), 2)
+        self.assertEqual(self.pool.evictions, 1)
+        self.assertEqual([p.closed for p in self.pools], [False, True, False])
+
+    def test_busy_tenants_are_kept(self):
+        """Tests that tenants with calls in flight aren't evicted."""
+        client = self.pool.client(_key("1"))
+        self.pool.service(_key("1"), "GoogleAdsService")
+        self.pools[0].loads = [1]
+        self.pool.client(_key("2"))
+        self.pool.client(_key("3"))
+        self.assertEqual(len(self.pool), 2)
+        self.assertFalse(self.pools[0].closed)
+        self.assertIs(self.pool.client(_key("1")), client)
+
+    def test_close(self):
+        """Tests that closing the pool closes every channel pool."""
+        self.pool.service(_key("1"), "GoogleAdsService")
+        self.pool.close()
+        self.assertEqual(len(self.pool), 0)
+        self.assertTrue(self.pools[0].closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the cursors module."""
+
+import unittest
+
+from ads_mcp import cursors
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Rows:
+    """A row iterator that records whether it was closed."""
+
+    def __init__(self, count):
+        self._rows = iter(range(count))
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._rows)
+
+    def close(self):
+        self.closed = True
+
+
+class TestCursorRegistry(unittest.TestCase):
+    """Test cases for the CursorRegistry class."""
+
+    def setUp(self):
+        self.clock = _FakeClock()
+        self.registry = cursors.CursorRegistry(
+            max_cursors=2, ttl_seconds=10, clock=self.clock
+        )
+
+    def test_pages_through_rows(self):
+        """Tests that pages resume where the previous one stopped."""
+        rows = _Rows(5)
+        page, token = self.registry.open(rows, 2, owner="123")
+        self.assertEqual(page, [0, 1])
+        page, token = self.registry.fetch(token, owner="123")
+        self.assertEqual(page, [2, 3])
+        page, token = self.registry.fetch(token, owner="123")
+        self.assertEqual(page, [4])
+        self.assertIsNone(token)
+        self.assertTrue(rows.closed)
+        self.assertEqual(len(self.registry), 0)
+
+    def test_exact_page_does_not_leave_cursor(self):
+        """Tests that an exactly exhausted stream returns no cursor."""
+        page, token = self.registry.open(_Rows(2), 2)
+        self.assertEqual(page, [0, 1])
+        self.assertIsNone(token)
+
+    def test_owner_mismatch(self):
+        """Tests that a cursor can't be resumed by another owner."""
+        _, token = self.registry.open(_Rows(5), 2, owner="123")
+        with self.assertRaises(cursors.CursorNotFoundError):
+            self.registry.fetch(token, owner="456")
+
+    def test_expired_cursor_is_closed(self):
+        """Tests that idle cursors are evicted and closed."""
+        rows = _Rows(5)
+        _, token = self.registry.open(rows, 2)
+        self.clock.now = 11
+        with self.assertRaises(cursors.CursorNotFoundError):
+            self.registry.fetch(token)
+        self.assertTrue(rows.closed)
+
+    def test_least_recently_used_cursor_is_evicted(self):
+        """Tests that the registry stays within max_cursors."""
+        first = _Rows(5)
+        _, first_token = self.registry.open(first, 1)
+        self.registry.open(_Rows(5), 1)
+        self.registry.open(_Rows(5), 1)
+        self.assertEqual(len(self.registry), 2)
+        self.assertTrue(first.closed)
+        with self.assertRaises(cursors.CursorNotFoundError):
+            self.registry.fetch(first_token)
+
+
+if __name__ == "__main__":
+    unittest.main()
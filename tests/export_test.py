@@ -0,0 +1,200 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the export module and the export_report tool."""
+
+import csv
+import gzip
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from google.ads.googleads.v21.services.types.google_ads_service import (
+    SearchGoogleAdsStreamResponse,
+)
+
+from ads_mcp import export
+from ads_mcp.tools import export as export_tool
+
+_PATHS = ["campaign.id", "campaign.status", "metrics.ctr", "campaign.labels"]
+
+
+def _batch(*ids):
+    batch = SearchGoogleAdsStreamResponse()
+    batch.field_mask.paths.extend(_PATHS)
+    for campaign_id in ids:
+        row = batch._pb.results.add()
+        row.campaign.id = campaign_id
+        row.campaign.status = 2
+        row.metrics.ctr = 0.5
+        row.campaign.labels.append("customers/1/labels/2")
+    return batch._pb
+
+
+class TestWriteReport(unittest.TestCase):
+    """Test cases for the write_report function."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_ndjson(self):
+        """Tests that every batch is written, one row per line."""
+        path = os.path.join(self.directory, "report.ndjson")
+        result = export.write_report([_batch(1, 2), _batch(3)], path)
+
+        with open(path) as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEqual([row["campaign.id"] for row in rows], [1, 2, 3])
+        self.assertEqual(rows[0]["campaign.status"], "ENABLED")
+        self.assertEqual(result["rows"], 3)
+        self.assertEqual(result["bytes"], os.path.getsize(path))
+        self.assertEqual(
+            result["schema"],
+            [
+                {"name": "campaign.id", "type": "int64"},
+                {"name": "campaign.status", "type": "string"},
+                {"name": "metrics.ctr", "type": "double"},
+                {"name": "campaign.labels", "type": "list<string>"},
+            ],
+        )
+
+    def test_gzipped_csv(self):
+        """Tests that CSV reports have a header and can be compressed."""
+        path = os.path.join(self.directory, "report.csv.gz")
+        export.write_report([_batch(1)], path, "csv", "gzip")
+
+        with gzip.open(path, "rt", newline="") as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(
+            rows,
+            [_PATHS, ["1", "ENABLED", "0.5", '["customers/1/labels/2"]']],
+        )
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("pyarrow"), "pyarrow is not installed"
+    )
+    def test_parquet(self):
+        """Tests that Parquet reports keep the column types."""
+        import pyarrow.parquet
+
+        path = os.path.join(self.directory, "report.parquet")
+        export.write_report([_batch(1), _batch(2)], path, "parquet", "gzip")
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(table.column("campaign.id").to_pylist(), [1, 2])
+        self.assertEqual(str(table.schema.field("metrics.ctr").type), "double")
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("pyarrow"), "pyarrow is not installed"
+    )
+    def test_parquet_unknown_enum_values(self):
+        """Tests that enum values unknown to the library are strings."""
+        import pyarrow.parquet
+
+        batch = _batch(1)
+        batch.results[0].campaign.status = 99
+        path = os.path.join(self.directory, "report.parquet")
+        export.write_report([batch], path, "parquet")
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(table.column("campaign.status").to_pylist(), ["99"])
+
+    def test_enum_text(self):
+        """Tests that enum columns are converted to strings for Parquet."""
+        get = export._enum_text_getter(lambda row: row)
+        self.assertEqual(get("ENABLED"), "ENABLED")
+        self.assertEqual(get(99), "99")
+        self.assertEqual(get(["ENABLED", 99]), ["ENABLED", "99"])
+
+    def test_empty_csv(self):
+        """Tests that reports without rows have the selected columns."""
+        path = os.path.join(self.directory, "report.csv")
+        result = export.write_report([], path, "csv", fields=_PATHS)
+
+        with open(path, newline="") as file:
+            self.assertEqual(list(csv.reader(file)), [_PATHS])
+        self.assertEqual(result["rows"], 0)
+        self.assertEqual(
+            [column["name"] for column in result["schema"]], _PATHS
+        )
+        self.assertEqual(result["schema"][0]["type"], "int64")
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("pyarrow"), "pyarrow is not installed"
+    )
+    def test_empty_parquet(self):
+        """Tests that Parquet reports without rows are valid files."""
+        import pyarrow.parquet
+
+        path = os.path.join(self.directory, "report.parquet")
+        export.write_report([], path, "parquet", fields=_PATHS)
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(table.column_names, _PATHS)
+
+    def test_failed_stream_leaves_no_file(self):
+        """Tests that a report is only created once fully written."""
+
+        def batches():
+            yield _batch(1)
+            raise RuntimeError("stream broken")
+
+        path = os.path.join(self.directory, "report.ndjson")
+        with self.assertRaises(RuntimeError):
+            export.write_report(batches(), path)
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+class TestExportReport(unittest.TestCase):
+    """Test cases for the export_report tool."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patcher = mock.patch.object(export_tool, "_EXPORT_DIR", directory.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.directory = directory.name
+
+    def test_writes_into_export_directory(self):
+        """Tests that reports are written to the export directory."""
+        with mock.patch.object(
+            export_tool.search,
+            "_stream_batches",
+            return_value=(batch for batch in [_batch(1, 2)]),
+        ):
+            result = export_tool.export_report(
+                "123-4", "SELECT campaign.id FROM campaign", path="a/b.ndjson"
+            )
+        self.assertEqual(
+            result["path"],
+            os.path.join(os.path.realpath(self.directory), "a", "b.ndjson"),
+        )
+        self.assertEqual(result["rows"], 2)
+
+    def test_rejects_paths_outside_export_directory(self):
+        """Tests that reports can't be written anywhere else."""
+        for path in ("../escape.csv", "/tmp/escape.csv"):
+            with self.subTest(path=path):
+                with self.assertRaises(ValueError):
+                    export_tool.export_report(
+                        "1", "SELECT campaign.id FROM campaign", path=path
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
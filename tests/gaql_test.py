@@ -0,0 +1,143 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the gaql module."""
+
+import unittest
+
+from ads_mcp import gaql
+
+
+class TestParse(unittest.TestCase):
+    """Test cases for the parse function."""
+
+    def test_parses_all_clauses(self):
+        """Tests that every clause ends up in the syntax tree."""
+        query = gaql.parse(
+            "select campaign.id, metrics.clicks from campaign"
+            " where campaign.status in (ENABLED, PAUSED)"
+            " and segments.date between '2025-01-01' and '2025-01-31'"
+            " and campaign.end_date is not null"
+            " order by metrics.clicks desc, campaign.id limit 10"
+            " parameters include_drafts = true"
+        )
+        self.assertEqual(query.fields, ("campaign.id", "metrics.clicks"))
+        self.assertEqual(query.resource, "campaign")
+        self.assertEqual(
+            query.conditions,
+            (
+                gaql.Condition(
+                    "campaign.status",
+                    "IN",
+                    (gaql.Identifier("ENABLED"), gaql.Identifier("PAUSED")),
+                ),
+                gaql.Condition(
+                    "segments.date", "BETWEEN", ("2025-01-01", "2025-01-31")
+                ),
+                gaql.Condition("campaign.end_date", "IS NOT NULL"),
+            ),
+        )
+        self.assertEqual(
+            query.orderings,
+            (
+                gaql.Ordering("metrics.clicks", descending=True),
+                gaql.Ordering("campaign.id"),
+            ),
+        )
+        self.assertEqual(query.limit, 10)
+        self.assertEqual(
+            query.parameters, (("include_drafts", gaql.Identifier("true")),)
+        )
+
+    def test_keywords_in_strings_are_literals(self):
+        """Tests that string literals can contain keywords and quotes."""
+        query = gaql.parse(
+            "SELECT campaign.id FROM campaign"
+            " WHERE campaign.name LIKE '%ORDER BY%'"
+            ' AND ad_group.name = "it\'s LIMIT 1" LIMIT 5'
+        )
+        self.assertEqual(
+            [c.values for c in query.conditions],
+            [("%ORDER BY%",), ("it's LIMIT 1",)],
+        )
+        self.assertEqual(query.orderings, ())
+        self.assertEqual(query.limit, 5)
+
+    def test_canonical_form(self):
+        """Tests that equivalent queries share one canonical form."""
+        canonical = (
+            "SELECT campaign.id, campaign.name FROM campaign"
+            " WHERE campaign.name = 'it\\'s' AND metrics.ctr > 0.5"
+            " ORDER BY campaign.id ASC"
+        )
+        for query in (
+            canonical,
+            "SELECT campaign.id,campaign.name\n  FROM campaign\n"
+            '  WHERE campaign.name = "it\'s" and metrics.ctr>0.5'
+            "  ORDER BY campaign.id",
+        ):
+            with self.subTest(query=query):
+                self.assertEqual(gaql.parse(query).canonical, canonical)
+
+    def test_unknown_escapes_are_kept(self):
+        """Tests that regular expression escapes survive canonicalization."""
+        query = (
+            "SELECT campaign.id FROM campaign"
+            r" WHERE campaign.name REGEXP_MATCH '^\d+\s\'a'"
+        )
+        parsed = gaql.parse(query)
+        self.assertEqual(parsed.canonical, query)
+        self.assertEqual(parsed.conditions[0].values, (r"^\d+\s'a",))
+        for value in ("\\", "a\\'", r"\\d"):
+            with self.subTest(value=value):
+                text = gaql.format_value(value)
+                query = f"SELECT campaign.id FROM campaign WHERE a = {text}"
+                self.assertEqual(
+                    gaql.parse(query).conditions[0].values, (value,)
+                )
+
+    def test_parses_are_cached(self):
+        """Tests that repeated queries reuse the parsed query."""
+        query = "SELECT customer.id FROM customer"
+        self.assertIs(gaql.parse(query), gaql.parse(query))
+
+    def test_syntax_errors(self):
+        """Tests that invalid queries raise GaqlSyntaxError."""
+        for query in (
+            "campaign.id FROM campaign",
+            "SELECT FROM campaign",
+            "SELECT campaign.id FROM campaign WHERE",
+            "SELECT campaign.id FROM campaign WHERE campaign.id ~ 1",
+            "SELECT campaign.id FROM campaign WHERE campaign.id IN 1",
+            "SELECT campaign.id FROM campaign LIMIT 0",
+            "SELECT campaign.id FROM campaign LIMIT 10 extra",
+        ):
+            with self.subTest(query=query):
+                with self.assertRaises(gaql.GaqlSyntaxError):
+                    gaql.parse(query)
+
+
+class TestCanonicalize(unittest.TestCase):
+    """Test cases for the canonicalize function."""
+
+    def test_invalid_queries_keep_string_literals(self):
+        """Tests that unparsable queries only lose extra whitespace."""
+        self.assertEqual(
+            gaql.canonicalize("WHERE  campaign.name = 'a  b'"),
+            "WHERE campaign.name = 'a  b'",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
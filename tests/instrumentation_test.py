@@ -0,0 +1,206 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the instrumentation module."""
+
+import asyncio
+import unittest
+
+import grpc
+import grpc.aio
+
+from ads_mcp import instrumentation
+
+_METHOD = "/google.ads.googleads.v21.services.GoogleAdsService/SearchStream"
+
+
+class _Clock:
+    """A clock that advances one second every time it is read."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+class _RpcError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+class _Call:
+    """A unary-stream call yielding `messages`, then failing with `error`."""
+
+    def __init__(self, messages, error=None):
+        self._messages = iter(messages)
+        self._error = error
+        self.cancelled = False
+
+    def __next__(self):
+        for message in self._messages:
+            return message
+        if self._error:
+            raise self._error
+        raise StopIteration
+
+    def cancel(self):
+        self.cancelled = True
+        return True
+
+    def code(self):
+        return grpc.StatusCode.OK
+
+
+def _details(method=_METHOD):
+    return grpc.aio.ClientCallDetails(method, None, None, None, None)
+
+
+class TestHistogram(unittest.TestCase):
+    """Test cases for the Histogram class."""
+
+    def test_buckets(self):
+        """Tests that bounds are inclusive and buckets cumulative."""
+        histogram = instrumentation.Histogram([1, 5])
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(
+            histogram.buckets(), [(1, 2), (5, 3), (float("inf"), 4)]
+        )
+        self.assertEqual(histogram.sum, 14.5)
+
+    def test_quantile(self):
+        """Tests that quantiles are interpolated within their bucket."""
+        histogram = instrumentation.Histogram([10, 20])
+        self.assertIsNone(histogram.quantile(0.5))
+        for value in (1, 2, 15, 16):
+            histogram.observe(value)
+        self.assertEqual(histogram.quantile(0.5), 10)
+        self.assertEqual(histogram.quantile(0.75), 15)
+        histogram.observe(100)
+        self.assertEqual(histogram.quantile(0.99), 20)
+
+
+class TestInstrumentationInterceptor(unittest.TestCase):
+    """Test cases for the InstrumentationInterceptor class."""
+
+    def setUp(self):
+        self.metrics = instrumentation.RpcMetrics()
+        self.interceptor = instrumentation.InstrumentationInterceptor(
+            self.metrics, _Clock()
+        )
+
+    def _stream(self, call):
+        return self.interceptor.intercept_unary_stream(
+            lambda details, request: call, _details(), None
+        )
+
+    def _method(self):
+        return self.metrics.snapshot()["GoogleAdsService/SearchStream"]
+
+    def test_stream(self):
+        """Tests that streams record messages and time to first message."""
+        self.assertEqual(list(self._stream(_Call(["a", "b"]))), ["a", "b"])
+        metrics = self._method()
+        self.assertEqual(metrics.status_codes, {"OK": 1})
+        self.assertEqual(metrics.messages.sum, 2)
+        # Started at 1, first message at 2, ended at 3.
+        self.assertEqual(metrics.first_message.sum, 1)
+        self.assertEqual(metrics.latency.sum, 2)
+
+    def test_failed_and_cancelled_streams(self):
+        """Tests that streams are recorded once, with their status code."""
+        error = _RpcError(grpc.StatusCode.UNAVAILABLE)
+        with self.assertRaises(_RpcError):
+            list(self._stream(_Call(["a"], error)))
+        call = _Call(["a", "b"])
+        stream = self._stream(call)
+        next(stream)
+        self.assertTrue(stream.cancel())
+        stream.cancel()
+        self.assertTrue(call.cancelled)
+        self.assertEqual(stream.code(), grpc.StatusCode.OK)
+        self.assertEqual(
+            self._method().status_codes, {"UNAVAILABLE": 1, "CANCELLED": 1}
+        )
+
+    def test_unary(self):
+        """Tests that unary calls are recorded once they are done."""
+
+        class Response:
+            def code(self):
+                return grpc.StatusCode.OK
+
+            def add_done_callback(self, callback):
+                callback(self)
+
+        self.interceptor.intercept_unary_unary(
+            lambda details, request: Response(),
+            _details("/google.ads.googleads.v21.services.CustomerService/List"),
+            None,
+        )
+
+        def fail(details, request):
+            raise _RpcError(grpc.StatusCode.PERMISSION_DENIED)
+
+        with self.assertRaises(_RpcError):
+            self.interceptor.intercept_unary_unary(fail, _details(), None)
+        stats = self.metrics.stats()
+        self.assertEqual(
+            stats["CustomerService/List"]["status_codes"], {"OK": 1}
+        )
+        self.assertEqual(
+            stats["CustomerService/List"]["first_message_seconds"]["count"], 0
+        )
+        self.assertEqual(
+            stats["GoogleAdsService/SearchStream"]["status_codes"],
+            {"PERMISSION_DENIED": 1},
+        )
+
+
+class TestAsyncInstrumentationInterceptor(unittest.TestCase):
+    """Test cases for the AsyncInstrumentationInterceptor class."""
+
+    def test_stream(self):
+        """Tests that async streams are recorded when they end."""
+        metrics = instrumentation.RpcMetrics()
+        interceptor = instrumentation.AsyncInstrumentationInterceptor(
+            metrics, _Clock()
+        )
+
+        async def call():
+            yield "a"
+            yield "b"
+
+        async def continuation(details, request):
+            return call()
+
+        async def run():
+            messages = await interceptor.intercept_unary_stream(
+                continuation, _details(method=_METHOD.encode()), None
+            )
+            return [message async for message in messages]
+
+        self.assertEqual(asyncio.run(run()), ["a", "b"])
+        method = metrics.snapshot()["GoogleAdsService/SearchStream"]
+        self.assertEqual(method.status_codes, {"OK": 1})
+        self.assertEqual(method.messages.sum, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the mcp_header_interceptor module."""
+
+import asyncio
+import unittest
+
+import grpc.aio
+
+from ads_mcp.mcp_header_interceptor import (
+    AsyncMCPHeaderInterceptor,
+    MCPHeaderInterceptor,
+)
+
+_METADATA = (
+    ("developer-token", "token"),
+    ("x-goog-api-client", "gl-python/3.12"),
+)
+
+
+def _api_client_header(metadata):
+    return dict(metadata)["x-goog-api-client"]
+
+
+class TestMCPHeaderInterceptor(unittest.TestCase):
+    """Test cases for the MCP header interceptors."""
+
+    def test_sync_interceptor_appends_header(self):
+        """Tests that the MCP suffix is added to the API client header."""
+        details = grpc.aio.ClientCallDetails(
+            "method", None, _METADATA, None, None
+        )
+        seen = []
+        MCPHeaderInterceptor().intercept_unary_unary(
+            lambda d, r: seen.append(d.metadata), details, None
+        )
+        self.assertEqual(
+            _api_client_header(seen[0]),
+            "gl-python/3.12" + MCPHeaderInterceptor._MCP_EXTRA_HEADER,
+        )
+
+    def test_async_interceptor_appends_header(self):
+        """Tests that the async interceptor adds the same suffix."""
+        details = grpc.aio.ClientCallDetails(
+            "method", None, grpc.aio.Metadata(*_METADATA), None, None
+        )
+        seen = []
+
+        async def continuation(d, r):
+            seen.append(d.metadata)
+
+        asyncio.run(
+            AsyncMCPHeaderInterceptor().intercept_unary_stream(
+                continuation, details, None
+            )
+        )
+        self.assertEqual(
+            _api_client_header(seen[0]),
+            "gl-python/3.12" + MCPHeaderInterceptor._MCP_EXTRA_HEADER,
+        )
+
+    def test_lists_are_updated_in_place(self):
+        """Tests that metadata lists aren't copied."""
+        metadata = list(_METADATA)
+        self.assertIs(MCPHeaderInterceptor._add_mcp_header(metadata), metadata)
+        self.assertEqual(
+            _api_client_header(metadata),
+            "gl-python/3.12" + MCPHeaderInterceptor._MCP_EXTRA_HEADER,
+        )
+        # The suffix is added once, with the same precomputed header.
+        header = metadata[1]
+        MCPHeaderInterceptor._add_mcp_header(metadata)
+        self.assertIs(metadata[1], header)
+        self.assertIs(
+            MCPHeaderInterceptor._add_mcp_header(_METADATA)[1], header
+        )
+
+    def test_details_without_header_are_passed_on(self):
+        """Tests that calls without the header keep their details."""
+        details = grpc.aio.ClientCallDetails(
+            "method", None, (("developer-token", "token"),), None, None
+        )
+        seen = []
+        MCPHeaderInterceptor().intercept_unary_stream(
+            lambda d, r: seen.append(d), details, None
+        )
+        self.assertIs(seen[0], details)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,280 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the metrics module."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from ads_mcp import cancellation
+from ads_mcp import coordinator
+from ads_mcp import metrics
+
+
+class _Clock:
+    """A clock that advances one second every time it is read."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class TestCountRows(unittest.TestCase):
+    """Test cases for the count_rows function."""
+
+    def test_result_shapes(self):
+        """Tests that rows are counted in every result shape."""
+        self.assertEqual(metrics.count_rows([{}, {}]), 2)
+        self.assertEqual(metrics.count_rows({"rows": [{}], "cursor": "c"}), 1)
+        self.assertEqual(metrics.count_rows({"rows": 7, "bytes": 100}), 7)
+        self.assertEqual(
+            metrics.count_rows({"columns": ["a"], "data": {"a": [1, 2, 3]}}),
+            3,
+        )
+        self.assertIsNone(metrics.count_rows({"hits": 1}))
+        self.assertIsNone(metrics.count_rows("text"))
+
+
+class TestToolMetrics(unittest.TestCase):
+    """Test cases for the ToolMetrics class."""
+
+    def setUp(self):
+        self.metrics = metrics.ToolMetrics(max_customers=1, clock=_Clock())
+
+    def _run(self, error=None, result=None, customer_id=None):
+        try:
+            with self.metrics.call(
+                "search", customer_id, cancelled=(_Cancelled,)
+            ) as call:
+                if error:
+                    raise error
+                call.result(result)
+        except BaseException:
+            pass
+
+    def _lines(self):
+        return self.metrics.render()
+
+    def test_outcomes(self):
+        """Tests that calls are counted by outcome."""
+        self._run(result=[{}])
+        self._run(ValueError("bad query"))
+        self._run(TimeoutError())
+        self._run(asyncio.CancelledError())
+        self._run(_Cancelled())
+        lines = self._lines()
+        for outcome in ("ok", "error", "timeout", "cancelled"):
+            count = 2 if outcome == "cancelled" else 1
+            self.assertIn(
+                "ads_mcp_tool_calls_total"
+                f'{{tool="search",outcome="{outcome}"}} {count}',
+                lines,
+            )
+        self.assertIn(
+            'ads_mcp_tool_call_duration_seconds_count{tool="search"} 5', lines
+        )
+        self.assertIn('ads_mcp_tool_calls_in_flight{tool="search"} 0', lines)
+
+    def test_explicit_outcome(self):
+        """Tests that the outcome set on the call takes precedence."""
+        try:
+            with self.metrics.call("search") as call:
+                call.outcome = metrics.CANCELLED
+                raise ValueError("Client disconnected")
+        except ValueError:
+            pass
+        self.assertIn(
+            'ads_mcp_tool_calls_total{tool="search",outcome="cancelled"} 1',
+            self._lines(),
+        )
+
+    def test_in_flight(self):
+        """Tests that running calls are counted as in flight."""
+        with self.metrics.call("search"):
+            self.assertIn(
+                'ads_mcp_tool_calls_in_flight{tool="search"} 1', self._lines()
+            )
+
+    def test_rows_and_bytes(self):
+        """Tests the rows histogram and the serialized bytes counter."""
+        self._run(result={"rows": 20, "bytes": 512})
+        self.metrics.add_serialized_bytes("search", 100)
+        lines = self._lines()
+        self.assertIn(
+            'ads_mcp_tool_rows_bucket{tool="search",le="10.0"} 0', lines
+        )
+        self.assertIn(
+            'ads_mcp_tool_rows_bucket{tool="search",le="100.0"} 1', lines
+        )
+        self.assertIn(
+            'ads_mcp_tool_rows_bucket{tool="search",le="+Inf"} 1', lines
+        )
+        self.assertIn('ads_mcp_tool_rows_sum{tool="search"} 20.0', lines)
+        self.assertIn(
+            'ads_mcp_tool_serialized_bytes_total{tool="search"} 100', lines
+        )
+
+    def test_customers_are_bounded(self):
+        """Tests that customers beyond the limit share one series."""
+        self._run(result=[], customer_id="123-456-7890")
+        self._run(result=[], customer_id="1234567890")
+        self._run(result=[], customer_id="2")
+        lines = self._lines()
+        self.assertIn(
+            "ads_mcp_customer_call_duration_seconds_count"
+            '{tool="search",customer_id="1234567890"} 2',
+            lines,
+        )
+        self.assertIn(
+            "ads_mcp_customer_call_duration_seconds_count"
+            '{tool="search",customer_id="other"} 1',
+            lines,
+        )
+
+    def test_label_values_are_escaped(self):
+        """Tests that quotes, backslashes and newlines are escaped."""
+        with self.metrics.call('a"b\\c\nd'):
+            pass
+        self.assertIn(
+            'ads_mcp_tool_calls_total{tool="a\\"b\\\\c\\nd",outcome="ok"} 1',
+            self._lines(),
+        )
+
+
+class TestRender(unittest.TestCase):
+    """Test cases for the render function."""
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(metrics, "_collectors", {}),
+            mock.patch.object(metrics, "_tool_metrics", metrics.ToolMetrics()),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_registered_stats(self):
+        """Tests that numeric stats are exported as counters and gauges."""
+        metrics.register_stats(
+            "test_cache",
+            lambda: {
+                "hits": 3,
+                "hit_ratio": 0.75,
+                "wait_seconds_total": 1.5,
+                "enabled": True,
+                "policy": "lru",
+            },
+            counters=("hits", "wait_seconds_total"),
+        )
+        lines = metrics.render().splitlines()
+        self.assertIn("# TYPE ads_mcp_test_cache_hits_total counter", lines)
+        self.assertIn("ads_mcp_test_cache_hits_total 3", lines)
+        self.assertIn("# TYPE ads_mcp_test_cache_hit_ratio gauge", lines)
+        self.assertIn("ads_mcp_test_cache_hit_ratio 0.75", lines)
+        self.assertIn("ads_mcp_test_cache_wait_seconds_total 1.5", lines)
+        self.assertFalse(any("enabled" in line for line in lines))
+        self.assertFalse(any("policy" in line for line in lines))
+
+    def test_failing_stats_are_skipped(self):
+        """Tests that a failing collector doesn't fail the other metrics."""
+
+        def fail():
+            raise RuntimeError("no scheduler")
+
+        metrics.register_stats("broken", fail)
+        metrics.register_stats("test_cache", lambda: {"entries": 1})
+        self.assertIn("ads_mcp_test_cache_entries 1", metrics.render())
+
+    def test_rpc_metrics(self):
+        """Tests that the API call metrics are exported by method."""
+        rpc_metrics = metrics.instrumentation.RpcMetrics()
+        rpc_metrics.record("GoogleAdsService/SearchStream", "OK", 0.2, 3, 0.1)
+        rpc_metrics.record("GoogleAdsService/SearchStream", "UNAVAILABLE", 1, 0)
+        with mock.patch.object(
+            metrics.instrumentation, "_rpc_metrics", rpc_metrics
+        ):
+            lines = metrics.render().splitlines()
+        self.assertIn(
+            "ads_mcp_rpc_calls_total"
+            '{method="GoogleAdsService/SearchStream",code="UNAVAILABLE"} 1',
+            lines,
+        )
+        self.assertIn(
+            "ads_mcp_rpc_first_message_seconds_count"
+            '{method="GoogleAdsService/SearchStream"} 1',
+            lines,
+        )
+        self.assertIn(
+            "ads_mcp_rpc_duration_seconds_bucket"
+            '{method="GoogleAdsService/SearchStream",le="0.25"} 1',
+            lines,
+        )
+
+
+class TestToolWrapper(unittest.TestCase):
+    """Test cases for the recording of the calls of cancellation.tool."""
+
+    def test_calls_are_recorded(self):
+        """Tests that tools are recorded with their customer and rows."""
+        tool_metrics = metrics.ToolMetrics()
+
+        def search(customer_id: str):
+            return [{"id": 1}, {"id": 2}]
+
+        with mock.patch.object(metrics, "_tool_metrics", tool_metrics):
+            asyncio.run(cancellation.tool(search)(customer_id="123"))
+        lines = tool_metrics.render()
+        self.assertIn(
+            'ads_mcp_tool_calls_total{tool="search",outcome="ok"} 1', lines
+        )
+        self.assertIn('ads_mcp_tool_rows_sum{tool="search"} 2.0', lines)
+        self.assertIn(
+            "ads_mcp_customer_call_duration_seconds_count"
+            '{tool="search",customer_id="123"} 1',
+            lines,
+        )
+
+
+class TestCallTool(unittest.TestCase):
+    """Test cases for the recording of the results of MCP tool calls."""
+
+    def test_serialized_bytes(self):
+        """Tests that the size of the MCP content of results is recorded."""
+        server = coordinator._TracedFastMCP("test")
+
+        @server.tool()
+        def export_report() -> dict:
+            return {"rows": 1, "bytes": 10**9}
+
+        tool_metrics = metrics.ToolMetrics()
+        with mock.patch.object(metrics, "_tool_metrics", tool_metrics):
+            content = asyncio.run(server.call_tool("export_report", {}))
+        size = len(content[0].text.encode())
+        self.assertIn(
+            "ads_mcp_tool_serialized_bytes_total"
+            f'{{tool="export_report"}} {size}',
+            tool_metrics.render(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the projection module."""
+
+import json
+import unittest
+from google.ads.googleads.v21.services.types.google_ads_service import (
+    GoogleAdsRow,
+    SearchGoogleAdsStreamResponse,
+)
+
+from ads_mcp import projection
+
+
+def _make_row():
+    row = GoogleAdsRow()
+    row.campaign.id = 123
+    row.campaign.name = "Campaign"
+    row.campaign.status = 2
+    row.campaign.url_custom_parameters.append({"key": "k", "value": "v"})
+    row.ad_group_criterion.type_ = 2
+    row.metrics.cost_micros = 1500000
+    row.metrics.ctr = 0.25
+    return row
+
+
+class TestRowProjector(unittest.TestCase):
+    """Test cases for the RowProjector class."""
+
+    def test_projects_leaf_types(self):
+        """Tests that leaf values are converted based on the field type."""
+        projector = projection.get_row_projector(
+            GoogleAdsRow.pb().DESCRIPTOR,
+            (
+                "campaign.id",
+                "campaign.name",
+                "campaign.status",
+                "ad_group_criterion.type",
+                "metrics.cost_micros",
+                "metrics.ctr",
+                "campaign.url_custom_parameters",
+            ),
+        )
+        self.assertEqual(
+            projector(_make_row()),
+            {
+                "campaign.id": 123,
+                "campaign.name": "Campaign",
+                "campaign.status": "ENABLED",
+                "ad_group_criterion.type": "KEYWORD",
+                "metrics.cost_micros": 1500000,
+                "metrics.ctr": 0.25,
+                "campaign.url_custom_parameters": ['key: "k"\nvalue: "v"\n'],
+            },
+        )
+
+    def test_rows_are_json_serializable(self):
+        """Tests that values without a JSON representation are converted."""
+        row = _make_row()
+        row.metrics.ctr = float("nan")
+        projector = projection.get_row_projector(
+            GoogleAdsRow.pb().DESCRIPTOR, ("metrics.ctr",)
+        )
+        self.assertEqual(
+            json.dumps(projector(row), allow_nan=False), '{"metrics.ctr": null}'
+        )
+
+    def test_unknown_field(self):
+        """Tests that unresolvable paths produce an error value."""
+        projector = projection.get_row_projector(
+            GoogleAdsRow.pb().DESCRIPTOR, ("campaign.no_such_field",)
+        )
+        self.assertEqual(
+            projector(_make_row()),
+            {
+                "campaign.no_such_field": "Error: unknown field "
+                "campaign.no_such_field"
+            },
+        )
+
+    def test_batch_projector_is_cached(self):
+        """Tests that batches with the same field mask share a projector."""
+        batch = SearchGoogleAdsStreamResponse()
+        batch.field_mask.paths.extend(["campaign.id"])
+        other = SearchGoogleAdsStreamResponse()
+        other.field_mask.paths.extend(["campaign.id"])
+        self.assertIs(
+            projection.get_batch_projector(batch),
+            projection.get_batch_projector(other),
+        )
+
+
+class TestColumnBuilder(unittest.TestCase):
+    """Test cases for the ColumnBuilder class."""
+
+    def test_builds_columns_across_batches(self):
+        """Tests that batches are accumulated into typed columns."""
+        columns = projection.ColumnBuilder()
+        for cost in (1, 2):
+            batch = SearchGoogleAdsStreamResponse()
+            batch.field_mask.paths.extend(
+                ["campaign.status", "metrics.cost_micros", "metrics.ctr"]
+            )
+            row = _make_row()
+            row.metrics.cost_micros = cost
+            batch.results.append(row)
+            columns.add_batch(batch)
+
+        self.assertEqual(columns.row_count, 2)
+        self.assertEqual(
+            columns.result(),
+            {
+                "columns": [
+                    "campaign.status",
+                    "metrics.cost_micros",
+                    "metrics.ctr",
+                ],
+                "data": {
+                    "campaign.status": ["ENABLED", "ENABLED"],
+                    "metrics.cost_micros": [1, 2],
+                    "metrics.ctr": [0.25, 0.25],
+                },
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
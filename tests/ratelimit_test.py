@@ -0,0 +1,212 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the ratelimit module."""
+
+import asyncio
+import unittest
+
+from google.ads.googleads.errors import GoogleAdsException
+from google.ads.googleads.v21.errors.types.errors import GoogleAdsFailure
+
+from ads_mcp import ratelimit
+
+
+def _quota_exception(retry_seconds: int = 0) -> GoogleAdsException:
+    failure = GoogleAdsFailure()
+    error = failure._pb.errors.add()
+    error.error_code.quota_error = 4  # RESOURCE_TEMPORARILY_EXHAUSTED
+    if retry_seconds:
+        error.details.quota_error_details.retry_delay.seconds = retry_seconds
+    return GoogleAdsException(None, None, failure, "request-id")
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for the TokenBucket class."""
+
+    def setUp(self):
+        self.now = 0.0
+        self.bucket = ratelimit.TokenBucket(2, 2, clock=lambda: self.now)
+
+    def test_reservations_queue_up(self):
+        """Tests that reservations past the burst wait in turn."""
+        waits = [self.bucket.reserve() for _ in range(5)]
+        self.assertEqual(waits, [0.0, 0.0, 0.5, 1.0, 1.5])
+
+    def test_refills_at_rate(self):
+        """Tests that tokens come back at the rate, up to the burst."""
+        self.bucket.reserve()
+        self.bucket.reserve()
+        self.now = 0.5
+        self.assertEqual(self.bucket.reserve(), 0.0)
+        self.now = 100.0
+        self.assertTrue(self.bucket.idle())
+
+    def test_refund(self):
+        """Tests that refunded tokens shorten the waits of later ones."""
+        self.bucket.reserve()
+        self.bucket.reserve()
+        self.bucket.reserve()
+        self.bucket.refund()
+        self.assertEqual(self.bucket.reserve(), 0.5)
+
+    def test_throttle_and_recover(self):
+        """Tests that a quota error pauses the bucket and halves its rate."""
+        self.bucket.throttle(10)
+        self.assertEqual(self.bucket.rate, 1)
+        self.assertTrue(self.bucket.throttled)
+        self.assertEqual(self.bucket.reserve(), 11.0)
+        for _ in range(10):
+            self.bucket.recover()
+        self.assertEqual(self.bucket.rate, 2)
+        self.assertFalse(self.bucket.throttled)
+
+
+class TestQuotaRetryDelay(unittest.TestCase):
+    """Test cases for the quota_retry_delay function."""
+
+    def test_quota_errors(self):
+        """Tests that the retry delay of quota errors is used."""
+        self.assertEqual(
+            ratelimit.quota_retry_delay(_quota_exception(30)), 30.0
+        )
+        self.assertEqual(
+            ratelimit.quota_retry_delay(_quota_exception()),
+            ratelimit._DEFAULT_RETRY_DELAY_SECONDS,
+        )
+
+    def test_other_errors(self):
+        """Tests that other errors are not quota errors."""
+        failure = GoogleAdsFailure()
+        failure._pb.errors.add().error_code.query_error = 2
+        error = GoogleAdsException(None, None, failure, "request-id")
+        self.assertIsNone(ratelimit.quota_retry_delay(error))
+        self.assertIsNone(ratelimit.quota_retry_delay(ValueError()))
+
+
+class TestRequestScheduler(unittest.TestCase):
+    """Test cases for the RequestScheduler class."""
+
+    def setUp(self):
+        self.now = 0.0
+        self.sleeps = []
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+        self.scheduler = ratelimit.RequestScheduler(
+            developer_token_qps=10,
+            developer_token_burst=1,
+            customer_qps=1,
+            customer_burst=1,
+            clock=lambda: self.now,
+            sleep=sleep,
+        )
+
+    def test_customers_are_limited_separately(self):
+        """Tests that requests only wait for those of the same customer."""
+        for customer_id in ("1", "2", "1"):
+            with self.scheduler.request("token", customer_id):
+                pass
+        self.assertEqual(self.sleeps, [0.1, 0.9])
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["queued_requests"], 2)
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertEqual(stats["max_queue_depth"], 1)
+        self.assertAlmostEqual(stats["wait_seconds_total"], 1.0)
+        self.assertEqual(stats["wait_seconds_max"], 0.9)
+
+    def test_quota_errors_throttle(self):
+        """Tests that quota errors delay the next requests of the customer."""
+        with self.assertRaises(GoogleAdsException):
+            with self.scheduler.request("token", "1"):
+                raise _quota_exception(5)
+        with self.scheduler.request("token", "1"):
+            pass
+        self.assertEqual(self.sleeps, [7.0])
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["quota_errors"], 1)
+        self.assertEqual(stats["throttled_buckets"], 2)
+
+    def test_other_errors_dont_throttle(self):
+        """Tests that other errors neither throttle nor count."""
+        with self.assertRaises(ValueError):
+            with self.scheduler.request("token", "1"):
+                raise ValueError()
+        self.assertEqual(self.scheduler.stats()["quota_errors"], 0)
+        self.assertEqual(self.scheduler.stats()["throttled_buckets"], 0)
+
+    def test_cancelled_waits_give_tokens_back(self):
+        """Tests that a request cancelled while waiting leaves no debt."""
+
+        def cancelled_sleep(seconds):
+            raise KeyboardInterrupt()
+
+        self.scheduler._sleep = cancelled_sleep
+        with self.scheduler.request("token", "1"):
+            pass
+        for _ in range(3):
+            with self.assertRaises(KeyboardInterrupt):
+                with self.scheduler.request("token", "1"):
+                    self.fail()
+        self.now = 1.0
+        self.scheduler._sleep = self.fail
+        with self.scheduler.request("token", "1"):
+            pass
+
+    def test_closed_requests_are_finished(self):
+        """Tests that requests leaving the context otherwise still finish."""
+
+        def stream():
+            with self.scheduler.request("token", "1"):
+                yield
+
+        generator = stream()
+        next(generator)
+        finished = []
+        self.scheduler._finish = lambda buckets, error: finished.append(error)
+        generator.close()
+        self.assertIsInstance(finished[0], GeneratorExit)
+
+    def test_disabled(self):
+        """Tests that a rate of 0 disables the limit."""
+        scheduler = ratelimit.RequestScheduler(0, 0, 0, 0, sleep=self.fail)
+        for _ in range(100):
+            with scheduler.request("token", "1"):
+                pass
+
+    def test_request_async(self):
+        """Tests that async requests are scheduled the same way."""
+        scheduler = ratelimit.RequestScheduler(
+            developer_token_qps=1000,
+            developer_token_burst=1,
+            clock=lambda: self.now,
+        )
+
+        async def run():
+            for _ in range(3):
+                async with scheduler.request_async("token"):
+                    pass
+
+        asyncio.run(run())
+        stats = scheduler.stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["queued_requests"], 2)
+        self.assertEqual(stats["queue_depth"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
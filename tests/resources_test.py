@@ -0,0 +1,51 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the schema discovery tools."""
+
+import unittest
+
+from ads_mcp.tools import resources
+
+
+class TestResources(unittest.TestCase):
+    """Test cases for the list_resources and describe_resource tools."""
+
+    def test_list_resources(self):
+        """Tests that resources and field groups are listed."""
+        names = resources.list_resources()
+        self.assertIn("campaign", names)
+        self.assertIn("metrics", names)
+        self.assertEqual(names, sorted(names))
+
+    def test_describe_resource(self):
+        """Tests that fields are returned by kind."""
+        fields = resources.describe_resource("campaign")
+        self.assertEqual(list(fields), ["selectable", "filterable", "sortable"])
+        self.assertIn("campaign.id", fields["selectable"])
+        self.assertEqual(
+            resources.describe_resource("campaign", kind="sortable"),
+            {"sortable": fields["sortable"]},
+        )
+
+    def test_describe_unknown_resource(self):
+        """Tests that unknown resources are reported with suggestions."""
+        with self.assertRaisesRegex(ValueError, "Did you mean campaign"):
+            resources.describe_resource("campaing")
+        with self.assertRaises(ValueError):
+            resources.describe_resource("campaign", kind="everything")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,333 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the retry module."""
+
+import asyncio
+import threading
+import unittest
+
+import grpc
+from google.api_core import exceptions
+from google.ads.googleads.v21.services.types.google_ads_service import (
+    SearchGoogleAdsStreamResponse,
+)
+from google.rpc import error_details_pb2
+
+from ads_mcp import retry
+
+_POLICY = retry.RetryPolicy(
+    max_attempts=3, initial_backoff=1, max_backoff=4, deadline=60
+)
+
+
+class _RpcError(grpc.RpcError):
+    """An RPC error with a status code and trailing metadata."""
+
+    def __init__(self, code, trailing_metadata=()):
+        self._code = code
+        self._trailing_metadata = trailing_metadata
+
+    def code(self):
+        return self._code
+
+    def trailing_metadata(self):
+        return self._trailing_metadata
+
+
+def _batch(*ids):
+    batch = SearchGoogleAdsStreamResponse()
+    for campaign_id in ids:
+        batch._pb.results.add().campaign.id = campaign_id
+    return batch
+
+
+def _ids(batches):
+    return [row.campaign.id for b in batches for row in b._pb.results]
+
+
+class TestErrors(unittest.TestCase):
+    """Test cases for the inspection of API errors."""
+
+    def test_status_code(self):
+        """Tests that the status code of every kind of error is found."""
+        self.assertEqual(
+            retry.status_code(exceptions.ServiceUnavailable("down")),
+            grpc.StatusCode.UNAVAILABLE,
+        )
+        self.assertEqual(
+            retry.status_code(_RpcError(grpc.StatusCode.INTERNAL)),
+            grpc.StatusCode.INTERNAL,
+        )
+        self.assertIsNone(retry.status_code(ValueError()))
+
+    def test_server_retry_delay(self):
+        """Tests that the RetryInfo of a response is read."""
+        retry_info = error_details_pb2.RetryInfo()
+        retry_info.retry_delay.seconds = 7
+        error = _RpcError(
+            grpc.StatusCode.UNAVAILABLE,
+            (("google.rpc.retryinfo-bin", retry_info.SerializeToString()),),
+        )
+        self.assertEqual(retry.server_retry_delay(error), 7.0)
+        self.assertIsNone(
+            retry.server_retry_delay(_RpcError(grpc.StatusCode.UNAVAILABLE))
+        )
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test cases for the RetryPolicy class."""
+
+    def test_backoff_is_full_jitter(self):
+        """Tests that backoffs are drawn below an exponential bound."""
+        bounds = [
+            _POLICY.backoff(attempt, uniform=lambda low, high: high)
+            for attempt in range(1, 6)
+        ]
+        self.assertEqual(bounds, [1, 2, 4, 4, 4])
+        self.assertEqual(_POLICY.backoff(3, uniform=lambda low, high: low), 0)
+
+    def test_retry_delay(self):
+        """Tests which errors are retried."""
+        deadline = retry.Deadline(60)
+        unavailable = _RpcError(grpc.StatusCode.UNAVAILABLE)
+        self.assertIsNotNone(_POLICY.retry_delay(unavailable, 1, deadline))
+        self.assertIsNone(_POLICY.retry_delay(unavailable, 3, deadline))
+        self.assertIsNone(
+            _POLICY.retry_delay(
+                _RpcError(grpc.StatusCode.INVALID_ARGUMENT), 1, deadline
+            )
+        )
+
+    def test_retry_delay_within_deadline(self):
+        """Tests that retries that would end past the deadline aren't made."""
+        retry_info = error_details_pb2.RetryInfo()
+        retry_info.retry_delay.seconds = 30
+        error = _RpcError(
+            grpc.StatusCode.RESOURCE_EXHAUSTED,
+            (("google.rpc.retryinfo-bin", retry_info.SerializeToString()),),
+        )
+        self.assertEqual(
+            _POLICY.retry_delay(error, 1, retry.Deadline(60)), 30.0
+        )
+        self.assertIsNone(_POLICY.retry_delay(error, 1, retry.Deadline(10)))
+
+
+class TestDeadlineScope(unittest.TestCase):
+    """Test cases for the deadline of tool calls."""
+
+    def test_nested_scopes_share_the_deadline(self):
+        """Tests that inner scopes keep the deadline of the outer one."""
+        with retry.deadline_scope(100) as outer:
+            with retry.deadline_scope(1) as inner:
+                self.assertIs(inner, outer)
+                self.assertIs(retry.current_deadline(), outer)
+        self.assertIsNot(retry.current_deadline(), outer)
+
+
+class TestCall(unittest.TestCase):
+    """Test cases for the call functions."""
+
+    def test_retries_transient_errors(self):
+        """Tests that a call is retried until it succeeds."""
+        results = [_RpcError(grpc.StatusCode.UNAVAILABLE), "ok"]
+        timeouts = []
+        sleeps = []
+
+        def attempt(timeout):
+            timeouts.append(timeout)
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        self.assertEqual(retry.call(attempt, _POLICY, sleeps.append), "ok")
+        self.assertEqual(len(timeouts), 2)
+        self.assertTrue(all(0 < t <= 60 for t in timeouts))
+        self.assertEqual(len(sleeps), 1)
+
+    def test_gives_up(self):
+        """Tests that the last error is raised after the last attempt."""
+        sleeps = []
+
+        def attempt(timeout):
+            raise _RpcError(grpc.StatusCode.INTERNAL)
+
+        with self.assertRaises(grpc.RpcError):
+            retry.call(attempt, _POLICY, sleeps.append)
+        self.assertEqual(len(sleeps), 2)
+
+    def test_call_async(self):
+        """Tests that async calls are retried."""
+        results = [_RpcError(grpc.StatusCode.DEADLINE_EXCEEDED), "ok"]
+
+        async def attempt(timeout):
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        policy = _POLICY._replace(initial_backoff=0.001)
+        self.assertEqual(asyncio.run(retry.call_async(attempt, policy)), "ok")
+
+
+class TestRetryStream(unittest.TestCase):
+    """Test cases for the retry of streams."""
+
+    def test_restart_skips_delivered_rows(self):
+        """Tests that a restarted stream yields every row once."""
+        attempts = []
+
+        def start(timeout):
+            attempts.append(timeout)
+            yield _batch(1, 2)
+            if len(attempts) == 1:
+                yield _batch(3)
+                raise _RpcError(grpc.StatusCode.UNAVAILABLE)
+            yield _batch(3, 4)
+            yield _batch(5)
+
+        batches = list(retry.retry_stream(start, _POLICY, lambda _: None))
+        self.assertEqual(_ids(batches), [1, 2, 3, 4, 5])
+        self.assertEqual(len(attempts), 2)
+
+    def test_permanent_errors_are_raised(self):
+        """Tests that other errors end the stream."""
+
+        def start(timeout):
+            yield _batch(1)
+            raise _RpcError(grpc.StatusCode.PERMISSION_DENIED)
+
+        batches = []
+        with self.assertRaises(grpc.RpcError):
+            for batch in retry.retry_stream(start, _POLICY, self.fail):
+                batches.append(batch)
+        self.assertEqual(_ids(batches), [1])
+
+    def test_close_closes_the_stream(self):
+        """Tests that closing the stream closes the current attempt."""
+        closed = []
+
+        def start(timeout):
+            try:
+                yield _batch(1)
+                yield _batch(2)
+            finally:
+                closed.append(True)
+
+        stream = retry.retry_stream(start, _POLICY)
+        next(stream)
+        stream.close()
+        self.assertEqual(closed, [True])
+
+    def test_retry_stream_async(self):
+        """Tests that async streams are restarted without duplicates."""
+        attempts = []
+
+        async def start(timeout):
+            attempts.append(timeout)
+            yield _batch(1, 2)
+            if len(attempts) == 1:
+                raise _RpcError(grpc.StatusCode.UNAVAILABLE)
+            yield _batch(3)
+
+        async def read():
+            return [
+                batch async for batch in retry.retry_stream_async(start, policy)
+            ]
+
+        policy = _POLICY._replace(initial_backoff=0.001)
+        self.assertEqual(_ids(asyncio.run(read())), [1, 2, 3])
+        self.assertEqual(len(attempts), 2)
+
+    def test_deadline_is_shared_by_attempts(self):
+        """Tests that attempts get the remaining budget as their timeout."""
+        now = [0.0]
+        timeouts = []
+
+        def start(timeout):
+            timeouts.append(timeout)
+            now[0] += 20
+            raise _RpcError(grpc.StatusCode.UNAVAILABLE)
+            yield
+
+        token = retry._deadline.set(retry.Deadline(50, lambda: now[0]))
+        try:
+            with self.assertRaises(grpc.RpcError):
+                list(
+                    retry.retry_stream(
+                        start,
+                        _POLICY._replace(max_attempts=10),
+                        lambda _: None,
+                    )
+                )
+        finally:
+            retry._deadline.reset(token)
+        self.assertEqual(timeouts, [50, 30, 10])
+
+    def test_untimed_streams_use_the_deadline_of_the_reader(self):
+        """Tests that retries of untimed streams use the current deadline."""
+        timeouts = []
+
+        def start(timeout):
+            timeouts.append(timeout)
+            raise _RpcError(grpc.StatusCode.UNAVAILABLE)
+            yield
+
+        stream = retry.retry_stream(start, _POLICY, lambda _: None, False)
+        now = [0.0]
+        token = retry._deadline.set(retry.Deadline(10, lambda: now[0]))
+        now[0] = 10
+        try:
+            with self.assertRaises(grpc.RpcError):
+                next(stream)
+        finally:
+            retry._deadline.reset(token)
+        self.assertEqual(timeouts, [None])
+
+
+class TestExpire(unittest.TestCase):
+    """Test cases for the expire function."""
+
+    def test_cancels_at_the_deadline(self):
+        """Tests that the context is cancelled when the deadline passes."""
+        cancelled = threading.Event()
+        with retry.deadline_scope(0.01):
+            with self.assertRaises(TimeoutError):
+                with retry.expire(cancelled.set):
+                    cancelled.wait(5)
+                    raise _RpcError(grpc.StatusCode.CANCELLED)
+
+    def test_errors_before_the_deadline(self):
+        """Tests that other errors are raised as they are."""
+        with retry.deadline_scope(60):
+            with self.assertRaises(grpc.RpcError):
+                with retry.expire(self.fail):
+                    raise _RpcError(grpc.StatusCode.CANCELLED)
+
+    def test_passed_deadline(self):
+        """Tests that the context isn't run past the deadline."""
+        now = [0.0]
+        token = retry._deadline.set(retry.Deadline(10, lambda: now[0]))
+        now[0] = 10
+        try:
+            with self.assertRaises(TimeoutError):
+                with retry.expire(self.fail):
+                    self.fail()
+        finally:
+            retry._deadline.reset(token)
+
+
+if __name__ == "__main__":
+    unittest.main()
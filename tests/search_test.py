@@ -0,0 +1,236 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the search tools."""
+
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+import grpc
+
+from google.ads.googleads.v21.services.types.google_ads_service import (
+    SearchGoogleAdsStreamResponse,
+)
+
+from ads_mcp import cancellation
+from ads_mcp import clients
+from ads_mcp import retry
+from ads_mcp import sharding
+from ads_mcp.tools import search
+
+
+class _FakeAsyncApi:
+    """Serves one batch per search_stream call and counts the calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def search_stream(self, customer_id, query):
+        self.calls += 1
+        await asyncio.sleep(0)
+        batch = SearchGoogleAdsStreamResponse()
+        batch.field_mask.paths.append("campaign.id")
+        batch._pb.results.add().campaign.id = int(customer_id)
+        yield batch._pb
+
+
+class _Cancelled(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.CANCELLED
+
+
+class _FakeStreamCall:
+    """A search_stream call that runs `on_read` before reading a batch."""
+
+    def __init__(self, batches, on_read=None):
+        self.timeout = None
+        self.cancelled = threading.Event()
+        self._batches = iter(batches)
+        self._on_read = on_read or (lambda: None)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self._on_read()
+        if self.cancelled.is_set():
+            raise _Cancelled()
+        return next(self._batches)
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class TestCursorStreams(unittest.TestCase):
+    """Test cases for the streams read by several tool calls."""
+
+    def setUp(self):
+        self.batch = SearchGoogleAdsStreamResponse()
+        self.batch._pb.results.add().campaign.id = 1
+
+    def _stream(self, call):
+        def search_stream(customer_id, query, timeout):
+            call.timeout = timeout
+            return call
+
+        service = mock.Mock(search_stream=search_stream)
+        patches = [
+            mock.patch.object(
+                search.utils,
+                "get_client_key",
+                return_value=clients.ClientKey("token", None, None),
+            ),
+            mock.patch.object(
+                search.utils, "get_googleads_service", return_value=service
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        return search._stream_batches("1", "query", paged=True)
+
+    def test_later_calls_cancel_the_stream(self):
+        """Tests that the call reading a batch cancels the stream."""
+        second = cancellation.CancelToken()
+        reads = []
+
+        def on_read():
+            reads.append(True)
+            if len(reads) == 2:
+                second.cancel()
+
+        call = _FakeStreamCall([self.batch] * 2, on_read)
+        stream = self._stream(call)
+        first = cancellation.CancelToken()
+        with cancellation.use_token(first), retry.deadline_scope(60):
+            self.assertIs(next(stream), self.batch)
+        first.cancel()
+        self.assertFalse(call.cancelled.is_set())
+        self.assertIsNone(call.timeout)
+        with cancellation.use_token(second), retry.deadline_scope(60):
+            with self.assertRaises(cancellation.OperationCancelled):
+                next(stream)
+        self.assertTrue(call.cancelled.is_set())
+
+    def test_reads_are_bounded_by_the_deadline_of_their_call(self):
+        """Tests that a read past the deadline of its call times out."""
+        call = _FakeStreamCall([self.batch] * 2)
+        stream = self._stream(call)
+        with retry.deadline_scope(60):
+            self.assertIs(next(stream), self.batch)
+        call._on_read = lambda: call.cancelled.wait(5)
+        with retry.deadline_scope(0.01):
+            with self.assertRaises(TimeoutError):
+                next(stream)
+        self.assertTrue(call.cancelled.is_set())
+
+
+class TestSearchMany(unittest.TestCase):
+    """Test cases for the search_many tool."""
+
+    def test_merges_rows_and_reports_errors(self):
+        """Tests that failing customers don't abort the whole batch."""
+
+        def run_query(customer_id, query):
+            if customer_id == "2":
+                raise ValueError("permission denied")
+            return [{"campaign.id": int(customer_id)}]
+
+        with mock.patch.object(search, "_run_query", side_effect=run_query):
+            result = search.search_many(
+                ["1", "2", "3-0", "1"], "SELECT campaign.id FROM campaign"
+            )
+
+        self.assertEqual(
+            result,
+            {
+                "rows": [
+                    {"customer_id": "1", "campaign.id": 1},
+                    {"customer_id": "30", "campaign.id": 30},
+                ],
+                "errors": [
+                    {"customer_id": "2", "error": "permission denied"},
+                ],
+            },
+        )
+
+
+class TestShardedSearch(unittest.TestCase):
+    """Test cases for searches over long date ranges."""
+
+    def test_windows_are_merged(self):
+        """Tests that month windows run separately and merge in order."""
+        clicks_by_month = {"01": [9, 2], "02": [8], "03": [10, 1]}
+        queries = []
+
+        def stream_batches(customer_id, query):
+            queries.append(query)
+            month = query.split("BETWEEN '2025-")[1][:2]
+            batch = SearchGoogleAdsStreamResponse()
+            batch.field_mask.paths.extend(["segments.date", "metrics.clicks"])
+            for clicks in clicks_by_month[month]:
+                row = batch._pb.results.add()
+                row.segments.date = f"2025-{month}-01"
+                row.metrics.clicks = clicks
+            yield batch._pb
+
+        with (
+            mock.patch.object(
+                search, "_stream_batches", side_effect=stream_batches
+            ),
+            mock.patch.object(
+                search, "_shard_config", sharding.ShardConfig(min_days=30)
+            ),
+        ):
+            rows = search.search(
+                "8002",
+                query="SELECT segments.date, metrics.clicks FROM campaign"
+                " WHERE segments.date BETWEEN '2025-01-01' AND '2025-03-31'"
+                " ORDER BY metrics.clicks DESC LIMIT 3",
+            )
+
+        self.assertEqual(len(queries), 3)
+        self.assertEqual([row["metrics.clicks"] for row in rows], [10, 9, 8])
+
+
+class TestSearchAsync(unittest.TestCase):
+    """Test cases for the asyncio execution path of the search tool."""
+
+    def test_concurrent_identical_searches_share_one_call(self):
+        """Tests that identical concurrent searches share one stream."""
+        api = _FakeAsyncApi()
+
+        async def run():
+            return await asyncio.gather(
+                *(
+                    search._search_async(
+                        "8001", query="SELECT campaign.id FROM campaign"
+                    )
+                    for _ in range(3)
+                )
+            )
+
+        with mock.patch.object(
+            search.aio, "get_async_api", mock.AsyncMock(return_value=api)
+        ):
+            results = asyncio.run(run())
+
+        self.assertEqual(results, [[{"campaign.id": 8001}]] * 3)
+        self.assertEqual(api.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the sharding module."""
+
+import datetime
+import unittest
+
+from ads_mcp import gaql
+from ads_mcp import sharding
+
+_QUERY = (
+    "SELECT campaign.id, segments.date, metrics.clicks FROM campaign"
+    " WHERE {}"
+)
+
+
+class TestDateRange(unittest.TestCase):
+    """Test cases for the date_range function."""
+
+    def test_finite_ranges(self):
+        """Tests which conditions bound the date range."""
+        cases = {
+            "segments.date BETWEEN '2025-01-01' AND '2025-03-31'": (
+                datetime.date(2025, 1, 1),
+                datetime.date(2025, 3, 31),
+            ),
+            "segments.date > '2024-12-31' AND segments.date < '2025-04-01'": (
+                datetime.date(2025, 1, 1),
+                datetime.date(2025, 3, 31),
+            ),
+            "segments.date >= '2025-01-01'": None,
+            "segments.date DURING LAST_30_DAYS": None,
+            "segments.date IN ('2025-01-01', '2025-03-01')": None,
+            "campaign.id = 1": None,
+        }
+        for condition, expected in cases.items():
+            with self.subTest(condition=condition):
+                self.assertEqual(
+                    sharding.date_range(gaql.parse(_QUERY.format(condition))),
+                    expected,
+                )
+
+    def test_split_range(self):
+        """Tests that windows cover the range without overlapping."""
+        start, end = datetime.date(2025, 1, 15), datetime.date(2025, 3, 3)
+        self.assertEqual(
+            [
+                (low.isoformat(), high.isoformat())
+                for low, high in sharding.split_range(start, end, "month")
+            ],
+            [
+                ("2025-01-15", "2025-01-31"),
+                ("2025-02-01", "2025-02-28"),
+                ("2025-03-01", "2025-03-03"),
+            ],
+        )
+        weeks = sharding.split_range(start, end, "week")
+        self.assertEqual(len(weeks), 7)
+        self.assertEqual(weeks[-1][1], end)
+
+
+class TestPlanShards(unittest.TestCase):
+    """Test cases for the plan_shards and merge functions."""
+
+    def test_plans_one_query_per_window(self):
+        """Tests that the date conditions are replaced per window."""
+        shards = sharding.plan_shards(
+            _QUERY.format(
+                "segments.date >= '2025-01-01' AND campaign.id > 0"
+                " AND segments.date <= '2025-02-14'"
+            )
+            + " ORDER BY metrics.clicks DESC LIMIT 3",
+            "month",
+            min_days=30,
+        )
+        self.assertEqual(
+            shards.queries,
+            tuple(
+                "SELECT campaign.id, segments.date, metrics.clicks"
+                " FROM campaign WHERE campaign.id > 0 AND segments.date BETWEEN"
+                f" {window} ORDER BY metrics.clicks DESC LIMIT 3"
+                for window in (
+                    "'2025-01-01' AND '2025-01-31'",
+                    "'2025-02-01' AND '2025-02-14'",
+                )
+            ),
+        )
+
+    def test_short_or_unmergeable_queries_are_not_sharded(self):
+        """Tests that sharding is skipped when it doesn't apply."""
+        range_ = "segments.date BETWEEN '2025-01-01' AND '2025-12-31'"
+        for query, min_days in (
+            (_QUERY.format(range_), 365),
+            (_QUERY.format(range_) + " ORDER BY campaign.name", 30),
+            (_QUERY.format("segments.date >= '2025-01-01'"), 30),
+        ):
+            with self.subTest(query=query, min_days=min_days):
+                self.assertIsNone(
+                    sharding.plan_shards(query, "month", min_days)
+                )
+
+    def test_queries_without_date_segments_are_not_sharded(self):
+        """Tests that totals over the range are never split by window."""
+        range_ = "segments.date BETWEEN '2024-01-01' AND '2024-12-31'"
+        for query in (
+            "SELECT campaign.id, metrics.clicks FROM campaign"
+            f" WHERE {range_} ORDER BY metrics.clicks DESC LIMIT 10",
+            "SELECT campaign.id, segments.date, segments.week, metrics.clicks"
+            f" FROM campaign WHERE {range_}",
+            "SELECT campaign.id, segments.month, metrics.clicks FROM campaign"
+            f" WHERE {range_}",
+        ):
+            with self.subTest(query=query):
+                self.assertIsNone(sharding.plan_shards(query, "week", 30))
+
+    def test_merge_honors_order_and_limit(self):
+        """Tests that window results are merged globally."""
+        shards = sharding.ShardPlan(
+            ("q1", "q2"),
+            (
+                gaql.Ordering("metrics.clicks", descending=True),
+                gaql.Ordering("campaign.id"),
+            ),
+            4,
+        )
+        merged = sharding.merge(
+            shards,
+            [
+                [
+                    {"campaign.id": 1, "metrics.clicks": 9},
+                    {"campaign.id": 3, "metrics.clicks": 5},
+                    {"campaign.id": 4, "metrics.clicks": None},
+                ],
+                [
+                    {"campaign.id": 2, "metrics.clicks": 9},
+                    {"campaign.id": 1, "metrics.clicks": 7},
+                ],
+            ],
+        )
+        self.assertEqual(
+            [(row["campaign.id"], row["metrics.clicks"]) for row in merged],
+            [(1, 9), (2, 9), (1, 7), (3, 5)],
+        )
+        self.assertEqual(
+            sharding.merge(
+                shards._replace(orderings=(), limit=None), [[1, 2], [3]]
+            ),
+            [1, 2, 3],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
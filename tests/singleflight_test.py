@@ -0,0 +1,115 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the singleflight module."""
+
+import threading
+import unittest
+
+from ads_mcp import singleflight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for the SingleFlight class."""
+
+    def setUp(self):
+        self.group = singleflight.SingleFlight()
+        self.opened = 0
+        self.closed = False
+
+    def _open(self, items):
+        def source():
+            self.opened += 1
+            try:
+                yield from items
+            finally:
+                self.closed = True
+
+        return source
+
+    def test_concurrent_readers_share_stream(self):
+        """Tests that readers behind others receive every item."""
+        release = threading.Event()
+
+        def items():
+            yield 1
+            release.wait(5)
+            yield 2
+
+        first = self.group.stream("key", self._open(items()))
+        second = self.group.stream("key", self._open(items()))
+        self.assertEqual(next(first), 1)
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(list(second)))
+        thread.start()
+        release.set()
+        self.assertEqual(list(first), [2])
+        thread.join(5)
+
+        self.assertEqual(results, [[1, 2]])
+        self.assertEqual(self.opened, 1)
+        self.assertEqual(self.group.in_flight(), 0)
+
+    def test_read_items_are_dropped(self):
+        """Tests that items are only kept until every reader read them."""
+        first = self.group.stream("key", self._open([1, 2, 3]))
+        second = self.group.stream("key", self._open([1, 2, 3]))
+        self.assertEqual(next(first), 1)
+        self.assertEqual(next(first), 2)
+        self.assertEqual(len(first._flight._items), 2)
+        self.assertEqual(next(second), 1)
+        self.assertEqual(list(first._flight._items), [2])
+
+        # A stream whose first item was dropped can't be joined any more.
+        third = self.group.stream("key", self._open([4]))
+        self.assertEqual(list(third), [4])
+        self.assertEqual(self.opened, 2)
+        self.assertEqual(list(second), [2, 3])
+        self.assertEqual(list(first), [3])
+
+    def test_finished_stream_is_not_shared(self):
+        """Tests that a new stream is opened once the previous one ended."""
+        self.assertEqual(list(self.group.stream("key", self._open([1]))), [1])
+        self.assertEqual(list(self.group.stream("key", self._open([2]))), [2])
+        self.assertEqual(self.opened, 2)
+
+    def test_errors_reach_every_reader(self):
+        """Tests that an upstream error is raised to all readers."""
+
+        def failing():
+            raise ValueError("upstream")
+            yield
+
+        first = self.group.stream("key", failing)
+        second = self.group.stream("key", failing)
+        with self.assertRaises(ValueError):
+            next(first)
+        with self.assertRaises(ValueError):
+            next(second)
+
+    def test_abandoned_stream_is_closed(self):
+        """Tests that the source is closed once every reader closed."""
+        first = self.group.stream("key", self._open([1, 2]))
+        second = self.group.stream("key", self._open([1, 2]))
+        next(first)
+        first.close()
+        self.assertFalse(self.closed)
+        second.close()
+        self.assertTrue(self.closed)
+        self.assertEqual(self.group.in_flight(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the tracing module."""
+
+import contextlib
+import contextvars
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from ads_mcp import tracing
+from ads_mcp.tools import search
+
+
+class _Batch:
+    def __init__(self, rows):
+        self.results = rows
+
+
+class _OpenTelemetryTracer:
+    """Records the spans started with `start_as_current_span`."""
+
+    def __init__(self):
+        self.spans = []
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        span = mock.Mock(attributes=dict(attributes or {}))
+        span.set_attribute.side_effect = span.attributes.__setitem__
+        self.spans.append((name, span))
+        yield span
+
+
+class TestJsonLinesTracer(unittest.TestCase):
+    """Test cases for the JsonLinesTracer class."""
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.tracer = tracing.JsonLinesTracer(stream=self.stream)
+        patch = mock.patch.object(tracing, "_tracer", self.tracer)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def _spans(self):
+        lines = self.stream.getvalue().splitlines()
+        return {span["name"]: span for span in map(json.loads, lines)}
+
+    def test_nested_spans(self):
+        """Tests that child spans share the trace of their parent."""
+        with tracing.span("parent", customer_id="123", resource=None):
+            with tracing.span("child") as child:
+                child.set_attribute("rows", 2)
+        with tracing.span("other"):
+            pass
+        spans = self._spans()
+        self.assertEqual(spans["parent"]["attributes"], {"customer_id": "123"})
+        self.assertEqual(spans["child"]["attributes"], {"rows": 2})
+        self.assertEqual(
+            spans["child"]["trace_id"], spans["parent"]["trace_id"]
+        )
+        self.assertEqual(
+            spans["child"]["parent_span_id"], spans["parent"]["span_id"]
+        )
+        self.assertIsNone(spans["parent"]["parent_span_id"])
+        self.assertNotEqual(
+            spans["other"]["trace_id"], spans["parent"]["trace_id"]
+        )
+        self.assertGreaterEqual(
+            spans["parent"]["end_time_unix_nano"],
+            spans["parent"]["start_time_unix_nano"],
+        )
+
+    def test_errors(self):
+        """Tests that spans record the error they ended with."""
+        with self.assertRaises(ValueError):
+            with tracing.span("parse"):
+                raise ValueError("bad query")
+        span = self._spans()["parse"]
+        self.assertEqual(span["status"], "ERROR")
+        self.assertEqual(span["error"], "ValueError: bad query")
+
+    def test_worker_threads(self):
+        """Tests that spans on worker threads nest in the calling span."""
+
+        def work():
+            with tracing.span("child"):
+                pass
+
+        with tracing.span("parent"):
+            thread = threading.Thread(
+                target=contextvars.copy_context().run, args=(work,)
+            )
+            thread.start()
+            thread.join()
+        spans = self._spans()
+        self.assertEqual(
+            spans["child"]["parent_span_id"], spans["parent"]["span_id"]
+        )
+
+    def test_stream_spans(self):
+        """Tests the spans of reading a search_stream response."""
+        rows = []
+        batches = (batch for batch in [_Batch([1, 2]), _Batch([3])])
+        search._read_stream(
+            "123", batches, lambda batch: rows.extend(batch.results)
+        )
+        self.assertEqual(rows, [1, 2, 3])
+        lines = self.stream.getvalue().splitlines()
+        spans = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [span["name"] for span in spans],
+            ["ads_mcp.format", "ads_mcp.format", "ads_mcp.search_stream"],
+        )
+        self.assertEqual(
+            [span["attributes"]["rows"] for span in spans[:2]], [2, 1]
+        )
+        stream = spans[-1]["attributes"]
+        self.assertEqual(stream["customer_id"], "123")
+        self.assertEqual(stream["batch_count"], 2)
+        self.assertEqual(stream["row_count"], 3)
+        self.assertIn("first_batch_seconds", stream)
+
+    def test_traced(self):
+        """Tests that traced tools run in a span with their row count."""
+
+        @tracing.traced
+        def list_rows(customer_id):
+            return [{}, {}]
+
+        self.assertEqual(list_rows(customer_id="123"), [{}, {}])
+        span = self._spans()["ads_mcp.list_rows"]
+        self.assertEqual(span["attributes"], {"customer_id": "123", "rows": 2})
+
+
+class TestOpenTelemetryTracer(unittest.TestCase):
+    """Test cases for the OpenTelemetryTracer class."""
+
+    def test_attributes(self):
+        """Tests that attributes set to None are left out."""
+        otel = _OpenTelemetryTracer()
+        tracer = tracing.OpenTelemetryTracer(otel)
+        with tracer.span("search", {"customer_id": "1", "resource": None}) as s:
+            s.set_attribute("rows", 3)
+            s.set_attribute("cursor", None)
+        name, span = otel.spans[0]
+        self.assertEqual(name, "search")
+        self.assertEqual(span.attributes, {"customer_id": "1", "rows": 3})
+
+
+class TestCreateTracer(unittest.TestCase):
+    """Test cases for the create_tracer function."""
+
+    def _create(self, mode, path="traces.jsonl"):
+        env = {
+            "GOOGLE_ADS_MCP_TRACING": mode,
+            "GOOGLE_ADS_MCP_TRACE_FILE": path,
+        }
+        with mock.patch.dict(os.environ, env):
+            return tracing.create_tracer()
+
+    def test_modes(self):
+        """Tests the tracer of each mode."""
+        self.assertIs(type(self._create("off")), tracing.Tracer)
+        self.assertIs(type(self._create("bogus")), tracing.Tracer)
+        self.assertEqual(self._create("jsonl").path, "traces.jsonl")
+        self.assertIsInstance(
+            self._create("OpenTelemetry"), tracing.OpenTelemetryTracer
+        )
+
+    def test_opentelemetry_fallback(self):
+        """Tests that spans go to a file without opentelemetry-api."""
+        with mock.patch.dict(sys.modules, {"opentelemetry": None}):
+            tracer = self._create("opentelemetry")
+        self.assertIsInstance(tracer, tracing.JsonLinesTracer)
+
+    def test_file_is_created(self):
+        """Tests that spans are appended to the trace file."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces", "spans.jsonl")
+            tracer = self._create("jsonl", path)
+            for _ in range(2):
+                with tracer.span("search", {}):
+                    pass
+            tracer.close()
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(len(f.readlines()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
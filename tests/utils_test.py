@@ -14,7 +14,11 @@
 
 """Test cases for the utils module."""
 
+import os
+import threading
 import unittest
+from unittest import mock
+
 from google.ads.googleads.v21.enums.types.campaign_status import (
     CampaignStatusEnum,
 )
@@ -35,3 +39,98 @@ class TestUtils(unittest.TestCase):
             ),
             "ENABLED",
         )
+
+
+class TestClients(unittest.TestCase):
+    """Test cases for the API clients of the tenants."""
+
+    def setUp(self):
+        self.client = mock.Mock(version=None)
+        self.create_service = mock.Mock(
+            side_effect=lambda *args, **kwargs: object()
+        )
+        patches = [
+            mock.patch.object(utils, "_clients", None),
+            mock.patch.object(utils, "_credentials", mock.Mock()),
+            mock.patch.object(utils, "_credentials_id", "credentials"),
+            mock.patch.dict(
+                os.environ, {"GOOGLE_ADS_DEVELOPER_TOKEN": "token"}
+            ),
+            mock.patch.object(utils.clients.channels, "create_pool"),
+            mock.patch.object(
+                utils.clients.channels, "create_service", self.create_service
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        os.environ.pop("GOOGLE_ADS_LOGIN_CUSTOMER_ID", None)
+
+    def test_client_is_created_once(self):
+        """Tests that concurrent first calls share one client."""
+        created = []
+        barrier = threading.Barrier(8)
+
+        def create(key):
+            created.append(key)
+            return self.client
+
+        def get():
+            barrier.wait(5)
+            clients.append(utils.get_googleads_client())
+
+        clients = []
+        with mock.patch.object(utils, "_get_googleads_client", create):
+            threads = [threading.Thread(target=get) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(
+            created, [utils.clients.ClientKey("token", None, "credentials")]
+        )
+        self.assertEqual(clients, [self.client] * 8)
+
+    def test_services_are_cached(self):
+        """Tests that service clients are reused and share their channels."""
+        with mock.patch.object(
+            utils, "_get_googleads_client", return_value=self.client
+        ):
+            service = utils.get_googleads_service("GoogleAdsService")
+            self.assertIs(
+                utils.get_googleads_service("GoogleAdsService"), service
+            )
+            self.assertIsNot(
+                utils.get_googleads_service("GoogleAdsService", "v21"), service
+            )
+            self.assertIsNot(
+                utils.get_googleads_service("CustomerService"), service
+            )
+        self.assertEqual(self.create_service.call_count, 3)
+        utils.clients.channels.create_pool.assert_called_once()
+        calls = self.create_service.call_args_list
+        for call in calls:
+            self.assertIs(call.args[1], calls[0].args[1])
+            self.assertIs(
+                call.kwargs["interceptors"][0],
+                calls[0].kwargs["interceptors"][0],
+            )
+
+    def test_login_customer_override(self):
+        """Tests that each login customer gets its own client."""
+        with mock.patch.object(
+            utils,
+            "_get_googleads_client",
+            side_effect=lambda key: mock.Mock(
+                version=None, login_customer_id=key.login_customer_id
+            ),
+        ):
+            default = utils.get_googleads_service("GoogleAdsService")
+            with utils.clients.login_customer("123-456-7890"):
+                self.assertEqual(utils.get_login_customer_id(), "1234567890")
+                client = utils.get_googleads_client()
+                service = utils.get_googleads_service("GoogleAdsService")
+            self.assertIsNone(utils.get_login_customer_id())
+        self.assertEqual(client.login_customer_id, "1234567890")
+        self.assertIsNot(service, default)
+        self.assertEqual(utils.clients.channels.create_pool.call_count, 2)